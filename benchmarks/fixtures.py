@@ -0,0 +1,216 @@
+"""
+Synthetic workspaces for the benchmarks.
+
+A workspace consists of nested directories with markdown files containing MD+ blocks
+and of fake ROS 2 packages with nodes, launch files and interfaces, so that all generators have something to do.
+
+Usage:
+    python benchmarks/fixtures.py OUTPUT_DIR [--dirs 10] [--md-files 20] [--blocks 4] [--packages 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+BLOCK_COMMANDS = ["generate.content", "include.example", "ros.interfaces", "ros.nodes"]
+"""Generators used for the blocks, the blocks of a file cycle through this list."""
+
+
+def _write(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def get_markdown(index: int, blocks: int, example_path: str) -> str:
+    """Get the text of a markdown file with the given number of MD+ blocks and some plain text between them.
+    The example path has to be relative to the directory of the markdown file.
+    """
+    lines = [
+        "<!-- MD+:META",
+        f'title = "Document {index}"',
+        "-->",
+        f"# Document {index}",
+        "",
+        "Some text describing the document.",
+        "",
+        "```python",
+        "# A comment and not a header",
+        "print('hello')",
+        "```",
+        "",
+    ]
+
+    for b in range(blocks):
+        command = BLOCK_COMMANDS[b % len(BLOCK_COMMANDS)]
+        lines.append(f"## Section {b}")
+        lines.append("")
+        lines.append(f"<!-- MD+:{command}")
+        if command == "include.example":
+            lines.append(f'path = "{example_path}"')
+        elif command == "generate.content":
+            lines.append("md_files = True")
+        lines.append("level = 2")
+        lines.append("-->")
+        lines.append(f"<!-- MD+FIN:{command} -->")
+        lines.append("")
+
+    return "\n".join(lines)
+
+
+def create_package(path: str, name: str, nodes: int = 2, interfaces: int = 2):
+    """Create a fake ament_python ROS 2 package with nodes, a launch file, messages and services."""
+    _write(os.path.join(path, "package.xml"), f"<package><name>{name}</name></package>\n")
+    _write(os.path.join(path, "setup.cfg"), "")
+
+    scripts = ",\n".join(f'            "node_{n} = {name}.node_{n}:main"' for n in range(nodes))
+    _write(
+        os.path.join(path, "setup.py"),
+        "from setuptools import setup\n"
+        "setup(\n"
+        f'    name="{name}",\n'
+        "    entry_points={\n"
+        '        "console_scripts": [\n'
+        f"{scripts},\n"
+        "        ],\n"
+        "    },\n"
+        ")\n",
+    )
+
+    _write(os.path.join(path, name, "__init__.py"), "")
+    for n in range(nodes):
+        _write(
+            os.path.join(path, name, f"node_{n}.py"),
+            f'"""\n# Node {n} of {name}\n\nDoes something useful.\n"""\n'
+            "import rclpy\n"
+            "from rclpy.node import Node\n\n\n"
+            f"class Node{n}(Node):\n"
+            "    def __init__(self):\n"
+            f'        super().__init__("node_{n}")\n'
+            '        self.pub = self.create_publisher(String, "out", 10)\n'
+            '        """Publishes the results."""\n'
+            '        self.sub = self.create_subscription(String, "in", self.callback, 10)\n'
+            '        self.declare_parameter("rate", 1.0, ParameterDescriptor(description="Rate in Hz"))\n\n'
+            "    def callback(self, msg):\n"
+            '        """Receives the input."""\n\n\n'
+            "def main():\n"
+            "    rclpy.init()\n",
+        )
+
+    _write(
+        os.path.join(path, "launch", f"{name}.launch.py"),
+        "from launch import LaunchDescription\n\n\n"
+        "def generate_launch_description():\n"
+        f'    """Launches all nodes of {name}."""\n'
+        "    return LaunchDescription([])\n",
+    )
+
+    for i in range(interfaces):
+        _write(
+            os.path.join(path, "msg", f"Status{i}.msg"),
+            "# The status\nint32 code  # status code\nstring text\ngeometry_msgs/Pose pose\n",
+        )
+        _write(os.path.join(path, "srv", f"Get{i}.srv"), "string key # the key\n---\nbool ok\nStatus0 status\n")
+
+
+INTERFACE_TEMPLATES = {
+    "msg": "# Copyright 2024 Example\n# License: MIT\n\n"
+    "# The status\nint32 code  # status code\nstring text\ngeometry_msgs/Pose pose\n"
+    "uint8 OK=0  # everything is fine\nStatus0[<=4] children\nfloat64[] values [1.0, 2.0]\n"
+    'string FOO="a#b"  # the foo\n',
+    "srv": "string key # the key\nint32 limit 10\n"
+    'string name "x#y"  # a name\n'
+    "---\nbool ok\nStatus0 status  # the status\n",
+    "action": "# Goal\nint32 order\n---\n# Result\nint32[] sequence\n---\n# Feedback\nint32[] partial_sequence\n",
+}
+"""Content of the interface definitions per file extension."""
+
+
+def create_interface_files(path: str, count: int) -> list[str]:
+    """Create count interface definitions in the msg, srv and action directories of path.
+    The files cycle through messages, services and actions.
+
+    Returns
+    -------
+    list[str]
+        The paths of the created files.
+    """
+    extensions = list(INTERFACE_TEMPLATES)
+    files = []
+    for i in range(count):
+        extension = extensions[i % len(extensions)]
+        file_path = os.path.join(path, extension, f"Type{i}.{extension}")
+        _write(file_path, INTERFACE_TEMPLATES[extension])
+        files.append(file_path)
+    return files
+
+
+def create_workspace(root: str, dirs: int = 10, md_files: int = 20, blocks: int = 4, packages: int = 5) -> str:
+    """Create a synthetic workspace.
+
+    Parameters
+    ----------
+    root : str
+        The directory to create the workspace in. It is created if it does not exist.
+    dirs : int, optional
+        Number of directories, nested up to three levels deep, by default 10.
+    md_files : int, optional
+        Number of markdown files distributed over the directories, by default 20.
+    blocks : int, optional
+        Number of MD+ blocks per markdown file, by default 4.
+    packages : int, optional
+        Number of fake ROS 2 packages in `src`, by default 5.
+
+    Returns
+    -------
+    str
+        The absolute path of the workspace.
+    """
+    root = os.path.abspath(root)
+    os.makedirs(root, exist_ok=True)
+
+    example_path = os.path.join(root, "examples", "example.py")
+    _write(
+        example_path,
+        '#!/bin/python3\n"""\n# Example\n\nThis is an example.\n"""\nimport os\nprint(os.getcwd())\n',
+    )
+
+    directories = [root]
+    for d in range(dirs):
+        # Nest every directory below one of the previous ones, so that the tree gets some depth
+        path = os.path.join(directories[d // 3], f"dir_{d}")
+        os.makedirs(path, exist_ok=True)
+        directories.append(path)
+
+        # Plain markdown file, so that every directory has content to list
+        _write(os.path.join(path, "notes.md"), f"# Notes {d}\n\nPlain markdown without MD+ blocks.\n")
+
+    for m in range(md_files):
+        directory = directories[m % len(directories)]
+        file_name = "README.md" if m < len(directories) else f"doc_{m}.md"
+        # Example paths are relative to the including document
+        relative_example_path = os.path.relpath(example_path, directory)
+        _write(os.path.join(directory, file_name), get_markdown(m, blocks, relative_example_path))
+
+    for p in range(packages):
+        create_package(os.path.join(root, "src", f"pkg_{p}"), f"pkg_{p}")
+
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="Directory to create the workspace in.")
+    parser.add_argument("--dirs", type=int, default=10, help="Number of directories.")
+    parser.add_argument("--md-files", type=int, default=20, help="Number of markdown files.")
+    parser.add_argument("--blocks", type=int, default=4, help="Number of MD+ blocks per markdown file.")
+    parser.add_argument("--packages", type=int, default=5, help="Number of fake ROS 2 packages.")
+    args = parser.parse_args()
+
+    root = create_workspace(args.output, args.dirs, args.md_files, args.blocks, args.packages)
+    print(f"Created workspace at {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Regression checks for the regular expressions of mdplus on pathological input.
+
+Regular expressions with ambiguous or nested quantifiers can backtrack catastrophically,
+so that a single malformed file hangs a run, e.g. in a pre-commit hook.
+Every check feeds a large adversarial input (unterminated code fences, comments and docstrings, megabyte lines)
+to one regex or to the function using it and fails, if it exceeds its time budget.
+Each check runs in its own process, so that a hanging regex is killed after the timeout instead of blocking the suite.
+
+Usage:
+    python benchmarks/pathological.py [--size 1000000] [--budget-ms 1000] [--timeout 10] [CHECK ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def check_code_block_pattern(size: int):
+    from mdplus.util.markdown import code_block_pattern
+
+    # Unterminated fence followed by whitespace, which every branch of an ambiguous alternation accepts
+    list(code_block_pattern.finditer("```" + " " * size))
+    list(code_block_pattern.finditer("```python\n" + "# not a header\n" * (size // 15)))
+
+
+def check_headers_inside_code(size: int):
+    from mdplus.util.markdown import headers_inside_code
+
+    headers_inside_code.search("```" + " " * size)
+    # Many header candidates inside of an unterminated code block
+    headers_inside_code.search("```\n" + "# header\n" * (size // 9))
+
+
+def check_adapt_header_level(size: int):
+    from mdplus.util.markdown import adapt_header_level
+
+    adapt_header_level("```" + " " * size, 1)
+    # Many headers and code blocks
+    adapt_header_level("# Header\n```\n# comment\n```\n" * (size // 30), 2)
+    adapt_header_level("# " + "x" * size, 1)
+
+
+def _get_generators(text: str):
+    """Split the text of a markdown document into its generators."""
+    from mdplus.core.documents.structure import Workspace
+    from mdplus.core.generator import MdpGenerator
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "README.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("# Empty\n")
+        document = Workspace(tmp).get_document(path)
+        return MdpGenerator.get_all_generators(text, document)
+
+
+def check_mdp_block_pattern(size: int):
+    # One unterminated block with a megabyte line
+    _get_generators("<!-- MD+:generate.content " + "x" * size)
+    # Many unterminated blocks, every one of them must not scan to the end of the text again
+    block = "<!-- MD+:generate.content\nlevel = 1\n"
+    _get_generators(block * (size // len(block)))
+    # Many comment starts followed by whitespace
+    _get_generators(("<!--" + " " * 20) * (size // 24))
+
+
+def check_document_args(size: int):
+    from mdplus.core.documents.structure import Workspace
+
+    # Unterminated comment at the start of the document, all lines are part of the args block
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "README.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("<!-- MD+:META\n" * (size // 14))
+        Workspace(tmp).get_document(path).args
+
+
+def check_generators_without_end_tags(size: int):
+    # Blocks without their MD+FIN end tag, e.g. because of a merge conflict
+    block = "<!-- MD+:generate.content -->\nSome text of the block\n"
+    _get_generators(block * (size // len(block)))
+
+
+def check_doc_string_content(size: int):
+    from mdplus.util.parser.py_parser import get_doc_string_content
+
+    # Megabyte of whitespace before the docstring
+    get_doc_string_content(" " * size + "x")
+    # Unterminated docstring on a megabyte line
+    get_doc_string_content('"""' + "x" * size)
+    get_doc_string_content('""" x' * (size // 5))
+
+
+def check_example_docstrings(size: int):
+    from mdplus.generators.include.example import comment_block_pattern
+
+    # Unterminated docstring
+    comment_block_pattern.search('"""' + "x" * size)
+    # Lots of quotes that never form a closing triple quote
+    comment_block_pattern.search('"""' + 'x""' * (size // 3))
+    comment_block_pattern.search('"""' + '"x' * (size // 2))
+
+
+def check_example_ignore_patterns(size: int):
+    from mdplus.generators.flags import Flags
+    from mdplus.generators.include.example import ExampleIncluder
+
+    # Megabyte line without flags
+    ExampleIncluder.process_ignored("x" * size + "\n")
+    # Unterminated ignored sections
+    ExampleIncluder.process_ignored(f"# {Flags.IGNORE_START}\n" + "x = 1\n" * (size // 6))
+    # Whitespace runs without enough newlines for empty line removal
+    ExampleIncluder.remove_empty_lines("x" + " " * size + "\n\nx")
+
+
+def check_cpp_scanner(size: int):
+    from mdplus.util.parser.cpp_parser import scan_cpp_source
+
+    # The scanner walks the tokens in python, so the inputs are a quarter of the size to stay well within the budget.
+    # Quadratic scanning would still exceed it by far at this size.
+    size = size // 4
+    # Unterminated strings, raw strings and block comments
+    scan_cpp_source('"' + "x" * size)
+    scan_cpp_source('R"x(' * (size // 4))
+    scan_cpp_source("/*" + "x" * size)
+    # Calls without closing template brackets or parentheses
+    scan_cpp_source("create_publisher<" * (size // 17))
+    scan_cpp_source("create_publisher(" * (size // 17))
+
+
+def check_cmake_scanner(size: int):
+    from mdplus.util.parser.cpp_parser import parse_cmake_executables
+
+    # Like for the C++ scanner, a quarter of the size
+    size = size // 4
+    # Unterminated commands, quoted arguments and bracket comments
+    parse_cmake_executables("add_executable(" * (size // 15))
+    parse_cmake_executables('"' * size)
+    parse_cmake_executables("#[[" * (size // 3))
+
+
+CHECKS: dict[str, Callable[[int], None]] = {
+    "code_block_pattern": check_code_block_pattern,
+    "headers_inside_code": check_headers_inside_code,
+    "adapt_header_level": check_adapt_header_level,
+    "mdp_block_pattern": check_mdp_block_pattern,
+    "document_args": check_document_args,
+    "generators_without_end_tags": check_generators_without_end_tags,
+    "doc_string_content": check_doc_string_content,
+    "example_docstrings": check_example_docstrings,
+    "example_ignore_patterns": check_example_ignore_patterns,
+    "cpp_scanner": check_cpp_scanner,
+    "cmake_scanner": check_cmake_scanner,
+}
+"""All checks by name. Every check gets the size of its input in characters."""
+
+
+def _run_check(name: str, size: int, queue: multiprocessing.Queue):
+    # Warnings about the malformed input would flood the output
+    logging.disable(logging.CRITICAL)
+
+    start = time.perf_counter()
+    CHECKS[name](size)
+    queue.put((time.perf_counter() - start) * 1000)
+
+
+def run_check(name: str, size: int, timeout: float) -> float | None:
+    """Run a check in a separate process and return its time in milliseconds, None if it timed out or failed."""
+    queue: multiprocessing.Queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_check, args=(name, size, queue))
+    process.start()
+    process.join(timeout)
+
+    if process.is_alive():
+        process.terminate()
+        process.join()
+        return None
+
+    return queue.get() if process.exitcode == 0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("checks", nargs="*", help=f"Checks to run, by default all: {', '.join(CHECKS)}.")
+    parser.add_argument("--size", type=int, default=1_000_000, help="Size of the pathological inputs in characters.")
+    parser.add_argument("--budget-ms", type=float, default=1000, help="Maximum allowed time per check.")
+    parser.add_argument("--timeout", type=float, default=10, help="Seconds after which a check is killed.")
+    args = parser.parse_args()
+
+    names = args.checks or list(CHECKS)
+    unknown = [n for n in names if n not in CHECKS]
+    if len(unknown) > 0:
+        parser.error(f"Unknown checks: {', '.join(unknown)}")
+
+    failed = False
+    for name in names:
+        ms = run_check(name, args.size, args.timeout)
+        if ms is None:
+            print(f"{name:30} FAIL (timeout after {args.timeout:.0f} s or error)")
+            failed = True
+        elif ms > args.budget_ms:
+            print(f"{name:30} {ms:9.1f} ms  FAIL (budget {args.budget_ms:.0f} ms)")
+            failed = True
+        else:
+            print(f"{name:30} {ms:9.1f} ms")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
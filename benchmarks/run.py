@@ -0,0 +1,226 @@
+"""
+Benchmark suite of mdplus on synthetic workspaces.
+
+For each size, a workspace is created with `fixtures.create_workspace` in a temporary directory and the following is timed:
+- workspace: creation of the `Workspace` (walking the tree and parsing the document args)
+- process: `Workspace.process` of a freshly created workspace, writing only changed documents
+- ros2_environment: creation of the `Ros2Environment` (parsing all ROS 2 packages)
+- adapt_header_level: `adapt_header_level` on a markdown text with headers and code blocks
+- replace_pattern: `replace_pattern` with the ignore patterns of `include.example` on a python script
+- parse_interfaces: parsing of thousands of `.msg`, `.srv` and `.action` files into interface types
+- render_interfaces: `get_wiki_entry` of all parsed interface types
+- render_installation: installation instructions of every package directory, probing each directory once per run
+
+The best times of the runs can be stored as baseline and later runs compared against it, e.g. before and after a change:
+    python benchmarks/run.py --save
+    python benchmarks/run.py --compare
+
+Baselines are stored in benchmarks/baselines/, which is not under version control, since timings depend on the machine.
+
+Usage:
+    python benchmarks/run.py [--sizes small,medium] [--runs 5] [--save [NAME]] [--compare [NAME]] [--tolerance 0.25]
+                             [--min-delta-ms 1.0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from typing import Callable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_DIR = os.path.join(BENCHMARK_DIR, "baselines")
+
+sys.path.insert(0, ROOT)
+
+from fixtures import create_interface_files, create_workspace  # noqa: E402
+
+SIZES = {
+    "small": {"dirs": 10, "md_files": 20, "blocks": 4, "packages": 5},
+    "medium": {"dirs": 50, "md_files": 200, "blocks": 4, "packages": 20},
+    "large": {"dirs": 200, "md_files": 1000, "blocks": 8, "packages": 50},
+}
+"""Parameters of the synthetic workspaces."""
+
+INTERFACES = {"small": 1000, "medium": 3000, "large": 10000}
+"""Number of interface definition files per size."""
+
+
+def time_runs(func: Callable[..., object], runs: int, setup: Callable[[], object] | None = None) -> float:
+    """Get the best wall time of func in milliseconds. The result of setup is passed to func and not timed.
+    The minimum is used instead of the mean, since it is the least affected by other processes on the machine.
+    """
+    times = []
+    for _ in range(runs):
+        if setup is not None:
+            arg = setup()
+            start = time.perf_counter()
+            func(arg)
+        else:
+            start = time.perf_counter()
+            func()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def get_markdown_text(sections: int) -> str:
+    """Get a markdown text with headers and code blocks containing comments looking like headers."""
+    parts = []
+    for i in range(sections):
+        parts.append(f"# Section {i}\n\nSome text.\n\n## Subsection {i}\n")
+        parts.append("```python\n# not a header\nprint('hello')\n```\n")
+    return "\n".join(parts)
+
+
+def get_script_text(lines: int) -> str:
+    """Get a python script with lines, sections and the rest of the file marked to be ignored by include.example."""
+    from mdplus.generators.flags import Flags
+
+    parts = []
+    for i in range(lines):
+        parts.append(f"x_{i} = {i}\n")
+        if i % 10 == 0:
+            parts.append(f"y_{i} = {i}  # {Flags.IGNORE_LINE}\n")
+        if i % 50 == 0:
+            parts.append(f"# {Flags.IGNORE_START}\nz_{i} = {i}\n# {Flags.IGNORE_END}\n")
+    parts.append(f"# {Flags.IGNORE_START}\nrest = True\n")
+    return "".join(parts)
+
+
+def run_size(name: str, params: dict[str, int], runs: int) -> dict[str, float]:
+    """Run all benchmarks for one workspace size and return the best times in milliseconds."""
+    from mdplus.core.documents.structure import Workspace
+    from mdplus.core.environments.ros2 import Ros2Environment
+    from mdplus.generators.generate import installation
+    from mdplus.generators.include.example import ExampleIncluder
+    from mdplus.util.markdown import adapt_header_level
+    from mdplus.util.parser.ros2_parser import ActionType, MessageType, Package, ServiceType
+
+    results: dict[str, float] = dict()
+    with tempfile.TemporaryDirectory(prefix=f"mdplus-bench-{name}-") as tmp:
+        root = create_workspace(tmp, **params)
+
+        # Generate the documents once, so that the timed runs only write changed documents
+        Workspace(root).process()
+
+        results["workspace"] = time_runs(lambda: Workspace(root), runs)
+        results["process"] = time_runs(lambda ws: ws.process(check_for_new_content=True), runs, lambda: Workspace(root))
+        results["ros2_environment"] = time_runs(
+            lambda ws: Ros2Environment(ws, "ros2"), runs, lambda: Workspace(root, lazy=True)
+        )
+
+        package_dirs = [e.path for e in os.scandir(os.path.join(root, "src")) if e.is_dir()]
+
+        def render_installation(ws: Workspace):
+            for d in package_dirs:
+                probe = installation.get_installation_probe(d)
+                installation.create_git_instructions(d, probe, ws.hooks)
+                installation.create_rosepkg_instructions(probe, ws.hooks)
+
+        results["render_installation"] = time_runs(render_installation, runs, lambda: Workspace(root, lazy=True))
+
+    sections = params["md_files"] * params["blocks"]
+    markdown = get_markdown_text(sections)
+    results["adapt_header_level"] = time_runs(lambda: adapt_header_level(markdown, 2), runs)
+
+    script = get_script_text(sections * 10)
+    results["replace_pattern"] = time_runs(lambda: ExampleIncluder.process_ignored(script), runs)
+
+    with tempfile.TemporaryDirectory(prefix=f"mdplus-bench-{name}-interfaces-") as tmp:
+        files = create_interface_files(tmp, INTERFACES[name])
+        package = Package(tmp)
+        interface_classes = {".msg": MessageType, ".srv": ServiceType, ".action": ActionType}
+
+        def parse_interfaces():
+            return [interface_classes[os.path.splitext(f)[1]](package, f) for f in files]
+
+        results["parse_interfaces"] = time_runs(parse_interfaces, runs)
+        results["render_interfaces"] = time_runs(
+            lambda interfaces: [i.get_wiki_entry(3, tmp) for i in interfaces], runs, parse_interfaces
+        )
+
+    return results
+
+
+def get_baseline_path(name: str) -> str:
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--sizes", default="small,medium", help=f"Comma separated sizes to run, available: {', '.join(SIZES)}."
+    )
+    parser.add_argument("--runs", type=int, default=5, help="Number of timed runs per benchmark.")
+    parser.add_argument("--save", nargs="?", const="baseline", default=None, metavar="NAME", help="Save as baseline.")
+    parser.add_argument(
+        "--compare", nargs="?", const="baseline", default=None, metavar="NAME", help="Compare with a saved baseline."
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown compared to the baseline before a benchmark fails.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=1.0,
+        help="Slowdowns below this absolute difference are treated as noise and never fail.",
+    )
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip() != ""]
+    unknown = [s for s in sizes if s not in SIZES]
+    if len(unknown) > 0:
+        parser.error(f"Unknown sizes: {', '.join(unknown)}")
+
+    baseline = None
+    if args.compare is not None:
+        with open(get_baseline_path(args.compare), "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results: dict[str, dict[str, float]] = dict()
+    failed = False
+    for size in sizes:
+        results[size] = run_size(size, SIZES[size], args.runs)
+
+        print(f"{size}: {SIZES[size]}, interfaces: {INTERFACES[size]}")
+        for bench, ms in results[size].items():
+            line = f"  {bench:20} {ms:9.2f} ms"
+            base = baseline.get(size, {}).get(bench) if baseline is not None else None
+            if base is not None and base > 0:
+                ratio = ms / base
+                line += f"  baseline {base:9.2f} ms  x{ratio:.2f}"
+                if ratio > 1 + args.tolerance and ms - base > args.min_delta_ms:
+                    line += "  FAIL"
+                    failed = True
+            print(line)
+
+    if args.save is not None:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        data = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "sizes": {size: SIZES[size] for size in sizes},
+            "results": results,
+        }
+        path = get_baseline_path(args.save)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.write("\n")
+        print(f"Saved baseline to {path}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
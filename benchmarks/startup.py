@@ -0,0 +1,99 @@
+"""
+Startup time benchmark of the mdplus CLI.
+
+`mdplus` runs as pre-commit hook on every commit, so the cold start of the CLI has to stay fast.
+This script measures the cold start of `mdplus --version` in fresh interpreters
+and fails if the median exceeds the given budget or if heavy dependencies are imported eagerly.
+
+Usage:
+    python benchmarks/startup.py [--runs 10] [--budget-ms 150]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EAGER_IMPORT_FORBIDDEN = [
+    "git",
+    "mistletoe",
+    "pandas",
+    "rich",
+    "mdplus.core.documents.structure",
+]
+"""Modules that must not be imported just by loading the CLI."""
+
+CLI_VERSION = [sys.executable, "-c", "from mdplus.cli import execute; execute()", "--version"]
+PYTHON_NOOP = [sys.executable, "-c", "pass"]
+
+
+def get_env() -> dict[str, str]:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT, env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    return env
+
+
+def measure(cmd: list[str], runs: int) -> list[float]:
+    """Run the command `runs` times and return the wall times in milliseconds."""
+    env = get_env()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def get_eagerly_imported_modules() -> list[str]:
+    """Get the forbidden modules that are imported when loading the CLI."""
+    code = (
+        "import sys, json, mdplus.cli; "
+        f"print(json.dumps([m for m in {EAGER_IMPORT_FORBIDDEN!r} if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], env=get_env(), check=True, capture_output=True, text=True)
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Number of cold starts to measure.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150,
+        help="Maximum allowed median cold start of `mdplus --version` in milliseconds.",
+    )
+    args = parser.parse_args()
+
+    failed = False
+
+    eager = get_eagerly_imported_modules()
+    if len(eager) > 0:
+        print(f"FAIL: heavy modules imported at CLI startup: {', '.join(eager)}")
+        failed = True
+
+    # Warm up the file system cache and the bytecode cache
+    measure(CLI_VERSION, 1)
+
+    interpreter = statistics.median(measure(PYTHON_NOOP, args.runs))
+    cli = statistics.median(measure(CLI_VERSION, args.runs))
+
+    print(f"python -c pass:   {interpreter:7.1f} ms")
+    print(f"mdplus --version: {cli:7.1f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if cli > args.budget_ms:
+        print(f"FAIL: cold start exceeds the budget by {cli - args.budget_ms:.1f} ms")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
+import contextlib
 from datetime import datetime
 import logging
 import os
+import sys
 
 import click
-from click_aliases import ClickAliasedGroup
-from mdplus.core.documents.structure import Workspace
-from rich.logging import RichHandler
+
+from mdplus._version import __version__
+
+from typing import TYPE_CHECKING
+
+# Heavy imports (rich, the workspace and the generators) are done lazily inside the commands,
+# so that the startup of the CLI stays fast, e.g. when running as pre-commit hook.
+if TYPE_CHECKING:
+    from mdplus.core.documents.structure import Workspace
+    from mdplus.core.profiling import MemoryProfiler, Profiler
 
 logger = logging.getLogger("mdplus")
 logger_initialized = False
@@ -29,6 +38,9 @@ def setup_logger(**kwargs):
     if logger_initialized:
         return
 
+    from rich.console import Console
+    from rich.logging import RichHandler
+
     logger_initialized = True
     if kwargs.get("verbose"):
         # FORMAT = "%(asctime)s - %(name)s - %(message)s"
@@ -37,13 +49,56 @@ def setup_logger(**kwargs):
         FORMAT = "%(message)s"
 
     # Set the format and handler for the logger
-    handler = RichHandler()
+    handler = RichHandler(console=Console(stderr=kwargs.get("log_to_stderr", False)))
     formatter = logging.Formatter(fmt=FORMAT, datefmt="[%X]")
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
 
-@click.group(cls=ClickAliasedGroup, context_settings=CONTEXT_SETTINGS)
+class AliasedGroup(click.Group):
+    """Click group that allows to register short aliases for commands, e.g. `mdplus p` for `mdplus parse`."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        self.aliases: dict[str, str] = dict()
+        """Map of aliases to the names of the commands."""
+
+    def command(self, *args, aliases: list[str] | None = None, **kwargs):
+        decorator = super().command(*args, **kwargs)
+        if not aliases:
+            return decorator
+
+        def _decorator(f):
+            cmd = decorator(f)
+            for alias in aliases:
+                self.aliases[alias] = cmd.name
+            return cmd
+
+        return _decorator
+
+    def get_command(self, ctx, cmd_name):
+        return super().get_command(ctx, self.aliases.get(cmd_name, cmd_name))
+
+    def format_commands(self, ctx, formatter):
+        rows = []
+        for name in self.list_commands(ctx):
+            cmd = self.get_command(ctx, name)
+            if cmd is None or cmd.hidden:
+                continue
+
+            aliases = [alias for alias, cmd_name in self.aliases.items() if cmd_name == name]
+            if len(aliases) > 0:
+                name = f"{name} ({', '.join(aliases)})"
+            rows.append((name, cmd.get_short_help_str(formatter.width)))
+
+        if len(rows) > 0:
+            with formatter.section("Commands"):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=AliasedGroup, context_settings=CONTEXT_SETTINGS)
+@click.version_option(__version__, "--version", "-V", prog_name="mdplus")
 def execute():
     pass
 
@@ -56,41 +111,402 @@ def config():
     pass
 
 
+def get_changed_files(
+    root_dir: str, paths: tuple[str], staged: bool, since_ref: str | None, profiler: Profiler | None = None
+) -> list[str] | None:
+    """Get the changed files for --staged and --since.
+    If a profiler is given, the git calls are recorded as "subprocess" stage.
+
+    Returns
+    -------
+    list[str] | None
+        The absolute paths of the changed files that are not hidden,
+        or None if all documents should be processed, because no mode is selected or git failed.
+    """
+    if not staged and since_ref is None:
+        return None
+
+    from mdplus.util.git_utils import get_changed_files_since, get_staged_files, is_hidden_path
+
+    def measure(name: str):
+        return profiler.measure("subprocess", name) if profiler is not None else contextlib.nullcontext()
+
+    changed_files: set[str] = set()
+    if staged:
+        if len(paths) > 0:
+            staged_files = [os.path.abspath(p) for p in paths]
+        else:
+            with measure("git diff --cached"):
+                staged_files = get_staged_files(root_dir)
+        if staged_files is None:
+            logger.warning("Could not get the staged files, processing all documents")
+            return None
+        changed_files.update(staged_files)
+
+    if since_ref is not None:
+        with measure(f"git diff {since_ref}"):
+            since_files = get_changed_files_since(since_ref, root_dir)
+        if since_files is None:
+            logger.warning(f"Could not get the files changed since {since_ref}, processing all documents")
+            return None
+        changed_files.update(since_files)
+
+    # Hidden files are never part of the workspace, except for .gitignore files deciding which directories are listed
+    return sorted(
+        f
+        for f in changed_files
+        if not is_hidden_path(os.path.dirname(f) if os.path.basename(f) == ".gitignore" else f, root_dir)
+    )
+
+
 @execute.command(aliases=["p"])
 @click.option("--verbose", "-v", is_flag=True, help="Print more output.")
 @click.option("--quiet", "-q", is_flag=True, help="Print less output.")
 @click.option("--write-only-new-content", "-N", is_flag=True, help="Only write files with new content.")
 @click.option("--is-pre-commit-hook", is_flag=True, help="Enables output for pre-commit hook.")
+@click.option(
+    "--client",
+    is_flag=True,
+    help="Send the request to a running `mdplus serve` process. Parses locally, if no server is running.",
+)
+@click.option("--socket", "socket_path", default=None, help="Socket of the server used with --client.")
+@click.option(
+    "--staged",
+    is_flag=True,
+    help="Only generate documents depending on the staged files given as PATHS (or listed by git, if none are given).",
+)
+@click.option(
+    "--since",
+    "since_ref",
+    default=None,
+    metavar="REF",
+    help="Only generate documents depending on files changed since the git REF, e.g. origin/main.",
+)
+@click.option("--profile", is_flag=True, help="Print the time spent in the stages of the run.")
+@click.option(
+    "--profile-output",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the timing report as JSON to the given file. Implies --profile.",
+)
+@click.option(
+    "--trace",
+    "trace_output",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the spans of the run as Chrome trace events to the given file (open it in ui.perfetto.dev).",
+)
+@click.option(
+    "--cprofile",
+    "cprofile_output",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Profile the run with cProfile and write the stats to the given file (e.g. out.pstats).",
+)
+@click.option("--json", "json_summary", is_flag=True, help="Print a machine readable summary of the run as JSON.")
+@click.option("--memprofile", is_flag=True, help="Print the peak memory per phase and the top allocation sites.")
+@click.option(
+    "--memprofile-output",
+    default=None,
+    type=click.Path(dir_okay=False, writable=True),
+    help="Write the retained memory as collapsed stacks for flamegraph tools to the given file. Implies --memprofile.",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Walk and parse the whole workspace instead of starting from the snapshot of the previous run.",
+)
 # @click.option("--recursive", "-r", is_flag=True, help="Parse all subdirectories.")
 # @click.option("--root", "-R", help="Root directory parsing the repo.")
+@click.argument("paths", nargs=-1, type=click.Path(exists=False))
+def parse(paths, **kwargs):
+    """
+    Parse all markdown files in the current working directory and generate markdown files with MD+ instructions replaced.
+    With --staged, PATHS are the changed files, e.g. as passed by pre-commit.
+    """
+    # print(paths, kwargs)
+    # return
+
+    root_dir = os.getcwd()
+
+    profiler = None
+    print_timings = kwargs.get("profile") or kwargs.get("profile_output")
+    if print_timings or kwargs.get("trace_output") or kwargs.get("json_summary"):
+        from mdplus.core.profiling import Profiler
+
+        profiler = Profiler()
+
+    changed_files = get_changed_files(root_dir, paths, kwargs.get("staged", False), kwargs.get("since_ref"), profiler)
+    if changed_files is not None and len(changed_files) == 0:
+        # Nothing relevant changed, so we can stop before parsing anything
+        if kwargs.get("json_summary"):
+            from mdplus.core.events import WorkspaceEvents
+            from mdplus.core.summary import RunSummary
+
+            print_summary(RunSummary(WorkspaceEvents()).get_summary(root_dir, None, profiler))
+        return 0
+
+    if kwargs.get("client"):
+        from mdplus.server import get_socket_path, send_request
+
+        socket_path = kwargs.get("socket_path") or get_socket_path(root_dir)
+        request = {
+            "command": "parse",
+            "quiet": kwargs.get("quiet", False),
+            "verbose": kwargs.get("verbose", False),
+            "write_only_new_content": kwargs.get("write_only_new_content", False),
+            "is_pre_commit_hook": kwargs.get("is_pre_commit_hook", False),
+            "changed_files": changed_files,
+        }
+        response = send_request(socket_path, request)
+        if response is not None:
+            click.echo(response["output"], nl=False)
+            sys.exit(response["exit_code"])
+
+    if kwargs.get("json_summary"):
+        # Keep stdout clean for the summary and skip the info messages per document
+        setup_logger(**kwargs, log_to_stderr=True)
+        if not kwargs.get("verbose"):
+            logger.setLevel(logging.WARNING)
+    else:
+        setup_logger(**kwargs)
+
+    if kwargs.get("client"):
+        # Without a server we just do the work ourselves
+        logger.debug(f"No mdplus server listening on {socket_path}, parsing locally")
+
+    logger.debug(f"Starting parsing of {root_dir}")
+
+    from mdplus.core.documents.structure import Workspace
+    from mdplus.core.events import WorkspaceEvents
+
+    events = WorkspaceEvents()
+    summary = None
+    if kwargs.get("json_summary"):
+        from mdplus.core.summary import RunSummary
+
+        summary = RunSummary(events)
+
+    cprofiler = None
+    if kwargs.get("cprofile_output"):
+        import cProfile
+
+        cprofiler = cProfile.Profile()
+        cprofiler.enable()
+
+    memprofiler = None
+    if kwargs.get("memprofile") or kwargs.get("memprofile_output"):
+        from mdplus.core.profiling import MemoryProfiler
+
+        memprofiler = MemoryProfiler()
+        memprofiler.start()
+
+    def phase(name: str):
+        return memprofiler.phase(name) if memprofiler is not None else contextlib.nullcontext()
+
+    snapshot_path = None
+    if not kwargs.get("no_cache"):
+        from mdplus.core.cache import get_cache_dir
+        from mdplus.core.documents.snapshot import SNAPSHOT_FILE
+
+        snapshot_path = os.path.join(get_cache_dir(root_dir), SNAPSHOT_FILE)
+
+    with phase("workspace"):
+        workspace = Workspace(root_dir, profiler=profiler, events=events, snapshot_path=snapshot_path)
+        workspace.is_pre_commit_hook = kwargs.get("is_pre_commit_hook", False)
+
+        documents = None
+        if changed_files is not None:
+            documents = workspace.get_dependent_documents(changed_files)
+            logger.debug(f"{len(documents)} documents depend on {len(changed_files)} changed files")
+
+    with phase("process"):
+        workspace.process(kwargs.get("write_only_new_content", False), documents)
+
+    try:
+        workspace.save_snapshot()
+    except OSError as e:
+        logger.warning(f"Could not save the workspace snapshot to {snapshot_path}: {e}")
+
+    if cprofiler is not None:
+        cprofiler.disable()
+        cprofiler.dump_stats(kwargs["cprofile_output"])
+        logger.info(f"Wrote cProfile stats to {kwargs['cprofile_output']}")
+
+    if memprofiler is not None:
+        memprofiler.stop()
+        print_memory_profile(memprofiler, kwargs.get("memprofile_output"))
+
+    if print_timings:
+        print_profile(profiler, kwargs.get("profile_output"))
+
+    if kwargs.get("trace_output"):
+        write_trace(profiler, kwargs["trace_output"])
+
+    if summary is not None:
+        print_summary(summary.get_summary(root_dir, workspace, profiler))
+
+    return 0
+
+
+def print_profile(profiler: Profiler, output: str | None = None, max_documents: int = 10):
+    """Print the timing summary of the profiler and optionally write the JSON report to output."""
+    from mdplus.util.markdown import get_table
+
+    def format_rows(entries: list[dict]) -> list[dict]:
+        rows = []
+        for e in entries:
+            row = {k.replace("_ms", " [ms]"): f"{v:.1f}" if isinstance(v, float) else v for k, v in e.items()}
+            rows.append(row)
+        return rows
+
+    summary = profiler.get_summary()
+    if len(summary) > 0:
+        click.echo(get_table(format_rows(summary)))
+        click.echo()
+
+    documents = profiler.get_document_summary()[:max_documents]
+    if len(documents) > 0:
+        click.echo(get_table(format_rows(documents)))
+
+    if output is not None:
+        import json
+
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(profiler.get_report(), f, indent=2)
+            f.write("\n")
+        logger.info(f"Wrote timing report to {output}")
+
+
+def print_memory_profile(memprofiler: MemoryProfiler, output: str | None = None, max_sites: int = 10):
+    """Print the peak memory per phase and the top allocation sites and optionally write the collapsed stacks."""
+    from mdplus.util.markdown import get_table
+
+    def format_rows(entries: list[dict]) -> list[dict]:
+        rows = []
+        for e in entries:
+            row = {k.replace("_kib", " [KiB]"): f"{v:.1f}" if isinstance(v, float) else v for k, v in e.items()}
+            rows.append(row)
+        return rows
+
+    click.echo(get_table(format_rows(memprofiler.phases)))
+    click.echo()
+
+    sites = memprofiler.get_top_allocations(max_sites)
+    if len(sites) > 0:
+        click.echo(get_table(format_rows(sites)))
+
+    if output is not None:
+        stacks = memprofiler.get_collapsed_stacks()
+        with open(output, "w", encoding="utf-8") as f:
+            f.writelines(f"{line}\n" for line in stacks)
+        logger.info(f"Wrote {len(stacks)} collapsed stacks to {output}")
+
+
+def print_summary(summary: dict):
+    """Print the summary of a run as JSON to stdout."""
+    import json
+
+    click.echo(json.dumps(summary, indent=2))
+
+
+def write_trace(profiler: Profiler, output: str):
+    """Write the spans of the profiler as Chrome trace events to output."""
+    import json
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(profiler.get_trace(), f)
+    logger.info(f"Wrote trace with {len(profiler.spans)} spans to {output}")
+
+
+@execute.command(aliases=["r"])
+@click.option("--verbose", "-v", is_flag=True, help="Print more output.")
+@click.option("--quiet", "-q", is_flag=True, help="Print less output.")
+@click.option(
+    "--output",
+    "-o",
+    default="-",
+    show_default=True,
+    help="File to write the rendered document to. Use - for stdout.",
+)
+@click.option(
+    "--root",
+    "-R",
+    "root_dir",
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help="Root directory of the workspace, by default the current working directory.",
+)
+@click.argument("path", nargs=1, type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True))
+def render(path, output, root_dir, **kwargs):
+    """
+    Render the single document at PATH with MD+ instructions replaced.
+    Only the parts of the workspace needed by the generators of the document are parsed.
+    """
+    # The rendered document might be written to stdout, so the log goes to stderr
+    setup_logger(log_to_stderr=True, **kwargs)
+
+    if root_dir is None or len(root_dir) == 0:
+        root_dir = os.getcwd()
+
+    from mdplus.core.documents.document import Document, GeneratedDocument
+    from mdplus.core.documents.structure import Workspace
+
+    workspace = Workspace(root_dir, lazy=True)
+    path = os.path.abspath(path)
+    doc = workspace.get_document(path) or Document.from_file(path, workspace)
+
+    if not isinstance(doc, GeneratedDocument):
+        logger.error(f"{path} is not a markdown document")
+        sys.exit(1)
+
+    logger.debug(f"Rendering {path}")
+
+    if output == "-":
+        for part in doc.render():
+            sys.stdout.write(part)
+        sys.stdout.flush()
+    else:
+        content = "".join(doc.render())
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(content)
+        logger.info(f"Writing document: {output}")
+
+
+@execute.command(aliases=["s"])
+@click.option("--verbose", "-v", is_flag=True, help="Print more output.")
+@click.option("--socket", "socket_path", default=None, help="Socket to listen on, by default derived from ROOT_DIR.")
 @click.argument(
     "root_dir",
     nargs=1,
-    type=click.Path(exists=True, file_okay=True, dir_okay=False, readable=True),
+    type=click.Path(exists=True, file_okay=False, dir_okay=True, readable=True),
     required=False,
 )
-def parse(root_dir, **kwargs):
+def serve(root_dir, **kwargs):
     """
-    Parse all markdown files in the given ROOT_DIR and generate markdown files with MD+ instructions replaced.
+    Serve the workspace in ROOT_DIR for `mdplus parse --client` requests.
+    The server keeps generators, the workspace and its environments loaded between requests.
     If no ROOT_DIR is specified, the current working directory is used.
     """
-    setup_logger(**kwargs)
+    # The server captures stdout for the clients, so its own log goes to stderr
+    setup_logger(log_to_stderr=True, **kwargs)
 
-    # print(root_dir, kwargs)
-    # return
-
-    root_dir = None
-    # If no dirname is specified, use the current working directory
     if root_dir is None or len(root_dir) == 0:
         root_dir = os.getcwd()
 
-    logger.debug(f"Starting parsing of {root_dir}")
+    import signal
 
-    workspace = Workspace(root_dir)
-    workspace.is_pre_commit_hook = kwargs.get("is_pre_commit_hook", False)
-    workspace.process(kwargs.get("write_only_new_content", False))
+    from mdplus.server import MdpServer
 
-    return 0
+    # Stop gracefully on SIGTERM, so that the socket is removed
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+
+    with MdpServer(root_dir, kwargs.get("socket_path")) as server:
+        logger.info(f"Serving {server.root_dir} @ {server.socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Stopping server")
 
 
 @execute.command(aliases=["i"])
@@ -122,6 +538,8 @@ def init(ctx, root_dir, **kwargs):
     from InquirerPy.base.control import Choice
     from InquirerPy.separator import Separator
 
+    from mdplus.core.documents.structure import Workspace
+
     # Get a list of all available templates
 
     template_dir = os.path.join(os.path.dirname(__file__), "templates")
@@ -229,7 +647,7 @@ def init(ctx, root_dir, **kwargs):
     # After template is initialized, ask if mdplus parse should be executed
     if inquirer.confirm("Do you want to parse the initialized template now?", default=True).execute():
         logger.info(f"Starting 'mdplus parse' for {abs_path}")
-        ctx.invoke(parse, root_dir=abs_path, **kwargs)
+        ctx.invoke(parse, paths=(), **kwargs)
         # parse(abs_path)
 
     logger.info("Initialization completed! :)")
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import collections
+import hashlib
+import os
+
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+CACHE_DIR_ENV = "MDPLUS_CACHE_DIR"
+"""Environment variable to override the base directory of all mdplus caches."""
+
+
+def get_cache_base_dir() -> str:
+    """Get the base directory of all mdplus caches.
+    This is `$MDPLUS_CACHE_DIR` if set, otherwise `mdplus` in `$XDG_CACHE_HOME` or `~/.cache`.
+    """
+    if os.environ.get(CACHE_DIR_ENV):
+        return os.environ[CACHE_DIR_ENV]
+
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "mdplus")
+
+
+def get_cache_dir(root_dir: str) -> str:
+    """Get the cache directory of the workspace at root_dir.
+    The caches are kept outside of the workspace, so they never show up in the repository or in the workspace tree.
+    The directory is not created by this function.
+    """
+    root_dir = os.path.abspath(root_dir)
+    root_hash = hashlib.sha1(root_dir.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(get_cache_base_dir(), f"{os.path.basename(root_dir) or 'root'}-{root_hash}")
+
+
+class FingerprintCache(Generic[T]):
+    """
+    Bounded in-memory cache of values derived from files, e.g. parse results.
+
+    Every value is stored with a fingerprint of the files it was derived from, e.g. their modification times,
+    and is only valid as long as the fingerprint does not change.
+    The least recently used values are evicted, if the cache holds more than `max_size` values.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        """Create a new empty cache.
+
+        Parameters
+        ----------
+        max_size : int, optional
+            The maximum number of values, by default 1024.
+        """
+        self.max_size = max_size
+        """The maximum number of values, older values are evicted beyond it."""
+
+        self._entries: collections.OrderedDict[Hashable, Tuple[Hashable, T]] = collections.OrderedDict()
+        """Fingerprint and value per key, the least recently used first."""
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_entry(self, key: Hashable) -> Optional[Tuple[Hashable, T]]:
+        """Get the stored fingerprint and value of a key without validating them, None if there is no value.
+        For fingerprints that depend on the value itself, otherwise use `get_or_create`.
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, fingerprint: Hashable, value: T):
+        """Store the value of a key together with the fingerprint it was derived at."""
+        self._entries[key] = (fingerprint, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get_or_create(self, key: Hashable, fingerprint: Hashable, create: Callable[[], T]) -> T:
+        """Get the value of a key, it is created again if there is none or its fingerprint changed."""
+        entry = self.get_entry(key)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+
+        value = create()
+        self.set(key, fingerprint, value)
+        return value
+
+    def clear(self):
+        """Remove all values."""
+        self._entries.clear()
+
+
+def get_file_fingerprint(path: str) -> Tuple[int, int]:
+    """Get the fingerprint (mtime, size) of a file.
+
+    Raises
+    ------
+    OSError
+        If the file does not exist.
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+_file_cache: FingerprintCache = FingerprintCache(max_size=4096)
+"""Results of `get_cached` per (parse function, file path)."""
+
+
+def get_cached(path: str, parse: Callable[[str], T]) -> T:
+    """Parse the text of a file, the result is cached as long as the fingerprint of the file does not change.
+    Results are cached per parse function, so that several parsers can read the same file.
+
+    Raises
+    ------
+    OSError
+        If the file can not be read.
+    """
+
+    def create() -> T:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return parse(f.read())
+
+    return _file_cache.get_or_create((parse, path), get_file_fingerprint(path), create)
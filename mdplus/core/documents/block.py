@@ -36,6 +36,32 @@ class MdpBlock:
 
         return re.compile(pattern_str, re.MULTILINE | re.DOTALL)
 
+    @staticmethod
+    def get_search_end(text: str, comment_definition: CommentDefinition) -> int:
+        """Get the end position for searching the pattern of `get_pattern` in the text.
+        Every block needs a comment end, so block starts behind the last comment end of the text can never match.
+        Without this limit, the lazy arguments group scans the rest of the text again for each of these starts,
+        which is quadratic, e.g. for a file with many unterminated comments.
+
+        Parameters
+        ----------
+        text : str
+            The text to search in.
+        comment_definition : CommentDefinition
+            The comment definition used to create the pattern.
+
+        Returns
+        -------
+        int
+            The position behind the last comment end, 0 if there is none.
+        """
+        search_end = 0
+        for end in comment_definition.multi_line_end:
+            position = text.rfind(end)
+            if position >= 0:
+                search_end = max(search_end, position + len(end))
+        return search_end
+
     @staticmethod
     def get_fin_pattern(command: str, comment_definition: CommentDefinition):
 
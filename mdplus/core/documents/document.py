@@ -6,7 +6,7 @@ from mdplus.core.documents.definitions import CommentDefinition
 from mdplus.core.documents.block import MdpBlock
 from mdplus.core.generator import MdpGenerator
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 
 if TYPE_CHECKING:
@@ -68,6 +68,12 @@ class Document:
         self._args: dict[str, any] = None
         """MDP args of the document."""
 
+        self.args_mtime: int | None = None
+        """Modification time of the document when its args were parsed, only recorded if a snapshot is used."""
+
+        self._text: str | None = None
+        """Cached text of the document, shared by all code paths reading the document during a run."""
+
     def get_title(self) -> str:
         """Get the title of the document."""
 
@@ -79,45 +85,86 @@ class Document:
     @property
     def args(self) -> dict[str, any]:
         if self._args is None:
-            self._args = self.parse_args()
+            # The time is taken before parsing, so that changes during parsing invalidate the args in the next run
+            if self.workspace.snapshot_path is not None:
+                self.args_mtime = os.stat(self.full_path).st_mtime_ns
+                self._args = self.workspace.get_snapshot_args(self.full_path, self.args_mtime)
+            if self._args is None:
+                self._args = self.parse_args()
+        return self._args
+
+    @property
+    def parsed_args(self) -> dict[str, any] | None:
+        """The MDP args of the document if they were already parsed, otherwise None. Never parses the document."""
         return self._args
 
+    @property
+    def text(self) -> str:
+        """The text of the document. The file is read only once and cached until `release()` is called."""
+        if self._text is None:
+            with open(self.full_path, "r", encoding="utf-8") as f:
+                self._text = f.read()
+                events = self.workspace.events
+                if events.has_listeners("on_read"):
+                    events.emit("on_read", self, os.fstat(f.fileno()).st_size)
+        return self._text
+
+    def release(self):
+        """Release the cached text of the document. The parsed args are kept."""
+        self._text = None
+
+    def reset(self):
+        """Reset all cached data of the document, e.g. after the file changed on disk."""
+        self.release()
+        self._args = None
+        self.args_mtime = None
+
     def parse_args(self):
         """Parse the MDP arguments of the document."""
 
+        # If the document is already read, use the cached text instead of opening the file again
+        if self._text is not None:
+            return self._parse_args_from_lines(self._text.splitlines())
+
+        with open(self.full_path, "r", encoding="utf-8") as f:
+            return self._parse_args_from_lines(f)
+
+    def _parse_args_from_lines(self, lines: Iterable[str]):
+        """Parse the MDP arguments of the document from the given lines of the document."""
+
         # Read the first lines that are either empty or multiline comments
         relevant_lines: list[str] = []
 
-        with open(self.full_path, "r", encoding="utf-8") as f:
-            started = False
-            for line in f:
-                if line.strip() == "":
-                    continue
-
-                # TODO: At the moment we ignore single line comments
-                # if line.strip().startswith(self.comment_definition.single_line):
-                #     relevant_lines.append(line.strip()[len(self.comment_definition.single_line):])
-                #     continue
-
-                if any([line.strip().startswith(start) for start in self.comment_definition.multi_line_start]):
-                    started = True
-                    relevant_lines.append(line.strip())
+        started = False
+        for line in lines:
+            if line.strip() == "":
+                continue
 
-                    if any([line.strip().endswith(end) for end in self.comment_definition.multi_line_end]):
-                        break
+            # TODO: At the moment we ignore single line comments
+            # if line.strip().startswith(self.comment_definition.single_line):
+            #     relevant_lines.append(line.strip()[len(self.comment_definition.single_line):])
+            #     continue
 
-                    continue
-                else:
-                    if not started:
-                        break
+            if any([line.strip().startswith(start) for start in self.comment_definition.multi_line_start]):
+                started = True
+                relevant_lines.append(line.strip())
 
-                    if started:
-                        relevant_lines.append(line.strip())
-                        if any([line.strip().endswith(end) for end in self.comment_definition.multi_line_end]):
-                            break
+                if any([line.strip().endswith(end) for end in self.comment_definition.multi_line_end]):
+                    break
+
+                continue
+            else:
+                if not started:
+                    break
+
+                if started:
+                    relevant_lines.append(line.strip())
+                    if any([line.strip().endswith(end) for end in self.comment_definition.multi_line_end]):
+                        break
 
         block = "\n".join(relevant_lines)
-        if (match := self.mdp_pattern.search(block)) is not None:
+        search_end = MdpBlock.get_search_end(block, self.comment_definition)
+        if (match := self.mdp_pattern.search(block, 0, search_end)) is not None:
             mdp_block = MdpBlock(match)
             mdp_block.arguments_str
             return mdp_block.arguments
@@ -147,7 +194,11 @@ class GeneratedDocument(Document):
     ):
         super().__init__(file_path, workspace, comment_definition)
 
-        self.origin_text = None
+        self.origin_text: str | None = None
+        """The text of the document before the generation."""
+
+        self.modules: list[MdpGenerator] = []
+        """The generators of the document, including the non-changing text parts."""
 
     @property
     def skip_generating(self):
@@ -159,35 +210,81 @@ class GeneratedDocument(Document):
 
         return False
 
+    def parse_args(self):
+        # Generated documents are read completely during processing anyway,
+        # so the args are parsed from the shared text instead of opening the file twice.
+        return self._parse_args_from_lines(self.text.splitlines())
+
+    def release(self):
+        super().release()
+        self.origin_text = None
+        self.modules = []
+
+    def get_generators(self) -> list[MdpGenerator]:
+        """Split the text of the document into its generators."""
+        with self.workspace.measure("split", document=self.full_path):
+            return MdpGenerator.get_all_generators(self.text, self)
+
+    def depends_on(self, paths: list[str]) -> bool:
+        """Check if the generated content of the document depends on any of the given absolute paths.
+        The document is split into its generators to ask them, the content itself is not generated.
+        """
+        if self.full_path in paths:
+            return True
+
+        if self.skip_generating:
+            return False
+
+        modules = self.get_generators()
+        return any(module.depends_on(path) for module in modules for path in paths)
+
     def process(self, check_for_new_content: bool = False):
 
         # If skip_generating is set, we do not generate the document
         if self.skip_generating:
             logger.info(f"Skipping document: {self.full_path}")
+            self.release()
             return
 
         logger.info(f"Processing document: {self.full_path}")
 
-        text = ""
-        with open(self.full_path, "r", encoding="utf-8") as f:
-            text = f.read()
-
-        self.origin_text = text
-        self.modules = MdpGenerator.get_all_generators(text, self)
+        self.origin_text = self.text
+        self.modules = self.get_generators()
 
         self.write(check_for_new_content=check_for_new_content)
 
-    def get_generated_content(self):
-        s = ""
+        # The document is processed only once per run, so the buffers can be freed
+        self.release()
+
+    def render(self) -> Iterator[str]:
+        """Generate the content of the document part by part without writing it.
+        Documents with `skip_generating` are returned unchanged.
+
+        Yields
+        ------
+        str
+            The generated parts of the document in their order.
+        """
+        if self.skip_generating:
+            yield self.text
+            return
+
+        self.origin_text = self.text
+        self.modules = self.get_generators()
+        yield from self.iter_generated_content()
+
+    def iter_generated_content(self) -> Iterator[str]:
+        """Iterate the generated content of all modules of the document."""
         for module in self.modules:
             try:
-                s += module.get_entry()
+                yield module.get_entry()
             except Exception as e:
                 logger.error(f"Error in module {module.command}: {e}")
-                s += module.origin_text
+                yield module.origin_text
                 # raise e
 
-        return s
+    def get_generated_content(self):
+        return "".join(self.iter_generated_content())
 
     def write(self, file_path: str = None, check_for_new_content: bool = False):
         if file_path is None:
@@ -196,16 +293,26 @@ class GeneratedDocument(Document):
         content = self.get_generated_content()
 
         if check_for_new_content:
-            content_lines = content.strip().split("\n")
-            with open(file_path, "r", encoding="utf-8") as f:
-                old_content_lines = f.read().strip().split("\n")
-                no_changes = True
-                for i, line in enumerate(content_lines):
-                    if line.strip() != old_content_lines[i].strip():
-                        no_changes = False
-                        break
+            # Compare against the already read text, if we write to the origin file
+            if file_path == self.full_path and self.origin_text is not None:
+                old_content = self.origin_text
+            elif os.path.isfile(file_path):
+                with open(file_path, "r", encoding="utf-8") as f:
+                    old_content = f.read()
+            else:
+                old_content = None
+
+            if old_content is not None:
+                content_lines = content.strip().split("\n")
+                old_content_lines = old_content.strip().split("\n")
+                no_changes = len(content_lines) == len(old_content_lines)
+                if no_changes:
+                    for line, old_line in zip(content_lines, old_content_lines):
+                        if line.strip() != old_line.strip():
+                            no_changes = False
+                            break
 
-                if no_changes and len(content_lines) == len(old_content_lines):
+                if no_changes:
                     logger.debug(f"Skipping document: {file_path}")
                     return
 
@@ -213,5 +320,13 @@ class GeneratedDocument(Document):
         if self.workspace.is_pre_commit_hook:
             print("Fixing", file_path)
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
+        with self.workspace.measure("write", document=self.full_path):
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(content)
+
+        # Own writes should not be detected as changes of the workspace
+        self.workspace.update_modification_time(file_path)
+        # Generators never change the args of a document, so the parsed args stay valid for the written file
+        if file_path == self.full_path and self.args_mtime is not None:
+            self.args_mtime = os.stat(file_path).st_mtime_ns
+        self.workspace.events.emit("on_write", self, file_path)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+"""Version of the snapshot format, snapshots of other versions are ignored."""
+
+SNAPSHOT_FILE = "workspace.snapshot"
+"""File name of the snapshot in the cache directory of the workspace."""
+
+DirectoryListing = List[Tuple[str, bool]]
+"""Entries of a directory as (name, is_dir) tuples in the order of `os.listdir`, without hidden entries."""
+
+
+class WorkspaceSnapshot:
+    """
+    Snapshot of the walk of a workspace, so that a later run does not have to walk and parse the workspace again.
+
+    The snapshot stores the listing of every directory and the parsed args of the documents together with
+    the modification times. It is written as JSON, so that loading a snapshot never executes code,
+    and args that can not be stored as JSON are not stored at all.
+    Every entry is validated on its own, so that a changed directory or document only invalidates its own entry:
+    - A directory listing is valid as long as the modification time of the directory is unchanged,
+      since adding, removing or renaming entries changes it.
+    - Document args are valid as long as the modification time of the document is unchanged.
+    """
+
+    def __init__(self, root: str):
+        """Create a new empty snapshot.
+
+        Parameters
+        ----------
+        root : str
+            The absolute root path of the workspace.
+        """
+        self.root = root
+        """The root path of the workspace of the snapshot."""
+
+        self.directories: Dict[str, Tuple[int, DirectoryListing]] = dict()
+        """Modification time and listing per directory path."""
+
+        self.documents: Dict[str, Tuple[int, Dict[str, Any]]] = dict()
+        """Modification time and parsed args per document path."""
+
+    @staticmethod
+    def load(path: str, root: str) -> WorkspaceSnapshot | None:
+        """Load a snapshot from a file.
+
+        Parameters
+        ----------
+        path : str
+            The path of the snapshot file.
+        root : str
+            The absolute root path of the workspace, snapshots of other roots are ignored.
+
+        Returns
+        -------
+        WorkspaceSnapshot | None
+            The snapshot or None, if the file does not exist, is unreadable or belongs to another version or root.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Ignoring unreadable workspace snapshot {path}: {e}")
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+            logger.debug(f"Ignoring workspace snapshot {path} of another version")
+            return None
+        if data.get("root") != root:
+            return None
+
+        snapshot = WorkspaceSnapshot(root)
+        try:
+            for dir_path, (mtime, listing) in data["directories"].items():
+                snapshot.directories[dir_path] = (int(mtime), [(str(name), bool(is_dir)) for name, is_dir in listing])
+            for doc_path, (mtime, args) in data["documents"].items():
+                if not isinstance(args, dict):
+                    raise ValueError(f"Invalid args of {doc_path}")
+                snapshot.documents[doc_path] = (int(mtime), args)
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.debug(f"Ignoring invalid workspace snapshot {path}: {e}")
+            return None
+
+        return snapshot
+
+    def save(self, path: str):
+        """Save the snapshot to a file.
+        The file is replaced atomically, so that parallel runs never read half of a file.
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "root": self.root,
+            "directories": self.directories,
+            "documents": self.documents,
+        }
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def get_listing(self, path: str, mtime: int) -> DirectoryListing | None:
+        """Get the stored listing of a directory, if it is still valid for the given modification time."""
+        entry = self.directories.get(path)
+        if entry is None or entry[0] != mtime:
+            return None
+        return entry[1]
+
+    def get_args(self, path: str, mtime: int) -> Dict[str, Any] | None:
+        """Get the stored args of a document, if they are still valid for the given modification time."""
+        entry = self.documents.get(path)
+        if entry is None or entry[0] != mtime:
+            return None
+        return entry[1]
+
+    def set_args(self, path: str, mtime: int, args: Dict[str, Any]):
+        """Store the args of a document parsed at the given modification time.
+        Args with values that JSON does not restore unchanged, e.g. tuples, are skipped
+        and parsed again by the next run.
+        """
+        if _is_json_value(args):
+            self.documents[path] = (mtime, args)
+
+
+def _is_json_value(value: Any) -> bool:
+    """Check if a value is restored unchanged from JSON."""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return True
+    if isinstance(value, list):
+        return all(_is_json_value(v) for v in value)
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _is_json_value(v) for k, v in value.items())
+    return False
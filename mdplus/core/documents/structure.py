@@ -2,9 +2,18 @@ from __future__ import annotations
 import logging
 import os
 
+import contextlib
+
 from mdplus.core.documents.document import Document, GeneratedDocument
+from mdplus.core.documents.snapshot import DirectoryListing, WorkspaceSnapshot
 from mdplus.core.environments.base import MdpEnvironment
-from typing import Type, TypeVar
+from typing import TYPE_CHECKING, ContextManager, Type, TypeVar
+
+from mdplus.core.events import WorkspaceEvents
+from mdplus.util.hooks import HOOKS_FILE, Hooks
+
+if TYPE_CHECKING:
+    from mdplus.core.profiling import Profiler
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +23,9 @@ class Directory:
     A directory containing documents.
     """
 
-    def __init__(self, path: str, workspace: Workspace):
+    def __init__(
+        self, path: str, workspace: Workspace, recursive: bool = True, listing: DirectoryListing | None = None
+    ):
         """Initialize a new directory in the workspace.
 
         Parameters
@@ -23,6 +34,11 @@ class Directory:
             The absolute path of the directory.
         workspace : Workspace
             The parent workspace.
+        recursive : bool, optional
+            If False, subdirectories are not created, by default True.
+            Used by lazy workspaces, which create directories only on request.
+        listing : DirectoryListing | None, optional
+            The already known listing of the directory, by default it is listed with `Workspace.list_directory`.
         """
 
         self.path = path
@@ -34,6 +50,9 @@ class Directory:
         self.workspace = workspace
         """The parent workspace."""
 
+        self.recursive = recursive
+        """True if the subdirectories are parsed together with this directory."""
+
         # Store the directory in the workspace
         workspace.directory_map[path] = self
 
@@ -47,31 +66,42 @@ class Directory:
         """Documents in the directory."""
 
         # Parse the directory and create documents and subdirectories
-        self._parse()
+        self._parse(listing)
 
-    def _parse(self):
+    def _parse(self, listing: DirectoryListing | None = None):
         """Parse the directory and create documents and subdirectories."""
 
         logger.debug(f"Parsing directory {self.path}")
+        self.workspace.events.emit("on_scan_dir", self)
 
         self.directories.clear()
         self.documents.clear()
 
-        for file in os.listdir(self.path):
+        if listing is None:
+            listing = self.workspace.list_directory(self.path)
 
-            # We ignore hidden files and directories
-            if file.startswith("."):  # or file.startswith("_"):
-                continue
+        # With a snapshot, the listing of a subdirectory is needed anyway to check for MDP_IGNORE,
+        # so it is passed on to the subdirectory instead of listing it twice
+        use_listings = self.workspace.snapshot_path is not None
 
+        for file, is_dir in listing:
             file_path = os.path.join(self.path, file)
 
-            if os.path.isdir(file_path):
+            if is_dir:
+                sub_listing = self.workspace.list_directory(file_path) if use_listings else None
+
                 # Check, if the dir has a MDP_IGNORE file and should be ignored
-                if os.path.isfile(os.path.join(file_path, "MDP_IGNORE")):
+                if (
+                    ("MDP_IGNORE", False) in sub_listing
+                    if sub_listing is not None
+                    else os.path.isfile(os.path.join(file_path, "MDP_IGNORE"))
+                ):
                     logger.debug(f"Ignoring {file_path} because of MDP_IGNORE file")
+                    self.workspace.events.emit("on_prune_dir", file_path)
                     continue
 
-                self.directories.append(Directory(file_path, self.workspace))
+                if self.recursive:
+                    self.directories.append(Directory(file_path, self.workspace, listing=sub_listing))
             else:
                 doc: Document = Document.from_file(file_path, self.workspace)
                 self.documents.append(doc)
@@ -82,28 +112,67 @@ class Directory:
                     self.readme = doc
 
 
+def _list_directory(path: str) -> DirectoryListing:
+    # We ignore hidden files and directories
+    return [(name, os.path.isdir(os.path.join(path, name))) for name in os.listdir(path) if not name.startswith(".")]
+
+
 T = TypeVar("T", bound=MdpEnvironment)
 
+_NO_MEASUREMENT = contextlib.nullcontext()
+
 
 class Workspace:
     """
     The workspace containing all markdown plus files.
     """
 
-    def __init__(self, root: str):
+    def __init__(
+        self,
+        root: str,
+        lazy: bool = False,
+        profiler: Profiler | None = None,
+        events: WorkspaceEvents | None = None,
+        snapshot_path: str | None = None,
+    ):
         """Initialize a new workspace.
 
         Parameters
         ----------
         root : str
             Root path of the workspace.
+        lazy : bool, optional
+            If True, only the root directory is parsed at the beginning, by default False.
+            Other directories and documents are created, when they are requested with `get_directory` or `get_document`.
+            Use this, if only single documents should be processed.
+        profiler : Profiler | None, optional
+            Profiler recording the time of the stages of the run, by default None.
+        events : WorkspaceEvents | None, optional
+            Event bus with already registered listeners, by default a new event bus.
+            Pass it to receive the events emitted while the workspace is created, e.g. `on_scan_dir`.
+        snapshot_path : str | None, optional
+            Path of a `WorkspaceSnapshot` of a previous run, by default None.
+            If given, unchanged directory listings and document args are taken from the snapshot
+            and `save_snapshot()` stores the state of this run for the next one.
         """
 
         self.is_pre_commit_hook = False
 
+        # Use absolute paths, so that the keys of the directory and document maps are unique
+        root = os.path.abspath(root)
+
         self.root_path = root
         """The root path of the workspace."""
 
+        self.lazy = lazy
+        """True if directories are only parsed on request."""
+
+        self.profiler = profiler
+        """Profiler recording the time of the stages, None if profiling is disabled."""
+
+        self.events = events if events is not None else WorkspaceEvents()
+        """Event bus of the workspace, see `WorkspaceEvents` for the available events."""
+
         self.environments: dict[str, MdpEnvironment] = dict()
         """
         The environments of the workspace.
@@ -119,7 +188,26 @@ class Workspace:
         self.generated_documents: list[GeneratedDocument] = list()
         """List of all generated documents in the workspace."""
 
-        self.root_dir = Directory(root, self)
+        self._modification_times: dict[str, int | None] | None = None
+        """Modification times of all directories and documents, if the workspace tracks changes via `refresh()`."""
+
+        self.snapshot_path = snapshot_path
+        """Path of the snapshot file, None if the workspace does not use a snapshot."""
+
+        self.snapshot: WorkspaceSnapshot | None = None
+        """The snapshot of the previous run, None if there is none or it could not be loaded."""
+        if snapshot_path is not None:
+            with self.measure("snapshot", "load"):
+                self.snapshot = WorkspaceSnapshot.load(snapshot_path, root)
+
+        self._hooks: Hooks | None = None
+        """The hooks registry, created on first access of `hooks`."""
+
+        self._listings: dict[str, tuple[int, DirectoryListing]] = dict()
+        """Modification time and listing of the walked directories, only recorded if a snapshot is used."""
+
+        with self.measure("walk", root):
+            self.root_dir = Directory(root, self, recursive=not lazy)
         """The root directory object of the workspace."""
 
         self.top_level_readme: Document | None = self.root_dir.readme
@@ -131,11 +219,150 @@ class Workspace:
                 if len(doc.args) > 0:
                     logger.debug(f"\tArgs: {doc.args}")
 
+    def measure(self, stage: str, name: str = "", document: str | None = None) -> ContextManager:
+        """Measure the time of the enclosed block with the profiler of the workspace, if profiling is enabled.
+
+        Parameters
+        ----------
+        stage : str
+            The stage of the run, e.g. "walk", "document", "environment", "split", "import", "content", "adapt_header_level",
+            "subprocess", "snapshot" or "write".
+        name : str, optional
+            The name of the measured item, e.g. the command of a generator, by default "".
+        document : str | None, optional
+            The path of the document the block belongs to, by default None.
+        """
+        if self.profiler is None:
+            return _NO_MEASUREMENT
+        return self.profiler.measure(stage, name, document)
+
+    @property
+    def hooks(self) -> Hooks:
+        """The hooks of the workspace from `docs/HOOKS.md`, shared by all generators.
+        The file is parsed on the first lookup and checked for changes again after each `refresh()`.
+        """
+        if self._hooks is None:
+            self._hooks = Hooks(os.path.join(self.root_path, HOOKS_FILE), self.events)
+        return self._hooks
+
     @property
     def documents(self):
         """All documents in the workspace."""
         return self.document_map.values()
 
+    def list_directory(self, path: str) -> DirectoryListing:
+        """List the entries of a directory without hidden entries.
+        If a snapshot is used, the listing is taken from it as long as the directory did not change.
+        """
+        if self.snapshot_path is None:
+            return _list_directory(path)
+
+        # The time is taken before listing, so that changes during the listing invalidate it in the next run
+        mtime = os.stat(path).st_mtime_ns
+        listing = self.snapshot.get_listing(path, mtime) if self.snapshot is not None else None
+        if listing is not None:
+            self.events.emit("on_cache_hit", "snapshot", path)
+        else:
+            self.events.emit("on_cache_miss", "snapshot", path)
+            listing = _list_directory(path)
+
+        self._listings[path] = (mtime, listing)
+        return listing
+
+    def get_snapshot_args(self, path: str, mtime: int) -> dict[str, any] | None:
+        """Get the args of a document from the snapshot, None if there is no snapshot or the document changed."""
+        if self.snapshot is None:
+            return None
+
+        args = self.snapshot.get_args(path, mtime)
+        self.events.emit("on_cache_hit" if args is not None else "on_cache_miss", "snapshot", path)
+        return args
+
+    def save_snapshot(self):
+        """Save the directory listings and the parsed document args for the next run, if a snapshot path is set.
+        Both are stored with the modification times taken when they were listed and parsed.
+        """
+        if self.snapshot_path is None:
+            return
+
+        with self.measure("snapshot", "save"):
+            snapshot = WorkspaceSnapshot(self.root_path)
+            for path, entry in self._listings.items():
+                if path in self.directory_map:
+                    snapshot.directories[path] = entry
+
+            for path, doc in self.document_map.items():
+                if doc.parsed_args is not None and doc.args_mtime is not None:
+                    snapshot.set_args(path, doc.args_mtime, doc.parsed_args)
+
+            snapshot.save(self.snapshot_path)
+
+    def get_directory(self, path: str) -> Directory | None:
+        """Get a directory of the workspace.
+        In a lazy workspace, the directory is created if it exists and is not ignored.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path of the directory.
+
+        Returns
+        -------
+        Directory | None
+            The directory or None, if the directory is not part of the workspace.
+        """
+        path = os.path.abspath(path)
+        if path in self.directory_map or not self.lazy:
+            return self.directory_map.get(path, None)
+
+        if not os.path.isdir(path) or self.is_ignored(path):
+            return None
+
+        with self.measure("walk", path):
+            return Directory(path, self, recursive=False)
+
+    def get_document(self, path: str) -> Document | None:
+        """Get a document of the workspace.
+        In a lazy workspace, the parent directory of the document is created if needed.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path of the document.
+
+        Returns
+        -------
+        Document | None
+            The document or None, if the document is not part of the workspace.
+        """
+        path = os.path.abspath(path)
+        if path not in self.document_map and self.lazy:
+            self.get_directory(os.path.dirname(path))
+
+        return self.document_map.get(path, None)
+
+    def is_ignored(self, path: str) -> bool:
+        """Check if a path is excluded from the workspace in the same way the directory walk excludes it:
+        it is outside of the root, hidden, or inside a directory containing a MDP_IGNORE file.
+        """
+        relative = os.path.relpath(os.path.abspath(path), self.root_path)
+        if relative == ".":
+            return False
+
+        parts = relative.split(os.sep)
+        if parts[0] == "..":
+            return True
+
+        current = self.root_path
+        for part in parts:
+            if part.startswith("."):
+                return True
+            current = os.path.join(current, part)
+            if os.path.isfile(os.path.join(current, "MDP_IGNORE")):
+                return True
+
+        return False
+
     def get_environment(self, name: str, env_class: Type[T] = MdpEnvironment) -> T:
         """Get an environment by name. If the environment does not exist, it will be created.
 
@@ -151,18 +378,153 @@ class Workspace:
         T
             The environment.
         """
-        if name not in self.environments:
-            self.environments[name] = env_class(self, name)
-        return self.environments[name]
+        if name in self.environments:
+            self.events.emit("on_cache_hit", "environment", name)
+            return self.environments[name]
+
+        self.events.emit("on_cache_miss", "environment", name)
+        with self.measure("environment", name):
+            environment = env_class(self, name)
+        self.environments[name] = environment
+        self.events.emit("on_environment_built", environment)
+        return environment
+
+    def get_modification_times(self) -> dict[str, int | None]:
+        """Get the modification times of all directories and documents in the workspace.
+        Paths that do not exist anymore are mapped to None.
+        """
+        times: dict[str, int | None] = dict()
+        for path in [*self.directory_map.keys(), *self.document_map.keys()]:
+            try:
+                times[path] = os.stat(path).st_mtime_ns
+            except OSError:
+                times[path] = None
+        return times
+
+    def update_modification_time(self, path: str):
+        """Update the stored modification time of a path, so that own changes are not detected by `refresh()`."""
+        if self._modification_times is not None and path in self._modification_times:
+            self._modification_times[path] = os.stat(path).st_mtime_ns
+
+    def refresh(self) -> bool:
+        """Update the workspace with the changes on disk since the last call.
+        The first call only starts tracking the modification times.
+
+        Directories with added or removed entries are parsed again, documents with changed content lose their cached args.
+        Environments are dropped, if a changed, added or removed file is relevant for them.
+        The hooks file is checked for changes again on the next lookup of a hook.
 
-    def process(self, check_for_new_content: bool = False):
+        Returns
+        -------
+        bool
+            True if the workspace changed since the last call.
+        """
+        if self._hooks is not None:
+            self._hooks.invalidate()
+
+        times = self.get_modification_times()
+        if self._modification_times is None:
+            self._modification_times = times
+            return False
+
+        changed = [path for path, time in times.items() if self._modification_times.get(path) != time]
+        if len(changed) == 0:
+            return False
+
+        logger.debug(f"Refreshing workspace, {len(changed)} changed paths")
+
+        changed_dirs = [path for path in changed if path in self.directory_map and times[path] is not None]
+        for path in changed:
+            if path in self.document_map:
+                self.document_map[path].reset()
+
+        # Parse changed directories again, subdirectories are parsed with their parent
+        changed_dirs.sort()
+        parsed: list[str] = []
+        for path in changed_dirs:
+            if any(path.startswith(p + os.sep) for p in parsed):
+                continue
+            with self.measure("walk", path):
+                self.directory_map[path]._parse()
+            parsed.append(path)
+
+        self._rebuild_maps()
+        previous_times = self._modification_times
+        self._modification_times = self.get_modification_times()
+
+        # Added entries only change the modification time of their directory, so they are checked on their own
+        paths = [path for path in changed if path not in self.directory_map or times[path] is None]
+        paths.extend(path for path in self._modification_times if path not in previous_times)
+        for name, environment in list(self.environments.items()):
+            if any(environment.is_relevant_path(path, self.root_path) for path in paths):
+                logger.debug(f"Dropping environment {name}")
+                del self.environments[name]
+
+        return True
+
+    def _rebuild_maps(self):
+        """Rebuild the directory and document maps from the directory tree."""
+        self.directory_map.clear()
+        self.document_map.clear()
+        self.generated_documents.clear()
+
+        directories = [self.root_dir]
+        while len(directories) > 0:
+            directory = directories.pop(0)
+            self.directory_map[directory.path] = directory
+            for doc in directory.documents:
+                self.document_map[doc.full_path] = doc
+                if isinstance(doc, GeneratedDocument):
+                    self.generated_documents.append(doc)
+            directories.extend(directory.directories)
+
+        self.top_level_readme = self.root_dir.readme
+
+    def get_dependent_documents(self, paths: list[str]) -> list[GeneratedDocument]:
+        """Get the generated documents that need to be generated again, if the given files changed.
+
+        Parameters
+        ----------
+        paths : list[str]
+            The changed (added, modified or deleted) files.
+
+        Returns
+        -------
+        list[GeneratedDocument]
+            The generated documents depending on any of the paths.
+        """
+        paths = [os.path.abspath(path) for path in paths]
+
+        documents = []
+        for doc in self.generated_documents:
+            if doc.depends_on(paths):
+                logger.debug(f"{doc.full_path} depends on the changed files")
+                documents.append(doc)
+            else:
+                doc.release()
+
+        return documents
+
+    def process(self, check_for_new_content: bool = False, documents: list[GeneratedDocument] | None = None):
         """Process all documents in the workspace.
 
         Parameters
         ----------
         check_for_new_content : bool, optional
             If True, the workspace will check for new content in the written documents before writing them, by default False.
+        documents : list[GeneratedDocument] | None, optional
+            Only process the given documents instead of all generated documents, by default None.
         """
 
-        for doc in self.generated_documents:
-            doc.process(check_for_new_content)
+        if documents is None:
+            documents = self.generated_documents
+
+        for doc in documents:
+            self.events.emit("on_document_start", doc)
+            with self.measure("document", document=doc.full_path):
+                doc.process(check_for_new_content)
+            self.events.emit("on_document_end", doc)
+
+        if self._hooks is not None and len(self._hooks.hits) > 0:
+            hits = ", ".join(f"{name} ({count}x)" for name, count in sorted(self._hooks.hits.items()))
+            logger.debug(f"Applied hooks: {hits}")
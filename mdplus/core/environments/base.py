@@ -29,3 +29,10 @@ class MdpEnvironment:
         """
         self.workspace = workspace
         self.name = name
+
+    @staticmethod
+    def is_relevant_path(path: str, root: str) -> bool:
+        """Check if a change of the given path might change the environment for the workspace at root.
+        The environment is built again after such a change. By default every path is relevant.
+        """
+        return True
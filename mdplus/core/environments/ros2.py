@@ -1,5 +1,10 @@
+import os
+
 from mdplus.core.environments.base import MdpEnvironment
-from mdplus.util.parser.ros2_parser import Package
+from mdplus.util.parser.ros2_parser import InterfaceIndex, Package
+
+PACKAGE_FILES = ["package.xml", "setup.py", "setup.cfg", "CMakeLists.txt", "COLCON_IGNORE"]
+"""Files defining ROS 2 packages or excluding them from the workspace."""
 
 
 class Ros2Environment(MdpEnvironment):
@@ -12,3 +17,24 @@ class Ros2Environment(MdpEnvironment):
 
         self.packages = Package.getPackages(self.workspace.root_path)
         """ROS 2 packages found in the workspace."""
+
+        self.interfaces = InterfaceIndex(self.packages)
+        """Message, service and action types of all packages by their `pkg/Type` key."""
+
+    @staticmethod
+    def is_relevant_path(path: str, root: str) -> bool:
+        """Check if a change of the given path might change the ROS 2 packages parsed for the workspace at root.
+        This is the case for files defining packages and for all files inside of packages.
+        """
+        if os.path.basename(path) in PACKAGE_FILES:
+            return True
+
+        current = os.path.dirname(path)
+        while current == root or current.startswith(root + os.sep):
+            if os.path.isdir(current) and Package.isPackage(current):
+                return True
+            if current == root:
+                break
+            current = os.path.dirname(current)
+
+        return False
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class WorkspaceEvents:
+    """
+    Event bus of a workspace, used to attach instrumentation like metrics, progress output or custom logging.
+
+    Listeners are registered with `subscribe(event, listener)` and called with the arguments of the event:
+    - `on_scan_dir(directory: Directory)`: A directory is scanned for documents and subdirectories.
+    - `on_prune_dir(path: str)`: A directory is skipped, because it contains a MDP_IGNORE file.
+    - `on_document_start(document: GeneratedDocument)`: The processing of a document starts.
+    - `on_document_end(document: GeneratedDocument)`: The processing of a document is finished.
+    - `on_read(document: Document, size: int)`: The text of a document with size bytes was read.
+    - `on_generator_start(generator: MdpGenerator)`: A generator starts to generate its content.
+        The command and the arguments are available as `generator.command` and `generator.arguments`.
+    - `on_generator_end(generator: MdpGenerator, content: str | None)`: A generator is finished.
+        The content is None, if the generator failed.
+    - `on_environment_built(environment: MdpEnvironment)`: An environment was created.
+    - `on_cache_hit(cache: str, key: str)` and `on_cache_miss(cache: str, key: str)`: A cache was queried.
+    - `on_write(document: GeneratedDocument, path: str)`: A generated document was written to path.
+
+    Events without listeners only cost a dictionary lookup, so the events can be emitted unconditionally.
+    Exceptions of listeners are logged and do not abort the run.
+    """
+
+    EVENTS = [
+        "on_scan_dir",
+        "on_prune_dir",
+        "on_document_start",
+        "on_document_end",
+        "on_read",
+        "on_generator_start",
+        "on_generator_end",
+        "on_environment_built",
+        "on_cache_hit",
+        "on_cache_miss",
+        "on_write",
+    ]
+    """Names of all events emitted by the workspace."""
+
+    def __init__(self):
+        self._listeners: dict[str, list[Callable[..., Any]]] = dict()
+
+    def subscribe(self, event: str, listener: Callable[..., Any]) -> Callable[..., Any]:
+        """Register a listener for an event.
+
+        Parameters
+        ----------
+        event : str
+            The name of the event, one of `WorkspaceEvents.EVENTS`.
+        listener : Callable[..., Any]
+            The function called with the arguments of the event.
+
+        Returns
+        -------
+        Callable[..., Any]
+            The listener, so that it can be passed to `unsubscribe` later.
+
+        Raises
+        ------
+        ValueError
+            If the event is unknown.
+        """
+        if event not in self.EVENTS:
+            raise ValueError(f"Unknown event {event}, available events are: {', '.join(self.EVENTS)}")
+
+        self._listeners.setdefault(event, list()).append(listener)
+        return listener
+
+    def unsubscribe(self, event: str, listener: Callable[..., Any]):
+        """Remove a registered listener of an event."""
+        listeners = self._listeners.get(event)
+        if listeners is not None and listener in listeners:
+            listeners.remove(listener)
+            if len(listeners) == 0:
+                del self._listeners[event]
+
+    def has_listeners(self, event: str) -> bool:
+        """Check if an event has listeners, e.g. to skip expensive preparation of event arguments."""
+        return event in self._listeners
+
+    def emit(self, event: str, *args: Any):
+        """Call all listeners of an event with the given arguments."""
+        listeners = self._listeners.get(event)
+        if listeners is None:
+            return
+
+        # Copy the listeners, so that listeners can unsubscribe themselves
+        for listener in list(listeners):
+            try:
+                listener(*args)
+            except Exception as e:
+                logger.error(f"Error in listener {listener} for {event}: {e}")
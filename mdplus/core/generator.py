@@ -106,6 +106,23 @@ class MdpGenerator(ABC):
         """
         return True
 
+    def depends_on(self, path: str) -> bool:
+        """Check if the generated content depends on the given file or directory, besides the document itself.
+        Used to find the documents that need to be generated again after files changed, e.g. for `mdplus parse --staged`.
+        Override this method, if your generator reads other files of the workspace.
+
+        Parameters
+        ----------
+        path : str
+            The absolute path of the changed (added, modified or deleted) file.
+
+        Returns
+        -------
+        bool
+            True if a change of the path might change the generated content.
+        """
+        return False
+
     def get_arg(self, name: str, default=None):
         """Get the value of an argument by name."""
         a = self.arguments.get(name, default)
@@ -149,9 +166,20 @@ class MdpGenerator(ABC):
 
         logger.info("Generating entry for %s", self.command)
 
-        # Adapt the header level
-        content = self.get_content()
-        content = adapt_header_level(content, self.arg_level - 1)
+        events = self.workspace.events
+        events.emit("on_generator_start", self)
+
+        content = None
+        document_path = self.document.full_path
+        try:
+            with self.workspace.measure("content", self.command, document_path):
+                content = self.get_content()
+
+            # Adapt the header level
+            with self.workspace.measure("adapt_header_level", self.command, document_path):
+                content = adapt_header_level(content, self.arg_level - 1)
+        finally:
+            events.emit("on_generator_end", self, content)
 
         return "\n".join([self.start_tag, content, self.end_tag])
 
@@ -183,9 +211,16 @@ class MdpGenerator(ABC):
         """
         modules: list[MdpGenerator] = []
 
+        # Commands mapped to the position from which their end tag was not found.
+        # If an end tag is missing after a position, it is missing after every later position as well,
+        # so blocks without end tags do not scan the rest of the text again and again.
+        missing_end_tags: dict[str, int] = dict()
+
+        search_end = MdpBlock.get_search_end(text, document.comment_definition)
+
         start = 0
         while True:
-            match = document.mdp_pattern.search(text, start)
+            match = document.mdp_pattern.search(text, start, search_end)
             if match is None:
                 # Add final NoChangeModule
                 if start < len(text):
@@ -200,7 +235,10 @@ class MdpGenerator(ABC):
             if command.upper() in MdpGenerator.IGNORED_COMMANDS:
                 module_cls = None
             else:
-                module_cls = ModuleImporter.get_module(command)
+                cache_event = "on_cache_hit" if command in ModuleImporter.modules else "on_cache_miss"
+                document.workspace.events.emit(cache_event, "generator", command)
+                with document.workspace.measure("import", command):
+                    module_cls = ModuleImporter.get_module(command)
                 if ("IGNORE" in mdp_block.arguments) and (mdp_block.arguments["IGNORE"]):
                     module_cls = None
 
@@ -218,8 +256,12 @@ class MdpGenerator(ABC):
                 # Find end tag for that module and continue search
                 start = match.end()
                 end_pattern = module.fin_pattern
-                match = end_pattern.search(text, start)
+                if command in missing_end_tags and missing_end_tags[command] <= start:
+                    match = None
+                else:
+                    match = end_pattern.search(text, start)
                 if match is None:
+                    missing_end_tags.setdefault(command, start)
                     logger.warning(f"End tag for {command} not found")
                 else:
                     tag_end = match.end()
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+import time
+import tracemalloc
+
+from typing import Iterator
+
+
+class ProfileSpan:
+    """A measured stage of a run."""
+
+    def __init__(self, stage: str, name: str, document: str | None, start: float, thread_id: int):
+        self.stage = stage
+        """The stage, e.g. "walk", "document", "environment", "split", "import", "content", "adapt_header_level",
+        "subprocess", "snapshot" or "write"."""
+
+        self.name = name
+        """The name of the measured item, e.g. the command of a generator or the name of an environment."""
+
+        self.document = document
+        """The path of the document the span belongs to, if any."""
+
+        self.start = start
+        """Start of the span in seconds since the start of the profiler."""
+
+        self.thread_id = thread_id
+        """Id of the thread the span was recorded in."""
+
+        self.wall = 0.0
+        """Wall time of the span in seconds, including the child spans."""
+
+        self.cpu = 0.0
+        """CPU time of the span in seconds, including the child spans."""
+
+        self.self_wall = 0.0
+        """Wall time of the span in seconds, excluding the child spans."""
+
+        self.self_cpu = 0.0
+        """CPU time of the span in seconds, excluding the child spans."""
+
+
+class Profiler:
+    """
+    Records wall and CPU time of the stages of a run.
+    Spans can be nested, the summaries use the exclusive times of the spans, so that nested stages are not counted twice.
+    """
+
+    def __init__(self):
+        self.spans: list[ProfileSpan] = list()
+        """All finished spans in the order they were finished."""
+
+        self.start = time.perf_counter()
+        """Start of the profiler as `time.perf_counter()` value."""
+
+        self._local = threading.local()
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, name: str = "", document: str | None = None) -> Iterator[ProfileSpan]:
+        """Measure the wall and CPU time of the enclosed block.
+
+        Parameters
+        ----------
+        stage : str
+            The stage of the run.
+        name : str, optional
+            The name of the measured item, by default "".
+        document : str | None, optional
+            The path of the document the block belongs to, by default None.
+        """
+        stack: list[list[float]] = self._local.__dict__.setdefault("stack", [])
+
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        span = ProfileSpan(stage, name, document, start_wall - self.start, threading.get_ident())
+
+        # Accumulated [wall, cpu] of the child spans
+        children = [0.0, 0.0]
+        stack.append(children)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.wall = time.perf_counter() - start_wall
+            span.cpu = time.thread_time() - start_cpu
+            span.self_wall = span.wall - children[0]
+            span.self_cpu = span.cpu - children[1]
+
+            if len(stack) > 0:
+                stack[-1][0] += span.wall
+                stack[-1][1] += span.cpu
+
+            self.spans.append(span)
+
+    def get_summary(self) -> list[dict[str, str | int | float]]:
+        """Get the exclusive times per stage and name, sorted by wall time."""
+        summary: dict[tuple[str, str], dict[str, str | int | float]] = dict()
+        for span in self.spans:
+            entry = summary.setdefault(
+                (span.stage, span.name),
+                {"stage": span.stage, "name": span.name, "calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0},
+            )
+            entry["calls"] += 1
+            entry["wall_ms"] += span.self_wall * 1000
+            entry["cpu_ms"] += span.self_cpu * 1000
+
+        return sorted(summary.values(), key=lambda e: e["wall_ms"], reverse=True)
+
+    def get_document_summary(self) -> list[dict[str, str | int | float]]:
+        """Get the exclusive times of all spans belonging to a document per document, sorted by wall time."""
+        summary: dict[str, dict[str, str | int | float]] = dict()
+        for span in self.spans:
+            if span.document is None:
+                continue
+            entry = summary.setdefault(span.document, {"document": span.document, "wall_ms": 0.0, "cpu_ms": 0.0})
+            entry["wall_ms"] += span.self_wall * 1000
+            entry["cpu_ms"] += span.self_cpu * 1000
+
+        return sorted(summary.values(), key=lambda e: e["wall_ms"], reverse=True)
+
+    def get_report(self) -> dict:
+        """Get a JSON serializable report with stable ordering, so that reports of different runs can be diffed."""
+
+        def rounded(entries: list[dict]) -> list[dict]:
+            return [{k: round(v, 3) if isinstance(v, float) else v for k, v in e.items()} for e in entries]
+
+        stages = sorted(self.get_summary(), key=lambda e: (e["stage"], e["name"]))
+        documents = sorted(self.get_document_summary(), key=lambda e: e["document"])
+
+        return {
+            "wall_ms": round((time.perf_counter() - self.start) * 1000, 3),
+            "stages": rounded(stages),
+            "documents": rounded(documents),
+        }
+
+    def get_trace(self) -> dict:
+        """Get the spans as Chrome trace events, which can be opened in chrome://tracing or https://ui.perfetto.dev.
+        Every thread gets its own track, so that parallel workers can be told apart.
+        """
+        pid = os.getpid()
+        thread_ids: dict[int, int] = dict()
+        events = list()
+
+        for span in sorted(self.spans, key=lambda s: s.start):
+            # Use small, stable worker ids instead of the thread identifiers
+            tid = thread_ids.setdefault(span.thread_id, len(thread_ids))
+
+            args = {"cpu_ms": round(span.cpu * 1000, 3)}
+            if span.document is not None:
+                args["document"] = span.document
+
+            events.append(
+                {
+                    "name": span.name or (span.document if span.stage == "document" else span.stage),
+                    "cat": span.stage,
+                    "ph": "X",
+                    "ts": round(span.start * 1e6, 3),
+                    "dur": round(span.wall * 1e6, 3),
+                    "pid": pid,
+                    "tid": tid,
+                    "args": args,
+                }
+            )
+
+        for thread_id, tid in thread_ids.items():
+            name = "main" if thread_id == threading.main_thread().ident else f"worker {tid}"
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "mdplus"}})
+
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+class MemoryProfiler:
+    """
+    Records the memory allocations of a run with tracemalloc.
+    The peak memory is recorded per phase, the allocation sites are taken from a snapshot at the end of the run,
+    so they show the memory that is still retained, e.g. by cached document texts.
+    """
+
+    def __init__(self, max_frames: int = 32):
+        """Create a new memory profiler.
+
+        Parameters
+        ----------
+        max_frames : int, optional
+            Maximum number of frames stored per allocation, by default 32.
+            More frames give more complete stacks at the cost of a slower run.
+        """
+        self.max_frames = max_frames
+        """Maximum number of frames stored per allocation."""
+
+        self.phases: list[dict[str, str | float]] = list()
+        """The measured phases with their name, the allocated and the peak memory in KiB."""
+
+        self.snapshot: tracemalloc.Snapshot | None = None
+        """Snapshot of the allocations taken by `stop()`."""
+
+    def start(self):
+        """Start tracing the memory allocations."""
+        tracemalloc.start(self.max_frames)
+
+    def stop(self):
+        """Take the final snapshot and stop tracing."""
+        # Ignore the allocations of the profilers themselves
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "*/cProfile.py"),
+        ]
+        self.snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the allocated and the peak memory of the enclosed block."""
+        start, _ = tracemalloc.get_traced_memory()
+        # The peak can only be reset with Python >= 3.9, before that the peak is the peak since start()
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.phases.append(
+                {"phase": name, "allocated_kib": (current - start) / 1024, "peak_kib": (peak - start) / 1024}
+            )
+
+    def get_top_allocations(self, limit: int = 10) -> list[dict[str, str | int | float]]:
+        """Get the source lines with the most retained memory."""
+        if self.snapshot is None:
+            return list()
+
+        entries = list()
+        for stat in self.snapshot.statistics("lineno")[:limit]:
+            frame = stat.traceback[0]
+            site = f"{frame.filename}:{frame.lineno}"
+            entries.append({"site": site, "count": stat.count, "size_kib": stat.size / 1024})
+        return entries
+
+    def get_collapsed_stacks(self) -> list[str]:
+        """Get the retained memory as collapsed stacks, one "frame;frame;... bytes" line per stack.
+        The format can be read by flamegraph tools like flamegraph.pl, inferno or speedscope.
+        """
+        if self.snapshot is None:
+            return list()
+
+        stacks: dict[str, int] = dict()
+        for stat in self.snapshot.statistics("traceback"):
+            # Tracebacks are sorted from the oldest frame, like collapsed stacks
+            frames = [f"{os.path.basename(f.filename)}:{f.lineno}" for f in stat.traceback]
+            key = ";".join(frames)
+            stacks[key] = stacks.get(key, 0) + stat.size
+
+        return [f"{stack} {size}" for stack, size in sorted(stacks.items())]
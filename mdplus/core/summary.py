@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import os
+import time
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mdplus.core.documents.document import Document, GeneratedDocument
+    from mdplus.core.documents.structure import Directory, Workspace
+    from mdplus.core.events import WorkspaceEvents
+    from mdplus.core.generator import MdpGenerator
+    from mdplus.core.profiling import Profiler
+
+
+class RunSummary:
+    """
+    Counts what happens during a run by listening to the events of a workspace.
+    The counters are machine readable, e.g. for dashboards tracking the runs over time.
+    """
+
+    def __init__(self, events: WorkspaceEvents):
+        """Create a new summary and subscribe to the given event bus.
+
+        Parameters
+        ----------
+        events : WorkspaceEvents
+            The event bus of the workspace, pass it to the workspace to include the initial scan.
+        """
+        self.start = time.perf_counter()
+        """Start of the run as `time.perf_counter()` value."""
+
+        self.dirs_scanned = 0
+        """Number of scanned directories."""
+
+        self.dirs_pruned = 0
+        """Number of directories skipped because of a MDP_IGNORE file."""
+
+        self.documents_processed = 0
+        """Number of processed generated documents."""
+
+        self.documents_skipped = 0
+        """Number of processed documents skipped because of `skip_generating`."""
+
+        self.blocks: dict[str, int] = dict()
+        """Number of rendered blocks per generator command."""
+
+        self.cache_hits: dict[str, int] = dict()
+        """Number of cache hits per cache."""
+
+        self.cache_misses: dict[str, int] = dict()
+        """Number of cache misses per cache."""
+
+        self.bytes_read = 0
+        """Number of bytes of all read documents."""
+
+        self.bytes_written = 0
+        """Number of bytes of all written documents."""
+
+        self.files_changed: list[str] = list()
+        """Paths of all written documents."""
+
+        events.subscribe("on_scan_dir", self._on_scan_dir)
+        events.subscribe("on_prune_dir", self._on_prune_dir)
+        events.subscribe("on_document_start", self._on_document_start)
+        events.subscribe("on_read", self._on_read)
+        events.subscribe("on_generator_start", self._on_generator_start)
+        events.subscribe("on_cache_hit", self._on_cache_hit)
+        events.subscribe("on_cache_miss", self._on_cache_miss)
+        events.subscribe("on_write", self._on_write)
+
+    def _on_scan_dir(self, directory: Directory):
+        self.dirs_scanned += 1
+
+    def _on_prune_dir(self, path: str):
+        self.dirs_pruned += 1
+
+    def _on_document_start(self, document: GeneratedDocument):
+        self.documents_processed += 1
+        if document.skip_generating:
+            self.documents_skipped += 1
+
+    def _on_read(self, document: Document, size: int):
+        self.bytes_read += size
+
+    def _on_generator_start(self, generator: MdpGenerator):
+        self.blocks[generator.command] = self.blocks.get(generator.command, 0) + 1
+
+    def _on_cache_hit(self, cache: str, key: str):
+        self.cache_hits[cache] = self.cache_hits.get(cache, 0) + 1
+
+    def _on_cache_miss(self, cache: str, key: str):
+        self.cache_misses[cache] = self.cache_misses.get(cache, 0) + 1
+
+    def _on_write(self, document: GeneratedDocument, path: str):
+        self.bytes_written += os.path.getsize(path)
+        self.files_changed.append(path)
+
+    def get_summary(self, root: str, workspace: Workspace | None, profiler: Profiler | None = None) -> dict:
+        """Get the JSON serializable summary of the run.
+
+        Parameters
+        ----------
+        root : str
+            The root directory of the run, the changed files are given relative to it.
+        workspace : Workspace | None
+            The processed workspace, None if the run stopped before the workspace was created.
+        profiler : Profiler | None, optional
+            The profiler of the run, used for the elapsed time per phase, by default None.
+        """
+        summary = {
+            "root": root,
+            "files_scanned": len(workspace.document_map) if workspace is not None else 0,
+            "dirs_scanned": self.dirs_scanned,
+            "dirs_pruned": self.dirs_pruned,
+            "generated_documents": len(workspace.generated_documents) if workspace is not None else 0,
+            "documents_processed": self.documents_processed,
+            "documents_skipped": self.documents_skipped,
+            "blocks": dict(sorted(self.blocks.items())),
+            "cache_hits": dict(sorted(self.cache_hits.items())),
+            "cache_misses": dict(sorted(self.cache_misses.items())),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "files_changed": [os.path.relpath(path, root) for path in self.files_changed],
+            "elapsed_ms": round((time.perf_counter() - self.start) * 1000, 3),
+        }
+
+        if profiler is not None:
+            phases: dict[str, float] = dict()
+            for entry in profiler.get_summary():
+                phases[entry["stage"]] = phases.get(entry["stage"], 0.0) + entry["wall_ms"]
+            summary["phases_ms"] = {stage: round(ms, 3) for stage, ms in sorted(phases.items())}
+
+        return summary
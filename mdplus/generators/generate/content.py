@@ -3,10 +3,8 @@ import os
 import logging
 
 from mdplus.core.generator import MdpGenerator
-
-from markdownTable import markdown_table
-
-import pandas as pd
+from mdplus.util.markdown import get_table
+from overrides import overrides
 
 
 logger = logging.getLogger(__name__)
@@ -29,6 +27,25 @@ class ContentGenerator(MdpGenerator):
         self.arg_dirs = self.get_arg("dirs", True)
         self.arg_md_files = self.get_arg("md_files", False)
 
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        dir_path = self.document.dir_path
+        parent = os.path.dirname(path)
+
+        # Added or removed entries of the directory and the listed md files
+        if parent == dir_path:
+            return True
+
+        if not self.arg_dirs:
+            return False
+
+        # Readmes, MDP_IGNORE files and added or removed subdirectories decide on the entries of the subdirectories
+        if os.path.dirname(parent) == dir_path:
+            return True
+
+        # The .gitignore files at or above the directory decide which subdirectories are listed
+        return os.path.basename(path) == ".gitignore" and dir_path.startswith(parent + os.sep)
+
     def get_content(self) -> str:
 
         content = list()
@@ -65,11 +82,12 @@ class ContentGenerator(MdpGenerator):
 
                     # Check if the directory is ignored by .gitignore
                     cmd = f"git check-ignore {dir}"
-                    result = os.system(f"{cmd} > /dev/null 2>&1")
+                    with self.workspace.measure("subprocess", "git check-ignore", self.document.full_path):
+                        result = os.system(f"{cmd} > /dev/null 2>&1")
                     if result == 0:
                         continue
 
-                    mdp_dir = self.workspace.directory_map.get(dir, None)
+                    mdp_dir = self.workspace.get_directory(dir)
                     need_parse = True
 
                     # If there is a readme file in the directory, check for given args in that file
@@ -81,7 +99,7 @@ class ContentGenerator(MdpGenerator):
                                 need_parse = False
 
                     # If there are no md+ args, parse the readme file
-                    if need_parse and mdp_dir.readme is not None:
+                    if need_parse and mdp_dir is not None and mdp_dir.readme is not None:
                         # Extract the first line of this file
                         with open(mdp_dir.readme.full_path, "r", encoding="utf-8") as f:
                             logger.debug(f"Read contents of {os.path.join(dir, 'README.md')}")
@@ -115,7 +133,7 @@ class ContentGenerator(MdpGenerator):
                     if path == self.document.full_path:
                         continue
 
-                    doc = self.workspace.document_map.get(path, None)
+                    doc = self.workspace.get_document(path)
 
                     basename = os.path.basename(file)
                     if doc is not None:
@@ -126,15 +144,8 @@ class ContentGenerator(MdpGenerator):
                     file_entry = f"[`{basename}`]({file})"
                     entries[file_entry] = info
 
-            # Convert entries to a dataframe
-            df = pd.DataFrame(entries.items(), columns=["Directory", "Content"])
-
-            # Create a Markdown table out of the dataframe
-            mkdict = df.to_dict(orient="records")
-            content.append(
-                markdown_table(mkdict)
-                .set_params(row_sep="markdown", quote=False, padding_weight="right")
-                .get_markdown()
-            )
+            # Create a Markdown table out of the entries
+            rows = [{"Directory": entry, "Content": info} for entry, info in entries.items()]
+            content.append(get_table(rows))
 
             return "\n\n".join(content)
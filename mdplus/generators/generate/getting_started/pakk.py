@@ -46,6 +46,10 @@ class PakkGettingStartedGenerator(MdpGenerator):
 
         return False
 
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        return path == os.path.join(self.workspace.root_path, "pakk.cfg")
+
     @overrides
     def get_content(self) -> str:
         lines = []
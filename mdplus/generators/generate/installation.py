@@ -1,129 +1,202 @@
+from __future__ import annotations
+
 import os
 import logging
 
 import re
-import git
 import json
 
-from mdplus.util.file_utils import join_relative_path
-from mdplus.util.hooks import Hooks
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from mdplus.core.cache import FingerprintCache
 from mdplus.core.generator import MdpGenerator
+from mdplus.util.git_utils import GitRepository, get_repository
+from overrides import overrides
+
+if TYPE_CHECKING:
+    from mdplus.core.documents.block import MdpBlock
+    from mdplus.core.documents.document import Document
+    from mdplus.util.hooks import Hooks
 
 logger = logging.getLogger(__name__)
 
+PROBED_FILES = ("install.sh", "requirements.txt", "setup.py", "module.rose.json")
+"""Files of a directory that add installation instructions."""
 
-def clear_git_url(url: str):
-    pattern = re.compile(r"oauth2?:.*?@")
-    return pattern.sub("", url)
 
+class InstallationProbe(NamedTuple):
+    """The files of a directory relevant for its installation instructions."""
 
-def create_git_instructions(git_repo_path: str, kwargs, header_level=2):
-    hooks: Hooks = kwargs["hooks"]
+    files: frozenset
+    """The names of the `PROBED_FILES` existing in the directory."""
 
-    try:
-        repo = git.Repo(git_repo_path)
-        basename = os.path.basename(git_repo_path)
+    rosepkg_id: Optional[str]
+    """The id of the rosepkg module defined in `module.rose.json`, None if there is none."""
 
-        # for remote in repo.remotes:
-        #     print(f'- {remote.name} {remote.url}')
+    repository: Optional[GitRepository]
+    """The git repository, if the directory is the root of one."""
 
-        lines = []
-        lines.append(f"{'#' * header_level} Standalone from Git\n")
-        hooks.append_to_content(__name__, "git", lines)
 
-        lines.append("```bash")
+_probes: FingerprintCache[InstallationProbe] = FingerprintCache()
+"""Probes per directory, valid as long as the modification times of the directory and its `module.rose.json` match."""
 
-        for i, remote in enumerate(repo.remotes):
-            lines.append(f"# Clone repo from {remote.name}")
-            lines.append(f"git clone {clear_git_url(remote.url)}")
-            if i > 0:
-                lines.append("# OR")
 
-        lines.append("")
+def get_installation_probe(dir_path: str) -> InstallationProbe:
+    """Probe a directory for the files its installation instructions are created from.
+    The directory is listed once and the probe is cached as long as the directory and its `module.rose.json`
+    do not change, so that many documents of the same directory do not check the same files again.
+    The git repository is cached separately by `get_repository`.
+    """
+    rosepkg_path = os.path.join(dir_path, "module.rose.json")
+    fingerprint = (os.stat(dir_path).st_mtime_ns, _get_mtime(rosepkg_path))
+
+    probe = _probes.get_or_create(dir_path, fingerprint, lambda: _probe_directory(dir_path))
+    return probe._replace(repository=get_repository(dir_path))
+
+
+def _probe_directory(dir_path: str) -> InstallationProbe:
+    """Probe a directory without its git repository, see `get_installation_probe`."""
+    rosepkg_path = os.path.join(dir_path, "module.rose.json")
+    with os.scandir(dir_path) as entries:
+        files = frozenset(e.name for e in entries if e.name in PROBED_FILES and e.is_file())
+
+    rosepkg_id = None
+    if "module.rose.json" in files:
+        try:
+            with open(rosepkg_path, "r") as f:
+                module = json.load(f)
+            if isinstance(module, dict) and "id" in module:
+                rosepkg_id = str(module["id"])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read rosepkg module {rosepkg_path}: {e}")
+
+    return InstallationProbe(files, rosepkg_id, None)
 
-        # Check if install.sh exists and add install instructions
-        if os.path.isfile(os.path.join(git_repo_path, "install.sh")):
-            lines.append("# Install and setup")
-            lines.append("sudo bash install.sh")
-            lines.append("")
-
-        # Check if requirements.txt exists and add install instructions
-        if os.path.isfile(os.path.join(git_repo_path, "requirements.txt")):
-            lines.append("# Install requirements")
-            lines.append("pip install -r requirements.txt")
-            lines.append("")
-
-        # Check if is a python package
-        if os.path.isfile(os.path.join(git_repo_path, "setup.py")):
-            lines.append("# If this should be a standalone python package, install it in your system")
-            lines.append(f"cd {basename}")
-            lines.append("pip install .")
-            lines.append("")
-
-        if len(lines) > 0 and lines[-1] == "":
-            lines.pop()
-        lines.append("```")
-
-        return "\n".join(lines)
-    except git.exc.InvalidGitRepositoryError:
-        return None
+
+def _get_mtime(path: str) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def clear_git_url(url: str):
+    pattern = re.compile(r"oauth2?:.*?@")
+    return pattern.sub("", url)
 
 
-def create_rosepkg_instructions(rosepkg_path: str, kwargs, header_level=2):
-    hooks: Hooks = kwargs["hooks"]
+def create_git_instructions(dir_path: str, probe: InstallationProbe, hooks: Hooks, header_level=2) -> str | None:
+    repo = probe.repository
+    if repo is None:
+        return None
 
-    # Check if module.rose.json exists
-    if os.path.isfile(os.path.join(rosepkg_path, "module.rose.json")):
-        with open(os.path.join(rosepkg_path, "module.rose.json"), "r") as f:
-            module = json.load(f)
-            if "id" in module:
-                lines = []
-                lines.append(f"{'#' * header_level} As rosepkg module\n")
-                hooks.append_to_content(__name__, "rosepkg", lines)
-                lines.append("```bash")
-                lines.append("# Install with rosepkg")
-                lines.append(f"rosepkg modules:install {module['id']}")
-                lines.append("```")
-                return "\n".join(lines)
+    basename = os.path.basename(dir_path)
 
-    return None
+    lines = []
+    lines.append(f"{'#' * header_level} Standalone from Git\n")
+    hooks.append_to_content(__name__, "git", lines)
 
+    lines.append("```bash")
 
-def main(*args, **kwargs):
-    """Creates installation instructions"""
+    for i, remote in enumerate(repo.remotes):
+        if i > 0:
+            lines.append("# OR")
+        lines.append(f"# Clone repo from {remote.name}")
+        lines.append(f"git clone {clear_git_url(remote.url)}")
 
-    dir_path = args[0]
-    root = kwargs["root"]
-    hooks: Hooks = kwargs["hooks"]
-    content = [kwargs.get("header", "# Installation")]
-    hooks.append_to_content(__name__, "", content)
+    lines.append("")
 
-    dir_path = join_relative_path(root, dir_path)
+    # Check if install.sh exists and add install instructions
+    if "install.sh" in probe.files:
+        lines.append("# Install and setup")
+        lines.append("sudo bash install.sh")
+        lines.append("")
 
-    logger.info(f"Creating installation instruction for {dir_path}")
+    # Check if requirements.txt exists and add install instructions
+    if "requirements.txt" in probe.files:
+        lines.append("# Install requirements")
+        lines.append("pip install -r requirements.txt")
+        lines.append("")
 
-    # Check if directory exists
-    if not os.path.isdir(dir_path):
-        logger.error(f"Directory {dir_path} for creating installation instruction does not exist")
-        return f"# {dir_path} NOT FOUND"
+    # Check if is a python package
+    if "setup.py" in probe.files:
+        lines.append("# If this should be a standalone python package, install it in your system")
+        lines.append(f"cd {basename}")
+        lines.append("pip install .")
+        lines.append("")
 
-    instructions = [
-        create_git_instructions(dir_path, kwargs, header_level=2),
-        create_rosepkg_instructions(dir_path, kwargs, header_level=2),
-    ]
+    if len(lines) > 0 and lines[-1] == "":
+        lines.pop()
+    lines.append("```")
 
-    content.append("\n".join([i for i in instructions if i is not None]))
+    return "\n".join(lines)
 
-    return "\n\n".join(content)
 
+def create_rosepkg_instructions(probe: InstallationProbe, hooks: Hooks, header_level=2) -> str | None:
+    if probe.rosepkg_id is None:
+        return None
 
-class InstallationModule(MdpGenerator):
+    lines = []
+    lines.append(f"{'#' * header_level} As rosepkg module\n")
+    hooks.append_to_content(__name__, "rosepkg", lines)
+    lines.append("```bash")
+    lines.append("# Install with rosepkg")
+    lines.append(f"rosepkg modules:install {probe.rosepkg_id}")
+    lines.append("```")
+    return "\n".join(lines)
 
-    def __init__(self, command: str, arguments: str):
-        super().__init__(command, arguments)
 
-    def get_content(self):
-        return "INSTALL"
+class InstallationModule(MdpGenerator):
+    """Creates installation instructions for a directory from its git remotes and install files"""
+
+    def __init__(self, document: Document, mdpBlock: MdpBlock):
+        super().__init__(document, mdpBlock)
+
+        self.arg_header = self.get_arg("header", "# Installation")
+        self.arg_path = self.get_arg("path", None)
+
+    @property
+    def dir_path(self) -> str:
+        """The directory to create the instructions for, relative paths are relative to the document."""
+        if self.arg_path is None:
+            return self.document.dir_path
+        return os.path.abspath(os.path.join(self.document.dir_path, self.arg_path))
+
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        dir_path = self.dir_path
+        if os.path.dirname(path) == dir_path and os.path.basename(path) in PROBED_FILES:
+            return True
+
+        # Remotes and worktree links of the repository
+        git_path = os.path.join(dir_path, ".git")
+        return path == git_path or path.startswith(git_path + os.sep)
+
+    @overrides
+    def get_content(self) -> str:
+        hooks = self.workspace.hooks
+        content = [self.arg_header]
+        hooks.append_to_content(__name__, "", content)
+
+        dir_path = self.dir_path
+        logger.info(f"Creating installation instruction for {dir_path}")
+
+        # Check if directory exists
+        if not os.path.isdir(dir_path):
+            logger.error(f"Directory {dir_path} for creating installation instruction does not exist")
+            content.append(f"# {dir_path} NOT FOUND")
+            return "\n\n".join(content)
+
+        probe = get_installation_probe(dir_path)
+        instructions = [
+            create_git_instructions(dir_path, probe, hooks, header_level=2),
+            create_rosepkg_instructions(probe, hooks, header_level=2),
+        ]
+        instructions = [i for i in instructions if i is not None]
+        if len(instructions) > 0:
+            content.append("\n\n".join(instructions))
+
+        return "\n\n".join(content)
 
 
 module = InstallationModule
@@ -12,11 +12,18 @@ from overrides import overrides
 
 logger = logging.getLogger(__name__)
 
-ignore_line = re.compile(r".*?(" + re.escape(Flags.IGNORE_LINE) + r").*?\n")
+# Anchored at the line start, otherwise the search restarts in every column of lines without the flag
+ignore_line = re.compile(r"^.*?(" + re.escape(Flags.IGNORE_LINE) + r").*?\n", re.MULTILINE)
 ignore_section = re.compile(r"#\s*?" + re.escape(Flags.IGNORE_START) + r".*?" + re.escape(Flags.IGNORE_END), re.DOTALL)
 ignore_start = re.compile(r"#\s*?" + re.escape(Flags.IGNORE_START) + r".*?", re.DOTALL)
 
-empty_lines = re.compile(r"(\s*?\n){3,}", re.MULTILINE)
+# Three or more newlines with optional whitespace between them. [^\S\n] is whitespace without newlines,
+# so that runs of whitespace can only be split in one way, and the lookbehind starts a match only at the beginning
+# of a run, so that long runs of whitespace are scanned once instead of once per column.
+empty_lines = re.compile(r"(?<![^\S\n])[^\S\n]*\n(?:[^\S\n]*\n){2,}")
+
+# Docstring without triple quotes inside, the alternatives of the non capturing group are disjoint
+comment_block_pattern = re.compile(r'"""((?:""?(?!")|[^"])*)"""')
 
 
 class ExampleIncluder(MdpGenerator):
@@ -26,6 +33,12 @@ class ExampleIncluder(MdpGenerator):
         self.arg_path = self.get_arg("path", None)
         self.arg_header = self.get_arg("header", None)
 
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        if self.arg_path is None:
+            return False
+        return os.path.abspath(os.path.join(self.document.dir_path, self.arg_path)) == path
+
     @overrides
     def get_content(self) -> str:
         logger.info(f"Including example file: {self.arg_path} in {self.document.full_path}")
@@ -67,8 +80,6 @@ class ExampleIncluder(MdpGenerator):
 
             input_text = self.process_ignored(input_text)
 
-            comment_block_pattern = re.compile(r'"""((""?(?!")|[^"])*)"""')
-
             first_comment_block = comment_block_pattern.search(input_text)
             if first_comment_block is not None:
                 text: str = first_comment_block.group(1)
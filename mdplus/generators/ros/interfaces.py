@@ -3,11 +3,10 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING, Dict, List
 
-from markdownTable import markdown_table
-
 from mdplus.core.environments.ros2 import Ros2Environment
-from mdplus.util.markdown import get_anchor_from_header
-from mdplus.util.parser.ros2_parser import Package, PackageType
+import mdplus.util.file_utils as file_utils
+from mdplus.util.markdown import adapt_string_for_table, get_anchor_from_header, get_table
+from mdplus.util.parser.ros2_parser import InterfaceField, InterfaceIndex, InterfaceType, Package, PackageType
 from overrides import overrides
 
 if TYPE_CHECKING:
@@ -24,6 +23,11 @@ class RosInterfacesMdpModule(MdpGenerator):
         super().__init__(document, mdpBlock)
 
         self.arg_header = self.get_arg("header", "# ROS Interface Definitions")
+        self.arg_field_tables = self.get_arg("field_tables", False)
+
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        return Ros2Environment.is_relevant_path(path, self.workspace.root_path)
 
     @overrides
     def get_content(self) -> str:
@@ -34,6 +38,7 @@ class RosInterfacesMdpModule(MdpGenerator):
 
         env = self.workspace.get_environment("ros2", env_class=Ros2Environment)
         packages: list[Package] = env.packages
+        index: InterfaceIndex = env.interfaces
 
         content = list()
 
@@ -41,7 +46,7 @@ class RosInterfacesMdpModule(MdpGenerator):
 
         for package in packages:
             if package.package_type == PackageType.CMAKE:
-                if len(package.messages) > 0 or len(package.services) > 0:
+                if len(package.messages) > 0 or len(package.services) > 0 or len(package.actions) > 0:
                     content.append(self.get_table(package, msgs=True, srv=True))
 
         for package in packages:
@@ -49,22 +54,74 @@ class RosInterfacesMdpModule(MdpGenerator):
                 if len(package.messages) > 0:
                     content.append(f"## Message definitions of {package.name}")
                     for message in package.messages:
-                        content.append(message.get_wiki_entry(3, self.document.dir_path))
+                        content.append(self.get_entry_of_interface(message, index))
                 if len(package.services) > 0:
                     content.append(f"## Service definitions of {package.name}")
                     for service in package.services:
-                        content.append(service.get_wiki_entry(3, self.document.dir_path))
+                        content.append(self.get_entry_of_interface(service, index))
+                if len(package.actions) > 0:
+                    content.append(f"## Action definitions of {package.name}")
+                    for action in package.actions:
+                        content.append(self.get_entry_of_interface(action, index))
 
         if len(content) == 1:
             content.append(f"This package has no custom message or service type definitions.")
 
         return "\n\n".join(content)
 
-    def get_table(self, package: Package, msgs=True, srv=True):
-        """Creates a table of messages and services found in the ROS-packages"""
+    def get_entry_of_interface(self, interface: InterfaceType, index: InterfaceIndex) -> str:
+        """Creates the entry of a message, service or action, with field tables if `field_tables` is set."""
+        if not self.arg_field_tables:
+            return interface.get_wiki_entry(3, self.document.dir_path)
+
+        relative_path = file_utils.get_relative_path(interface.file_path, self.document.dir_path)
+
+        # Types of several packages may share a name and thereby a header, so the links use an anchor per package
+        parts = [f'<a id="{self.get_interface_anchor(interface)}"></a>', f"### `{interface.name}`"]
+        for i, title in enumerate(interface.section_names):
+            fields = interface.get_section(i)
+            if title != "":
+                parts.append(f"**{title}**")
+            parts.append(self.get_field_table(fields, index) if len(fields) > 0 else "*No fields*")
+        parts.append(f"Source: [{relative_path.lstrip('./')}]({relative_path})")
+
+        return "\n\n".join(parts)
+
+    @staticmethod
+    def get_interface_anchor(interface: InterfaceType) -> str:
+        """Get the anchor of the entry of an interface, built from its `pkg/Type` key."""
+        return get_anchor_from_header(interface.type_key.replace("/", " "))
+
+    @staticmethod
+    def get_field_table(fields: list[InterfaceField], index: InterfaceIndex) -> str:
+        """Creates a table of the fields of an interface.
+        Field types defined in the workspace link to their entry in the same document.
+        """
+        rows: List[Dict[str, str]] = list()
+        for field in fields:
+            interface = index.resolve(field)
+            field_type = f"`{field.type}`"
+            if interface is not None:
+                field_type = f"[{field_type}](#{RosInterfacesMdpModule.get_interface_anchor(interface)})"
+
+            value = field.value if field.value is not None else ""
+            rows.append(
+                {
+                    "Name": f"`{field.name}`",
+                    "Type": adapt_string_for_table(field_type),
+                    "Value": f"`{adapt_string_for_table(value)}`" if value != "" else "",
+                    "Description": adapt_string_for_table(field.comment),
+                }
+            )
+
+        return get_table(rows)
+
+    def get_table(self, package: Package, msgs=True, srv=True, actions=True):
+        """Creates a table of messages, services and actions found in the ROS-packages"""
 
         msg_data: List[Dict[str, str]] = list()
         srv_data: List[Dict[str, str]] = list()
+        action_data: List[Dict[str, str]] = list()
 
         if msgs:
             for msg in package.messages:
@@ -86,11 +143,18 @@ class RosInterfacesMdpModule(MdpGenerator):
                     }
                 )
 
+        if actions:
+            for action in package.actions:
+                action_data.append(
+                    {
+                        "Name": f"[`{action.name}`](#{get_anchor_from_header(action.name)})",
+                        "Type": "Action",
+                        "Package": package.name,
+                    }
+                )
+
         msg_data.sort(key=lambda x: x["Name"])
         srv_data.sort(key=lambda x: x["Name"])
+        action_data.sort(key=lambda x: x["Name"])
 
-        return (
-            markdown_table(msg_data + srv_data)
-            .set_params(row_sep="markdown", quote=False, padding_weight="right")
-            .get_markdown()
-        )
+        return get_table(msg_data + srv_data + action_data)
@@ -3,13 +3,12 @@ from __future__ import annotations
 import logging
 from typing import TYPE_CHECKING
 
-from markdownTable import markdown_table
-
 import mdplus.util.file_utils as file_utils
 from mdplus.core.environments.ros2 import Ros2Environment
 from mdplus.core.generator import MdpGenerator
-from mdplus.util.markdown import adapt_string_for_table, get_link
-from mdplus.util.parser.ros2_parser import Package, PackageType
+from mdplus.generators.flags import Flags
+from mdplus.util.markdown import adapt_string_for_table, get_link, get_table
+from mdplus.util.parser.ros2_parser import LaunchScript, Package, PackageType
 from overrides import overrides
 
 if TYPE_CHECKING:
@@ -24,6 +23,11 @@ class RosLaunchMdpModule(MdpGenerator):
         super().__init__(document, mdpBlock)
 
         self.arg_header = self.get_arg("header", "# ROS Launch Scripts")
+        self.arg_include_details = self.get_arg("include_details", False)
+
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        return Ros2Environment.is_relevant_path(path, self.workspace.root_path)
 
     @overrides
     def get_content(self) -> str:
@@ -39,6 +43,7 @@ class RosLaunchMdpModule(MdpGenerator):
         content.append(self.arg_header)
 
         scripts = list()
+        sections = list()
 
         for package in packages:
             if package.package_type == PackageType.PYTHON:
@@ -57,17 +62,58 @@ class RosLaunchMdpModule(MdpGenerator):
                                 ),
                             }
                         )
+                        if self.arg_include_details:
+                            sections.append((rel_path, self.get_launch_section(script, rel_path.lstrip("/."))))
 
         # scripts.sort(key=lambda x: x["Name"])
         scripts.sort(key=lambda x: x["Script"])
 
         if len(scripts) > 0:
-            content.append(
-                markdown_table(scripts)
-                .set_params(row_sep="markdown", quote=False, padding_weight="right")
-                .get_markdown()
-            )
+            content.append(get_table(scripts))
         else:
             content.append("This package has no launch scripts")
 
+        sections.sort(key=lambda x: x[0])
+        content.extend(section for _, section in sections)
+
+        return "\n\n".join(content)
+
+    @staticmethod
+    def get_launch_section(script: LaunchScript, title: str) -> str:
+        """Creates a section with the arguments, nodes and included launch files of a launch script"""
+        content = [f"## `{title}`"]
+
+        if len(script.arguments) > 0:
+            arguments = [
+                {
+                    "Name": f"`{a.name}`",
+                    "Default": f"`{adapt_string_for_table(a.default)}`" if a.default is not None else "*required*",
+                    "Description": adapt_string_for_table(a.description or ""),
+                }
+                for a in script.arguments
+            ]
+            content.extend(["**Arguments of this launch script**", get_table(arguments)])
+
+        if len(script.nodes) > 0:
+            nodes = [
+                {
+                    "Package": n.package or Flags.NOT_FOUND,
+                    "Executable": f"`{n.executable}`" if n.executable is not None else Flags.NOT_FOUND,
+                    "Name": n.name or "",
+                    "Namespace": n.namespace or "",
+                }
+                for n in script.nodes
+            ]
+            content.extend(["**Nodes started by this launch script**", get_table(nodes)])
+
+        if len(script.includes) > 0:
+            includes = [
+                {
+                    "Package": i.package or "",
+                    "File": f"`{i.file}`" if i.file is not None else f"`{adapt_string_for_table(i.source)}`",
+                }
+                for i in script.includes
+            ]
+            content.extend(["**Launch files included by this launch script**", get_table(includes)])
+
         return "\n\n".join(content)
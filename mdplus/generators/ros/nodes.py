@@ -1,15 +1,15 @@
 from __future__ import annotations
 
 import logging
+import os
 from typing import TYPE_CHECKING, List
 
-from markdownTable import markdown_table
-
 import mdplus.util.file_utils as file_utils
 from mdplus.core.environments.ros2 import Ros2Environment
 from mdplus.core.generator import MdpGenerator
-from mdplus.util.markdown import adapt_header_level, get_anchor_from_header, get_link
-from mdplus.util.parser.ros2_parser import Node, Package, PackageType
+from mdplus.util.markdown import adapt_header_level, adapt_string_for_table, get_anchor_from_header, get_link, get_table
+from mdplus.util.parser.ros2_parser import CppNode, Node, Package, PackageType
+from overrides import overrides
 
 if TYPE_CHECKING:
     from mdplus.core.documents.document import Document
@@ -35,7 +35,7 @@ class RosNodesMdpModule(MdpGenerator):
     def get_nodes_table(packages: List[Package], root) -> str:
         nodes = []
         for package in packages:
-            if package.package_type == PackageType.PYTHON:
+            if package.package_type in (PackageType.PYTHON, PackageType.CMAKE):
                 if len(package.nodes) > 0:
                     for node in package.nodes:
                         anchor = get_anchor_from_header(f"`{node.name}` Node")
@@ -49,10 +49,27 @@ class RosNodesMdpModule(MdpGenerator):
                         )
 
         nodes.sort(key=lambda x: x["Name"])
+
+        # Nodes of files that could not be parsed are missing, so the errors are shown in their place
+        for package in packages:
+            for path, error in sorted(package.errors.items()):
+                nodes.append(
+                    {
+                        "Package": package.name,
+                        "Name": "**Error**",
+                        "Info": adapt_string_for_table(f"Nodes could not be extracted: {error}"),
+                        "Script": get_link(os.path.basename(path), file_utils.get_relative_path(path, root)),
+                    }
+                )
+
         if len(nodes) == 0:
             return ""
 
-        return markdown_table(nodes).set_params(row_sep="markdown", quote=False, padding_weight="right").get_markdown()
+        return get_table(nodes)
+
+    @overrides
+    def depends_on(self, path: str) -> bool:
+        return Ros2Environment.is_relevant_path(path, self.workspace.root_path)
 
     def get_content(self) -> str:
         """Creates a table of nodes found in the ROS-packages"""
@@ -71,7 +88,7 @@ class RosNodesMdpModule(MdpGenerator):
         has_nodes = False
 
         for package in packages:
-            if package.package_type == PackageType.PYTHON:
+            if package.package_type in (PackageType.PYTHON, PackageType.CMAKE):
                 if len(package.nodes) > 0:
                     for node in package.nodes:
                         content.append(self.get_node_section(node))
@@ -82,7 +99,7 @@ class RosNodesMdpModule(MdpGenerator):
 
         return "\n\n".join(content)
 
-    def get_node_section(self, node: Node, comment_as_code_block=False) -> str:
+    def get_node_section(self, node: Node | CppNode, comment_as_code_block=False) -> str:
         content = []
         topics = []
 
@@ -174,11 +191,7 @@ class RosNodesMdpModule(MdpGenerator):
 
         if len(topics) > 0:
             topics.sort(key=lambda x: x["Topic"])
-            table = (
-                markdown_table(topics)
-                .set_params(row_sep="markdown", quote=False, padding_weight="right")
-                .get_markdown()
-            )
+            table = get_table(topics)
             content.insert(2, "**Publisher, Subscriber and Services of this node**")
             content.insert(3, table)
 
@@ -200,11 +213,7 @@ class RosNodesMdpModule(MdpGenerator):
                 )
             if len(parameters) > 0:
                 parameters.sort(key=lambda x: x["Name"])
-                table = (
-                    markdown_table(parameters)
-                    .set_params(row_sep="markdown", quote=False, padding_weight="right")
-                    .get_markdown()
-                )
+                table = get_table(parameters)
                 content.insert(2, "**Parameters of this node**")
                 content.insert(3, table)
 
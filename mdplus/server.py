@@ -0,0 +1,198 @@
+"""
+Persistent mdplus server and the thin client talking to it.
+
+The server keeps the imported generators, the workspace tree and the environments of one workspace in memory
+and processes requests sent over a local Unix socket.
+Requests and responses are single JSON objects terminated by a newline, one request per connection.
+
+The client part of this module only uses the standard library, so that `mdplus parse --client` starts fast.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import io
+import json
+import logging
+import os
+import socket
+import socketserver
+import tempfile
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mdplus.core.documents.structure import Workspace
+
+logger = logging.getLogger(__name__)
+
+
+def get_socket_path(root_dir: str) -> str:
+    """Get the default socket path of the server for the given workspace root.
+    The socket is placed in the temp directory, since Unix socket paths are limited to about 100 characters.
+    """
+    root_hash = hashlib.sha1(os.path.abspath(root_dir).encode("utf-8")).hexdigest()[:16]
+    user = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"mdplus-{user}-{root_hash}.sock")
+
+
+def send_request(socket_path: str, request: dict, timeout: float | None = None) -> dict | None:
+    """Send a request to a running server.
+
+    Parameters
+    ----------
+    socket_path : str
+        The path of the Unix socket of the server.
+    request : dict
+        The request, e.g. `{"command": "parse", "write_only_new_content": True}`.
+    timeout : float | None, optional
+        Timeout for the whole request in seconds, by default None
+
+    Returns
+    -------
+    dict | None
+        The response of the server or None, if no server is listening on the socket or the request failed.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(socket_path)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+
+        return json.loads(b"".join(chunks).decode("utf-8"))
+    except (OSError, ValueError) as e:
+        # E.g. a stale socket, a timeout or a server stopped while answering
+        logger.debug(f"Request to server at {socket_path} failed: {e}")
+        return None
+
+
+class _BufferHandler(logging.Handler):
+    """Logging handler collecting the messages of one request for the client."""
+
+    def __init__(self, buffer: io.StringIO):
+        super().__init__()
+        self.buffer = buffer
+        self.setFormatter(logging.Formatter("%(message)s"))
+
+    def emit(self, record: logging.LogRecord):
+        self.buffer.write(self.format(record) + "\n")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: MdpServer
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            response = self.server.handle_request_data(request)
+        except Exception as e:
+            logger.exception("Error while handling request")
+            response = {"exit_code": 1, "output": f"mdplus server error: {e}\n"}
+
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class MdpServer(socketserver.UnixStreamServer):
+    """Server keeping a workspace warm between requests.
+    Requests are handled one after another, since the workspace is not thread safe.
+    """
+
+    def __init__(self, root_dir: str, socket_path: str | None = None):
+        """Create a new server for the workspace at root_dir.
+
+        Parameters
+        ----------
+        root_dir : str
+            The root directory of the workspace.
+        socket_path : str | None, optional
+            The path of the Unix socket, by default the path from `get_socket_path(root_dir)`.
+        """
+        self.root_dir = os.path.abspath(root_dir)
+        """The root directory of the served workspace."""
+
+        self.socket_path = socket_path or get_socket_path(self.root_dir)
+        """The path of the Unix socket the server listens on."""
+
+        self._workspace: Workspace | None = None
+
+        # Remove a stale socket of a crashed server
+        if os.path.exists(self.socket_path):
+            if send_request(self.socket_path, {"command": "ping"}, timeout=1) is not None:
+                raise RuntimeError(f"A server is already running on {self.socket_path}")
+            os.remove(self.socket_path)
+
+        super().__init__(self.socket_path, _RequestHandler)
+
+    @property
+    def workspace(self) -> Workspace:
+        """The workspace of the server. It is created on first access and refreshed for every request."""
+        from mdplus.core.documents.structure import Workspace
+
+        if self._workspace is None:
+            self._workspace = Workspace(self.root_dir)
+        self._workspace.refresh()
+
+        return self._workspace
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def handle_request_data(self, request: dict) -> dict:
+        """Handle a decoded request and return the response."""
+        command = request.get("command")
+
+        if command == "ping":
+            return {"exit_code": 0, "output": ""}
+
+        if command == "parse":
+            return self._run_captured(self._parse, request)
+
+        return {"exit_code": 1, "output": f"Unknown command {command}\n"}
+
+    def _parse(self, request: dict):
+        workspace = self.workspace
+        workspace.is_pre_commit_hook = request.get("is_pre_commit_hook", False)
+
+        documents = None
+        if request.get("changed_files") is not None:
+            documents = workspace.get_dependent_documents(request["changed_files"])
+
+        workspace.process(request.get("write_only_new_content", False), documents)
+
+    def _run_captured(self, func, request: dict) -> dict:
+        """Run func for the request and capture its log messages and prints for the client."""
+        mdplus_logger = logging.getLogger("mdplus")
+        level = mdplus_logger.level
+
+        if request.get("quiet"):
+            mdplus_logger.setLevel(logging.ERROR)
+        elif request.get("verbose"):
+            mdplus_logger.setLevel(logging.DEBUG)
+        else:
+            mdplus_logger.setLevel(logging.INFO)
+
+        buffer = io.StringIO()
+        handler = _BufferHandler(buffer)
+        mdplus_logger.addHandler(handler)
+        exit_code = 0
+        try:
+            with contextlib.redirect_stdout(buffer):
+                func(request)
+        except Exception as e:
+            logger.exception(f"Error while processing request: {e}")
+            exit_code = 1
+        finally:
+            mdplus_logger.removeHandler(handler)
+            mdplus_logger.setLevel(level)
+
+        return {"exit_code": exit_code, "output": buffer.getvalue()}
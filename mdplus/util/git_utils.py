@@ -0,0 +1,235 @@
+import logging
+import os
+import re
+import subprocess
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from mdplus.core.cache import FingerprintCache
+
+logger = logging.getLogger(__name__)
+
+
+def get_staged_files(cwd: str) -> Optional[List[str]]:
+    """Get the absolute paths of all staged files (including deleted ones) below cwd.
+
+    Args:
+        cwd (str): Directory inside of the git repository.
+
+    Returns:
+        Optional[List[str]]: The staged files or None, if git failed, e.g. because cwd is not inside of a repository.
+    """
+    return _get_diff_files(["--cached"], cwd)
+
+
+def get_changed_files_since(ref: str, cwd: str) -> Optional[List[str]]:
+    """Get the absolute paths of all files below cwd that differ between the given ref and the working tree.
+
+    Args:
+        ref (str): The git ref to compare with, e.g. "origin/main".
+        cwd (str): Directory inside of the git repository.
+
+    Returns:
+        Optional[List[str]]: The changed files or None, if git failed, e.g. because of an unknown ref.
+    """
+    return _get_diff_files([ref, "--"], cwd)
+
+
+def _get_diff_files(diff_args: List[str], cwd: str) -> Optional[List[str]]:
+    # With -z, paths are separated by NUL and not quoted, also if they contain non-ASCII characters
+    cmd = ["git", "diff", "--name-only", "-z", "--relative", *diff_args]
+    try:
+        result = subprocess.run(cmd, cwd=cwd, capture_output=True, encoding="utf-8", check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        stderr = getattr(e, "stderr", None) or str(e)
+        logger.error(f"Failed to get changed files with '{' '.join(cmd)}': {stderr.strip()}")
+        return None
+
+    return [os.path.abspath(os.path.join(cwd, path)) for path in result.stdout.split("\0") if path != ""]
+
+
+def is_hidden_path(path: str, root: str) -> bool:
+    """Check if a path below root is inside of a hidden directory or a hidden file itself."""
+    relative = os.path.relpath(os.path.abspath(path), root)
+    return any(part.startswith(".") and part not in [".", ".."] for part in relative.split(os.sep))
+
+
+class GitRemote(NamedTuple):
+    """A remote of a git repository."""
+
+    name: str
+    url: str
+
+
+class GitRepository(NamedTuple):
+    """The metadata of a git repository, read from its files without running git."""
+
+    root: str
+    """The working tree of the repository."""
+
+    git_dir: str
+    """The git directory of the working tree, `.git` or `.git/worktrees/<name>` of the main repository."""
+
+    common_dir: str
+    """The git directory shared by all worktrees, containing the config."""
+
+    remotes: List[GitRemote]
+    """The remotes in the order of the config."""
+
+    branch: Optional[str]
+    """The checked out branch, None if the HEAD is detached."""
+
+
+GitConfig = Dict[Tuple[str, Optional[str]], Dict[str, List[str]]]
+"""Values of a git config per (section, subsection) and key. Section names and keys are lower case."""
+
+_section_pattern = re.compile(r'\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+_entry_pattern = re.compile(r"([A-Za-z][\w-]*)\s*(?:=\s*(.*))?$")
+
+_repositories: FingerprintCache[Optional[GitRepository]] = FingerprintCache(max_size=256)
+"""Read repositories per root, valid as long as the modification times of the files they were read from match."""
+
+
+def get_repository(root: str) -> Optional[GitRepository]:
+    """Get the metadata of the git repository with the given working tree root.
+    The `.git` entry of root may be a directory or a `gitdir:` file of a worktree or submodule.
+    The result is cached per root as long as the `.git` entry, the config and HEAD do not change,
+    so that many documents of the same repository do not read its files again.
+
+    Args:
+        root (str): The root directory of the working tree, parent directories are not searched.
+
+    Returns:
+        Optional[GitRepository]: The repository or None, if root is no repository root.
+    """
+    root = os.path.abspath(root)
+    dot_git = os.path.join(root, ".git")
+
+    cached = _repositories.get_entry(root)
+    if cached is not None and cached[0] == _get_fingerprint(dot_git, cached[1]):
+        return cached[1]
+
+    repository = None
+    git_dir = _resolve_git_dir(dot_git)
+    if git_dir is not None:
+        common_dir = _resolve_common_dir(git_dir)
+        config = _read_config(os.path.join(common_dir, "config"))
+        remotes = [
+            GitRemote(subsection, values["url"][-1])
+            for (section, subsection), values in config.items()
+            if section == "remote" and subsection is not None and "url" in values
+        ]
+        repository = GitRepository(root, git_dir, common_dir, remotes, _read_branch(git_dir))
+
+    _repositories.set(root, _get_fingerprint(dot_git, repository), repository)
+    return repository
+
+
+def _get_fingerprint(dot_git: str, repository: Optional[GitRepository]) -> Tuple[Optional[int], ...]:
+    """Get the modification times of the files a repository is read from."""
+    paths = [dot_git]
+    if repository is not None:
+        paths.extend([os.path.join(repository.git_dir, "HEAD"), os.path.join(repository.common_dir, "config")])
+
+    mtimes = []
+    for path in paths:
+        try:
+            mtimes.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def _resolve_git_dir(dot_git: str) -> Optional[str]:
+    """Get the git directory of a `.git` directory or `gitdir:` file, None if it is neither."""
+    if os.path.isdir(dot_git):
+        return dot_git if os.path.isfile(os.path.join(dot_git, "HEAD")) else None
+
+    try:
+        with open(dot_git, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+    except OSError:
+        return None
+
+    if not content.startswith("gitdir:"):
+        logger.warning(f"Ignoring invalid .git file {dot_git}")
+        return None
+
+    git_dir = os.path.normpath(os.path.join(os.path.dirname(dot_git), content[len("gitdir:") :].strip()))
+    return git_dir if os.path.isfile(os.path.join(git_dir, "HEAD")) else None
+
+
+def _resolve_common_dir(git_dir: str) -> str:
+    """Get the directory shared by all worktrees, given by the `commondir` file of a worktree."""
+    try:
+        with open(os.path.join(git_dir, "commondir"), "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def _read_branch(git_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+    except OSError:
+        return None
+
+    prefix = "ref: refs/heads/"
+    return head[len(prefix) :] if head.startswith(prefix) else None
+
+
+def _read_config(path: str) -> GitConfig:
+    """Read a git config file. Includes are not followed."""
+    config: GitConfig = dict()
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return config
+
+    values: Optional[Dict[str, List[str]]] = None
+    for line in lines:
+        line = line.strip()
+        if line == "" or line[0] in "#;":
+            continue
+
+        match = _section_pattern.match(line)
+        if match is not None:
+            section, subsection = match.group(1), match.group(2)
+            if subsection is not None:
+                subsection = re.sub(r"\\(.)", r"\1", subsection)
+            elif "." in section:
+                # Deprecated syntax [section.subsection]
+                section, subsection = section.split(".", 1)
+            values = config.setdefault((section.lower(), subsection), dict())
+            line = line[match.end() :].strip()
+            if line == "" or line[0] in "#;":
+                continue
+
+        match = _entry_pattern.match(line)
+        if match is None or values is None:
+            continue
+        values.setdefault(match.group(1).lower(), []).append(_parse_config_value(match.group(2) or "true"))
+
+    return config
+
+
+def _parse_config_value(value: str) -> str:
+    """Remove quotes, escapes and trailing comments of a config value."""
+    result = []
+    quoted = False
+    i = 0
+    while i < len(value):
+        c = value[i]
+        if c == "\\" and i + 1 < len(value):
+            result.append({"n": "\n", "t": "\t", "b": "\b"}.get(value[i + 1], value[i + 1]))
+            i += 2
+            continue
+        if c == '"':
+            quoted = not quoted
+        elif c in "#;" and not quoted:
+            break
+        else:
+            result.append(c)
+        i += 1
+    return "".join(result).strip()
@@ -1,82 +1,170 @@
+from __future__ import annotations
+
 import os
 import logging
 
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from mdplus.core.events import WorkspaceEvents
+
 logger = logging.getLogger(__name__)
 
+HOOKS_FILE = os.path.join("docs", "HOOKS.md")
+"""Path of the hooks file relative to the root of the workspace."""
+
 
 class HookText:
     def __init__(self, module: str, text: str):
         self.module = module
-
-        text = text.strip()
-        while text.startswith("\n"):
-            text = text[1:]
-        while text.endswith("\n"):
-            text = text[:-1]
-
-        self.text = text
+        self.text = text.strip()
 
     @staticmethod
     def get_from_file_content(file_content: str) -> dict[str, "HookText"]:
         hook_texts = {}
         current_hook = None
-        current_text = ""
+        current_lines: list[str] = []
         for line in file_content.splitlines():
             if line.startswith("# "):
                 if current_hook is not None:
-                    hook_texts[current_hook] = HookText(current_hook, current_text)
-                    current_text = ""
+                    hook_texts[current_hook] = HookText(current_hook, "\n".join(current_lines))
+                    current_lines = []
 
-                current_hook = line[2:]
+                current_hook = line[2:].strip()
                 continue
             else:
-                current_text += line + "\n"
+                current_lines.append(line)
 
             if line.startswith("#"):
                 logger.warning(f"Text for hooks should not include subheaders: {line}.")
 
         if current_hook is not None:
-            hook_texts[current_hook] = HookText(current_hook, current_text)
+            hook_texts[current_hook] = HookText(current_hook, "\n".join(current_lines))
 
         return hook_texts
 
 
 class Hooks:
-    def __init__(self, path: str):
+    """
+    Registry of the hooks of a hooks file, texts inserted into the content of generators.
+
+    Every hook is a section `# <module>.<part>` of the hooks file, e.g. `# installation.git`.
+    The file is parsed lazily on the first lookup, so that one registry can be shared by all generators of a workspace
+    (see `Workspace.hooks`). Its modification time is checked only once until `invalidate()` is called,
+    e.g. by `Workspace.refresh()`, and the file is parsed again if it changed.
+    """
+
+    def __init__(self, path: str, events: WorkspaceEvents | None = None):
+        """Create a new registry, the hooks file is not read until the first lookup.
+
+        Parameters
+        ----------
+        path : str
+            The path of the hooks file, the registry is empty if it does not exist.
+        events : WorkspaceEvents | None, optional
+            Event bus the reuse and (re)parsing of the file is reported to as cache hit and miss, once per check,
+            by default None.
+        """
         self.path = path
+        """The path of the hooks file."""
+
+        self.events = events
+        """Event bus of the workspace, None if the registry is used on its own."""
+
         self.file_content = ""
-        self.hooks = {}
+        """The content of the hooks file at the last parse."""
+
+        self.hits: dict[str, int] = dict()
+        """Number of times each hook was applied by its name."""
+
+        self._hooks: dict[str, HookText] = dict()
 
-        self.load_hooks()
+        self._mtime: int | None = None
+        """Modification time of the parsed file, None if it was not parsed yet or does not exist."""
+        self._loaded = False
+
+        self._checked = False
+        """True if the modification time was checked since the creation or the last `invalidate()`."""
+
+    @property
+    def hooks(self) -> dict[str, HookText]:
+        """The hooks by their dotted name, parsed again if the hooks file changed before the last `invalidate()`."""
+        if not self._checked:
+            self.load_hooks()
+        return self._hooks
+
+    def invalidate(self):
+        """Check the hooks file for changes again on the next lookup."""
+        self._checked = False
 
     def load_hooks(self):
-        if os.path.isfile(self.path):
+        """Parse the hooks file, if it was not parsed yet or changed since the last parse."""
+        self._checked = True
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        if self._loaded and mtime == self._mtime:
+            if self.events is not None:
+                self.events.emit("on_cache_hit", "hooks", self.path)
+            return
+
+        if self.events is not None:
+            self.events.emit("on_cache_miss", "hooks", self.path)
+
+        self.file_content = ""
+        if mtime is not None:
             with open(self.path, "r") as f:
                 self.file_content = f.read()
-                self.hooks = HookText.get_from_file_content(self.file_content)
+            logger.debug(f"Loading hooks from {self.path}")
+
+        self._hooks = HookText.get_from_file_content(self.file_content)
+        self._mtime = mtime
+        self._loaded = True
 
     def __getitem__(self, item):
         return self.hooks[item]
 
+    def __contains__(self, item) -> bool:
+        return item in self.hooks
+
+    def get(self, name: str) -> HookText | None:
+        """Get a hook by its dotted name, None if there is none."""
+        return self.hooks.get(name)
+
+    def find(self, module_name: str, part_name: str = "") -> HookText | None:
+        """Find the hook of a part of a module.
+
+        The hook may be named by the full module name or by any dotted suffix of it, the most specific name wins,
+        e.g. `installation.git` matches the part `git` of the module `mdplus.generators.generate.installation`.
+        """
+        hooks = self.hooks
+        parts = module_name.split(".")
+        for i in range(len(parts)):
+            name = ".".join(parts[i:])
+            if len(part_name) > 0:
+                name = f"{name}.{part_name}"
+            if name in hooks:
+                return hooks[name]
+        return None
+
     def append_to_content(
         self, module_name: str | list[str], part_name: str | list[str], content: list[str], index=None
     ):
         if isinstance(module_name, str):
             module_name = [module_name]
+        if isinstance(part_name, list):
+            part_name = ".".join(part_name)
 
         for mn in module_name:
-            if isinstance(part_name, list):
-                part_name = ".".join(part_name)
-            name = f"{mn}.{part_name}" if len(part_name) > 0 else mn
-            if name.startswith("mdplus.modules."):
-                name = name[15:]
-
-            if name in self.hooks:
-                logger.info(f"Applying {name} hook.")
-                t = f"{self.hooks[name].text}"
+            hook = self.find(mn, part_name)
+            if hook is not None:
+                logger.info(f"Applying {hook.module} hook.")
+                self.hits[hook.module] = self.hits.get(hook.module, 0) + 1
                 if index is None:
-                    content.append(t)
+                    content.append(hook.text)
                 else:
-                    content.insert(index, t)
+                    content.insert(index, hook.text)
 
                 break
@@ -1,13 +1,19 @@
 import re
 import string
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 # from mdplus.core import Replacement
 
 headers = re.compile(r"#+ .*")
-headers_inside_code = re.compile(r"```(.|[\n\s$^])*?(# .*?\n)(.|[\n\s$^])*?```")
 
-code_block_pattern = re.compile(r"```(.|[\n\s$^])*?```")
+# The content of the code block is matched inside of a lookahead and then consumed with the backreference.
+# Lookaheads are atomic, so an unterminated code block fails after one scan instead of retrying every header.
+# Group 1: Content of the code block, Group 2: First header line inside of the code block
+headers_inside_code = re.compile(r"```(?=((?:(?!```)[\s\S])*?(# .*\n)(?:(?!```)[\s\S])*))\1```")
+
+# [\s\S] matches every character with a single branch, an alternation of overlapping branches like (.|\s)
+# backtracks exponentially on unterminated code blocks
+code_block_pattern = re.compile(r"```[\s\S]*?```")
 
 
 # def adapt_header_level(markdown: str | Replacement, count: int):
@@ -18,40 +24,39 @@ def adapt_header_level(markdown: str, count: int):
     if count == 0:
         return markdown
 
-    last_matched_position = 0
+    code_blocks: List[Tuple[int, int]] = [match.span() for match in code_block_pattern.finditer(markdown)]
 
-    code_blocks: List[Tuple[int, int]] = []
-    for match in code_block_pattern.finditer(markdown):
-        code_blocks.append(match.span())
+    # The headers and code blocks are both visited in their order, so the text is built in a single pass
+    parts: List[str] = []
+    prefix = "#" * count
+    copied_until = 0
+    search_position = 0
+    block_index = 0
 
     while True:
-        m = headers.search(markdown, last_matched_position)
+        m = headers.search(markdown, search_position)
         if m is None:
             break
 
         start, end = m.span()
-        last_matched_position = end + count
+
+        # Code blocks ending before the header cannot contain it or any of the following headers
+        while block_index < len(code_blocks) and code_blocks[block_index][1] < end:
+            block_index += 1
 
         # Skip code blocks
-        skip = False
-        for code_block in code_blocks:
-            if start >= code_block[0] and end <= code_block[1]:
-                last_matched_position = code_block[1]
-                skip = True
-                break
-
-        if skip:
+        if block_index < len(code_blocks) and code_blocks[block_index][0] <= start:
+            search_position = code_blocks[block_index][1]
             continue
 
         # Add count to header
-        markdown = markdown[:start] + "#" * count + markdown[start:]
-
-        # Add count to each value in code_blocks that is greater than start
-        for i, code_block in enumerate(code_blocks):
-            if code_block[0] >= start:
-                code_blocks[i] = (code_block[0] + count, code_block[1] + count)
+        parts.append(markdown[copied_until:start])
+        parts.append(prefix)
+        copied_until = start
+        search_position = end
 
-    return markdown
+    parts.append(markdown[copied_until:])
+    return "".join(parts)
 
 
 def get_header(markdown: str, level: int = 0, start_position: int = 0) -> re.Match:
@@ -87,3 +92,41 @@ def adapt_string_for_table(s: str) -> str:
     s = s.replace("|", "\\|")
     s = s.replace("\n", "<br>")
     return s
+
+
+def get_table(rows: List[Dict[str, Any]]) -> str:
+    """Create a markdown table from a list of rows.
+    The columns are given by the keys of the first row, cells are left aligned and padded to the column width.
+
+    Parameters
+    ----------
+    rows : List[Dict[str, Any]]
+        The rows of the table, each row maps the column names to the cell values.
+
+    Returns
+    -------
+    str
+        The markdown table.
+    """
+    if len(rows) == 0:
+        raise ValueError("Table contains no rows.")
+
+    keys = list(rows[0].keys())
+    widths = [len(key) for key in keys]
+
+    # Convert the cells to strings and compute the column widths in the same pass
+    cells: List[List[str]] = []
+    for row in rows:
+        row_cells = [str(row[key]) for key in keys]
+        for i, cell in enumerate(row_cells):
+            if len(cell) > widths[i]:
+                widths[i] = len(cell)
+        cells.append(row_cells)
+
+    lines = [
+        "|" + "|".join(key.ljust(width) for key, width in zip(keys, widths)) + "|",
+        "|" + "|".join("-" * width for width in widths) + "|",
+    ]
+    lines.extend("|" + "|".join(cell.ljust(width) for cell, width in zip(row, widths)) + "|" for row in cells)
+
+    return "\n".join(lines)
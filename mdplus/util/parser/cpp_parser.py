@@ -0,0 +1,453 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from mdplus.core.cache import get_cached
+
+logger = logging.getLogger(__name__)
+
+CPP_SOURCE_EXTENSIONS = (".cpp", ".cc", ".cxx")
+"""Extensions of C++ source files."""
+
+CPP_HEADER_EXTENSIONS = (".hpp", ".h", ".hh", ".hxx")
+"""Extensions of C++ header files, headers with the same name as a source of a node are scanned with it."""
+
+SCANNED_CALLS = ("create_publisher", "create_subscription", "create_service", "declare_parameter")
+"""Calls of rclcpp nodes found by `scan_cpp_source`."""
+
+
+#################################################################################
+### Comments
+
+
+class StrippedSource(NamedTuple):
+    """Source code with comments replaced by spaces, so that offsets and line numbers stay the same."""
+
+    code: str
+    """The source without comments, strings are kept."""
+
+    comments: Dict[int, str]
+    """Text of the comments by the line they end on, without comment markers."""
+
+    comment_only_lines: set
+    """Line numbers of lines containing comments and no code."""
+
+    strings: List[Tuple[int, int]]
+    """Start and end offsets of the string literals, in source order."""
+
+
+def strip_comments(
+    text: str,
+    pattern: re.Pattern,
+    get_comment_text: Callable[[str], Optional[str]],
+) -> StrippedSource:
+    """Replace comments by spaces in a single pass.
+
+    Parameters
+    ----------
+    text : str
+        The source code.
+    pattern : re.Pattern
+        Pattern matching comments and string literals, so that comment markers in strings are ignored.
+        Every alternative has to match in linear time, also for unterminated comments and strings.
+    get_comment_text : Callable[[str], Optional[str]]
+        Returns the text of a matched comment without markers, or None if the match is a string literal.
+    """
+    parts: List[str] = []
+    comments: Dict[int, str] = dict()
+    comment_lines: set = set()
+    strings: List[Tuple[int, int]] = []
+
+    position = 0
+    line = 1
+    for match in pattern.finditer(text):
+        comment = get_comment_text(match.group(0))
+        if comment is None:
+            strings.append(match.span())
+            continue
+
+        start, end = match.span()
+        parts.append(text[position:start])
+        line += text.count("\n", position, start)
+        comment_lines.add(line)
+
+        # Keep the line breaks of block comments
+        matched = match.group(0)
+        line_breaks = matched.count("\n")
+        parts.append(re.sub(r"[^\n]", " ", matched) if line_breaks > 0 else " " * len(matched))
+        end_line = line + line_breaks
+        comment_lines.update(range(line, end_line + 1))
+
+        previous = comments.get(end_line)
+        comments[end_line] = comment if previous is None else f"{previous}\n{comment}"
+
+        line = end_line
+        position = end
+
+    parts.append(text[position:])
+    code = "".join(parts)
+
+    code_lines = code.split("\n")
+    comment_only_lines = {n for n in comment_lines if code_lines[n - 1].strip() == ""}
+
+    return StrippedSource(code, comments, comment_only_lines, strings)
+
+
+def get_comment_above(stripped: StrippedSource, line: int) -> str:
+    """Get the comment documenting the code on a line: a trailing comment on the line itself,
+    or else the comment lines directly above it.
+    """
+    if line in stripped.comments and line not in stripped.comment_only_lines:
+        return stripped.comments[line]
+
+    lines: List[str] = []
+    current = line - 1
+    while current in stripped.comment_only_lines:
+        if current in stripped.comments:
+            lines.insert(0, stripped.comments[current])
+        current -= 1
+
+    return "\n".join(lines)
+
+
+#################################################################################
+### CMakeLists.txt
+
+
+class CMakeExecutable(NamedTuple):
+    """An executable defined in a CMakeLists.txt."""
+
+    name: str
+    """The name of the executable."""
+
+    sources: List[str]
+    """The source files relative to the package."""
+
+    plugin: Optional[str]
+    """The plugin class, if the executable is a registered component."""
+
+
+_cmake_token_pattern = re.compile(r'#\[(=*)\[[\s\S]*?(?:\]\1\]|\Z)|#[^\n]*|"(?:[^"\\]|\\.)*(?:"|\Z)')
+"""Bracket comments, line comments and quoted arguments of CMake."""
+
+_cmake_command_pattern = re.compile(r"\b([A-Za-z_]\w*)[ \t]*\(")
+_cmake_argument_pattern = re.compile(r'"((?:[^"\\]|\\.)*)"|([^\s"]+)')
+_cmake_variable_pattern = re.compile(r"\$\{(\w+)\}")
+
+CMAKE_TARGET_OPTIONS = {"WIN32", "MACOSX_BUNDLE", "EXCLUDE_FROM_ALL", "STATIC", "SHARED", "MODULE", "OBJECT"}
+"""Options of add_executable and add_library, which are not source files."""
+
+
+def _get_cmake_comment_text(token: str) -> Optional[str]:
+    return token if token.startswith("#") else None
+
+
+def _skip_string(code: str, start: int, end: int) -> int:
+    """Get the position of the quote closing the string literal starting at start, end if it is unterminated."""
+    quote = code[start]
+    i = start + 1
+    while i < end and code[i] != quote:
+        i += 2 if code[i] == "\\" else 1
+    return min(i, end)
+
+
+_parenthesis_pattern = re.compile(r"[()]")
+
+
+def match_parentheses(stripped: StrippedSource) -> Dict[int, int]:
+    """Get the offset of the closing parenthesis for the offset of every opening parenthesis in one pass.
+    Parentheses in string literals are ignored, unclosed parentheses are missing in the result.
+    """
+    strings = stripped.strings
+    string_index = 0
+    stack: List[int] = []
+    pairs: Dict[int, int] = dict()
+
+    for match in _parenthesis_pattern.finditer(stripped.code):
+        position = match.start()
+        while string_index < len(strings) and strings[string_index][1] <= position:
+            string_index += 1
+        if string_index < len(strings) and strings[string_index][0] <= position:
+            continue
+
+        if match.group(0) == "(":
+            stack.append(position)
+        elif len(stack) > 0:
+            pairs[stack.pop()] = position
+
+    return pairs
+
+
+def parse_cmake_commands(text: str) -> List[Tuple[str, List[str]]]:
+    """Parse the commands of a CMakeLists.txt into (lower case command name, arguments) tuples.
+    Variables set with `set()` and `${PROJECT_NAME}` are substituted, other variables are kept as they are.
+    """
+    stripped = strip_comments(text, _cmake_token_pattern, _get_cmake_comment_text)
+    code = stripped.code
+    parentheses = match_parentheses(stripped)
+
+    commands: List[Tuple[str, List[str]]] = []
+    variables: Dict[str, List[str]] = dict()
+
+    def expand(argument: str, quoted: bool) -> List[str]:
+        if "${" not in argument:
+            return [argument]
+        # A variable that is the whole unquoted argument expands into its list elements
+        match = _cmake_variable_pattern.fullmatch(argument)
+        if match is not None and not quoted and match.group(1) in variables:
+            return list(variables[match.group(1)])
+        return [
+            _cmake_variable_pattern.sub(
+                lambda m: ";".join(variables[m.group(1)]) if m.group(1) in variables else m.group(0), argument
+            )
+        ]
+
+    position = 0
+    while True:
+        match = _cmake_command_pattern.search(code, position)
+        if match is None:
+            break
+
+        end = parentheses.get(match.end() - 1, len(code))
+        name = match.group(1).lower()
+
+        arguments: List[str] = []
+        for argument in _cmake_argument_pattern.finditer(code, match.end(), end):
+            quoted = argument.group(1) is not None
+            arguments.extend(expand(argument.group(1) if quoted else argument.group(2), quoted))
+
+        if name == "project" and len(arguments) > 0:
+            variables["PROJECT_NAME"] = [arguments[0]]
+        elif name == "set" and len(arguments) > 0:
+            variables[arguments[0]] = [a for a in arguments[1:] if a not in ("PARENT_SCOPE", "CACHE")]
+
+        commands.append((name, arguments))
+        position = end + 1
+
+    return commands
+
+
+def parse_cmake_executables(text: str) -> List[CMakeExecutable]:
+    """Get the executables of a CMakeLists.txt defined by `add_executable` and `rclcpp_components_register_node`."""
+    executables: List[CMakeExecutable] = []
+    libraries: Dict[str, List[str]] = dict()
+
+    for name, arguments in parse_cmake_commands(text):
+        if name in ("add_executable", "add_library") and len(arguments) > 0:
+            if "IMPORTED" in arguments or "ALIAS" in arguments or "INTERFACE" in arguments:
+                continue
+            sources = [a for a in arguments[1:] if a not in CMAKE_TARGET_OPTIONS]
+            if name == "add_executable":
+                executables.append(CMakeExecutable(arguments[0], sources, None))
+            else:
+                libraries[arguments[0]] = sources
+
+        elif name == "rclcpp_components_register_node" and len(arguments) > 0:
+            options = _get_cmake_options(arguments[1:], ["PLUGIN", "EXECUTABLE"])
+            plugin = options.get("PLUGIN")
+            executable = options.get("EXECUTABLE") or (plugin.split("::")[-1] if plugin else None)
+            if executable is not None:
+                executables.append(CMakeExecutable(executable, libraries.get(arguments[0], []), plugin))
+
+    return executables
+
+
+def _get_cmake_options(arguments: List[str], keywords: List[str]) -> Dict[str, str]:
+    """Get the values of single value keywords, e.g. `PLUGIN "ns::Class"`."""
+    options = dict()
+    for i, argument in enumerate(arguments[:-1]):
+        if argument in keywords:
+            options[argument] = arguments[i + 1]
+    return options
+
+
+def get_cmake_executables(cmake_path: str) -> List[CMakeExecutable]:
+    """Get the executables of a CMakeLists.txt, cached as long as the file does not change."""
+    return get_cached(cmake_path, parse_cmake_executables)
+
+
+#################################################################################
+### C++ sources
+
+
+class CppCall(NamedTuple):
+    """A call of an rclcpp node method found in C++ source code."""
+
+    name: str
+    """The name of the called method, e.g. `create_publisher`."""
+
+    template: str
+    """The template argument, e.g. the message type, empty if there is none."""
+
+    arguments: List[str]
+    """The source code of the arguments."""
+
+    comment: str
+    """The comment directly above or behind the call."""
+
+    line: int
+    """The line of the call."""
+
+
+class CppSource(NamedTuple):
+    """The result of scanning a C++ source file with `scan_cpp_source`."""
+
+    doc: str
+    """The leading comment of the file, empty if there is none or it is a license header."""
+
+    calls: List[CppCall]
+    """Calls of `SCANNED_CALLS` in source order."""
+
+
+_cpp_token_pattern = re.compile(
+    r'//[^\n]*|/\*[\s\S]*?(?:\*/|\Z)|R"([^(\s]{0,16})\([\s\S]*?(?:\)\1"|\Z)'
+    r"|\"(?:[^\"\\\n]|\\.)*(?:\"|$)|'(?:[^'\\\n]|\\.)*(?:'|$)",
+    re.MULTILINE,
+)
+"""Comments, raw strings, strings and character literals of C++."""
+
+_cpp_call_pattern = re.compile(r"\b(" + "|".join(SCANNED_CALLS) + r")\b\s*")
+
+
+def _get_cpp_comment_text(token: str) -> Optional[str]:
+    if token.startswith("//"):
+        return token[2:].lstrip("/!").strip()
+    if token.startswith("/*"):
+        body = token[2:-2] if token.endswith("*/") else token[2:]
+        lines = [line.strip() for line in body.lstrip("*!").split("\n")]
+        lines = [line[1:].strip() if line.startswith("*") else line for line in lines]
+        return "\n".join(lines).strip()
+    return None
+
+
+def _split_arguments(code: str, start: int, end: int) -> List[str]:
+    """Split the arguments between start and end at top level commas, skipping nested brackets and strings."""
+    arguments: List[str] = []
+    depth = 0
+    argument_start = start
+    i = start
+    while i < end:
+        c = code[i]
+        if c in "\"'":
+            i = _skip_string(code, i, end)
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            depth -= 1
+        elif c == "," and depth == 0:
+            arguments.append(code[argument_start:i].strip())
+            argument_start = i + 1
+        i += 1
+
+    last = code[argument_start:end].strip()
+    if last != "" or len(arguments) > 0:
+        arguments.append(last)
+    return arguments
+
+
+_angle_bracket_pattern = re.compile(r"[<>;{}()]")
+
+MAX_TEMPLATE_LENGTH = 200
+"""Maximum length of a template argument list, so that a stray `<` does not make the scan quadratic."""
+
+
+def _find_template_end(code: str, start: int) -> int:
+    """Find the `>` closing the template argument list opened before start, -1 if there is none."""
+    depth = 1
+    for match in _angle_bracket_pattern.finditer(code, start, start + MAX_TEMPLATE_LENGTH):
+        c = match.group(0)
+        if c == "<":
+            depth += 1
+        elif c == ">":
+            depth -= 1
+            if depth == 0:
+                return match.start()
+        else:
+            return -1
+    return -1
+
+
+def scan_cpp_source(text: str) -> CppSource:
+    """Scan C++ source code for the calls of `SCANNED_CALLS`, without parsing C++.
+
+    The scan is linear in the size of the text: comments are stripped in one pass,
+    then the calls are found with a single pattern and only their argument lists are split.
+    """
+    stripped = strip_comments(text, _cpp_token_pattern, _get_cpp_comment_text)
+    code = stripped.code
+    parentheses = match_parentheses(stripped)
+
+    calls: List[CppCall] = []
+    line = 1
+    line_position = 0
+    strings = stripped.strings
+    string_index = 0
+    for match in _cpp_call_pattern.finditer(code):
+        # Skip names inside of string literals
+        while string_index < len(strings) and strings[string_index][1] <= match.start():
+            string_index += 1
+        if string_index < len(strings) and strings[string_index][0] <= match.start():
+            continue
+
+        position = match.end()
+
+        template = ""
+        if code.startswith("<", position):
+            template_end = _find_template_end(code, position + 1)
+            if template_end == -1:
+                continue
+            template = " ".join(code[position + 1 : template_end].split())
+            position = template_end + 1
+            while position < len(code) and code[position].isspace():
+                position += 1
+
+        if not code.startswith("(", position):
+            continue
+
+        end = parentheses.get(position)
+        if end is None:
+            continue
+        line += code.count("\n", line_position, match.start())
+        line_position = match.start()
+
+        arguments = _split_arguments(code, position + 1, end)
+        calls.append(CppCall(match.group(1), template, arguments, get_comment_above(stripped, line), line))
+
+    return CppSource(_get_file_doc(stripped), calls)
+
+
+def _get_file_doc(stripped: StrippedSource) -> str:
+    """Get the first comment block at the start of the file, which is not a license header."""
+    blocks: List[List[str]] = [[]]
+    for n, code_line in enumerate(stripped.code.split("\n"), 1):
+        if code_line.strip() != "":
+            break
+        if n in stripped.comments:
+            blocks[-1].append(stripped.comments[n])
+        elif n not in stripped.comment_only_lines and len(blocks[-1]) > 0:
+            # Empty lines separate the blocks
+            blocks.append([])
+
+    for block in blocks:
+        doc = "\n".join(block).strip()
+        lower = doc.lower()
+        if doc != "" and "license" not in lower and "copyright" not in lower:
+            return doc
+    return ""
+
+
+def get_cpp_source(path: str) -> CppSource:
+    """Scan a C++ source or header file, cached as long as the file does not change."""
+    return get_cached(path, scan_cpp_source)
+
+
+def get_string_value(argument: Optional[str]) -> str:
+    """Get the value of a string literal argument, other arguments are returned as they are.
+    E.g. `"topic"` -> `topic` and `std::string("topic")` -> `topic`.
+    """
+    if argument is None:
+        return "None"
+    match = re.fullmatch(r'(?:std::string\s*\(\s*)?"((?:[^"\\]|\\.)*)"\s*\)?', argument)
+    return match.group(1) if match is not None else argument
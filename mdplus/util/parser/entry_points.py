@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import ast
+import configparser
+import logging
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from mdplus.core.cache import get_cached
+from mdplus.util.parser.py_parser import get_call_name
+
+logger = logging.getLogger(__name__)
+
+EntryPoints = Dict[str, List[str]]
+"""Entry points per group, e.g. `console_scripts`, each entry normalized to `name = module:function`."""
+
+ENTRY_POINT_FILES = ["setup.py", "setup.cfg", "pyproject.toml"]
+"""Files the entry points of a package are read from, new entries of later files are appended."""
+
+
+class NotLiteralError(ValueError):
+    """Raised if an expression can not be evaluated statically."""
+
+
+def get_entry_points(package_path: str, errors: Optional[Dict[str, str]] = None) -> EntryPoints:
+    """Get the entry points of a python package without executing any of its files.
+
+    The entry points are read from `setup.py` (the `entry_points` keyword of the `setup()` call),
+    `setup.cfg` (the `[options.entry_points]` section) and `pyproject.toml` (`[project.scripts]` and
+    `[project.entry-points]`). Each file is parsed only once as long as it does not change.
+
+    Parameters
+    ----------
+    package_path : str
+        The path of the package directory.
+    errors : Optional[Dict[str, str]], optional
+        If given, the error messages of the files that can not be parsed statically are added to it by file path,
+        by default None
+
+    Returns
+    -------
+    EntryPoints
+        The entry points of all files per group.
+    """
+    entry_points: EntryPoints = dict()
+    for file_name in ENTRY_POINT_FILES:
+        for group, entries in get_entry_points_of_file(os.path.join(package_path, file_name), errors).items():
+            group_entries = entry_points.setdefault(group, [])
+            # Entries repeated in several files are only returned once
+            group_entries.extend(e for e in entries if e not in group_entries)
+    return entry_points
+
+
+def get_entry_points_of_file(path: str, errors: Optional[Dict[str, str]] = None) -> EntryPoints:
+    """Get the entry points defined in a `setup.py`, `setup.cfg` or `pyproject.toml` file.
+    The result is cached per file fingerprint, so unchanged files are not parsed again.
+    Returns no entry points if the file does not exist or can not be parsed statically, such files are not cached
+    and their error message is added to errors, if given.
+    """
+    parser = _PARSERS.get(os.path.basename(path))
+    if parser is None:
+        raise ValueError(f"Unknown entry point file {path}")
+
+    if not os.path.isfile(path):
+        return dict()
+
+    try:
+        return get_cached(path, parser)
+    except Exception as e:
+        logger.warning(f"Could not extract the entry points of {path}: {e}")
+        if errors is not None:
+            errors[path] = str(e)
+        return dict()
+
+
+def normalize_entry(entry: str) -> str:
+    """Normalize an entry point like `name=module:function` to `name = module:function`."""
+    name, _, target = entry.partition("=")
+    return f"{name.strip()} = {target.strip()}"
+
+
+def _normalize_entry_points(entry_points: Any) -> EntryPoints:
+    """Normalize entry points given as dict of lists (or single strings) or as ini style string."""
+    if isinstance(entry_points, str):
+        return _parse_ini_entry_points(entry_points)
+    if not isinstance(entry_points, dict):
+        raise NotLiteralError(f"entry_points is a {type(entry_points).__name__}, not a dict")
+
+    result: EntryPoints = dict()
+    for group, entries in entry_points.items():
+        if isinstance(entries, str):
+            entries = entries.splitlines()
+        result[str(group)] = [normalize_entry(e) for e in entries if isinstance(e, str) and "=" in e]
+    return result
+
+
+def _parse_ini_entry_points(text: str) -> EntryPoints:
+    """Parse entry points given in the ini format, e.g. `[console_scripts]\\nname = module:function`."""
+    parser = configparser.ConfigParser(interpolation=None, delimiters=("=",))
+    parser.optionxform = str
+    parser.read_string(text)
+    return {group: [f"{name} = {target}" for name, target in parser.items(group)] for group in parser.sections()}
+
+
+def parse_setup_py(text: str) -> EntryPoints:
+    """Extract the entry points of the `setup()` call of a `setup.py` statically.
+    Only literals are evaluated, names are resolved from module level assignments of literals.
+    """
+    tree = ast.parse(text)
+
+    assignments: Dict[str, ast.expr] = dict()
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    assignments[target.id] = node.value
+        elif isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name) and node.value is not None:
+            assignments[node.target.id] = node.value
+
+    calls = (node for node in ast.walk(tree) if isinstance(node, ast.Call) and get_call_name(node) == "setup")
+    setup_call = next(calls, None)
+    if setup_call is None:
+        return dict()
+
+    for keyword in setup_call.keywords:
+        if keyword.arg == "entry_points":
+            return _normalize_entry_points(_get_literal(keyword.value, assignments))
+
+    return dict()
+
+
+def _get_literal(node: ast.expr, assignments: Dict[str, ast.expr], depth: int = 0) -> Any:
+    """Evaluate an expression consisting only of literals, names of literals, `+` and f-strings.
+
+    Raises
+    ------
+    NotLiteralError
+        If the expression contains anything else, e.g. function calls.
+    """
+    if depth > 20:
+        raise NotLiteralError("Too deeply nested names")
+
+    def literal(n: ast.expr) -> Any:
+        return _get_literal(n, assignments, depth + 1)
+
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Name):
+        if node.id not in assignments:
+            raise NotLiteralError(f"Name {node.id} is not assigned a literal on module level")
+        return literal(assignments[node.id])
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [literal(e) for e in node.elts]
+    if isinstance(node, ast.Dict):
+        if any(k is None for k in node.keys):
+            raise NotLiteralError("Dict unpacking is not supported")
+        return {literal(k): literal(v) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+        return literal(node.left) + literal(node.right)
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.FormattedValue):
+                if value.format_spec is not None:
+                    raise NotLiteralError("Format specs are not supported")
+                parts.append(str(literal(value.value)))
+            else:
+                parts.append(str(literal(value)))
+        return "".join(parts)
+
+    raise NotLiteralError(f"{type(node).__name__} at line {getattr(node, 'lineno', '?')} is not a literal")
+
+
+def parse_setup_cfg(text: str) -> EntryPoints:
+    """Extract the entry points of the `[options.entry_points]` section of a `setup.cfg`."""
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.optionxform = str
+    parser.read_string(text)
+
+    if not parser.has_section("options.entry_points"):
+        return dict()
+
+    return {
+        group: [normalize_entry(e) for e in value.splitlines() if "=" in e]
+        for group, value in parser.items("options.entry_points")
+    }
+
+
+def parse_pyproject_toml(text: str) -> EntryPoints:
+    """Extract the entry points of `[project.scripts]`, `[project.gui-scripts]` and `[project.entry-points]`
+    of a `pyproject.toml`. Requires `tomllib` (Python 3.11+) or `tomli`, otherwise no entry points are returned.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            logger.debug("Neither tomllib nor tomli are available, ignoring pyproject.toml")
+            return dict()
+
+    project = tomllib.loads(text).get("project", {})
+
+    entry_points: EntryPoints = dict()
+    for group, key in [("console_scripts", "scripts"), ("gui_scripts", "gui-scripts")]:
+        if key in project:
+            entry_points[group] = [f"{name} = {target}" for name, target in project[key].items()]
+    for group, entries in project.get("entry-points", {}).items():
+        entry_points.setdefault(group, []).extend(f"{name} = {target}" for name, target in entries.items())
+
+    return entry_points
+
+
+_PARSERS: Dict[str, Callable[[str], EntryPoints]] = {
+    "setup.py": parse_setup_py,
+    "setup.cfg": parse_setup_cfg,
+    "pyproject.toml": parse_pyproject_toml,
+}
@@ -0,0 +1,216 @@
+from __future__ import annotations
+
+import ast
+import logging
+import os
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from mdplus.core.cache import get_cached
+from mdplus.generators.flags import Flags
+from mdplus.util.parser.py_parser import PyParser, SourceMap, get_call_name
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_FUNCTION = "generate_launch_description"
+"""The function every python launch file defines."""
+
+NODE_CALLS = ("Node", "LifecycleNode", "ComposableNode")
+"""Calls of launch_ros actions and descriptions that start a node."""
+
+PACKAGE_PATH_CALLS = ("get_package_share_directory", "get_package_share_path", "FindPackageShare")
+"""Calls resolving the share directory of a package, their first argument is the package name."""
+
+
+class LaunchArgument(NamedTuple):
+    """An argument declared with `DeclareLaunchArgument`."""
+
+    name: str
+    """The name of the argument."""
+
+    default: Optional[str]
+    """The default value, the source of the expression if it is no literal. None if the argument is required."""
+
+    description: Optional[str]
+    """The description of the argument, None if not given."""
+
+    line: int
+    """The line of the declaration."""
+
+
+class LaunchInclude(NamedTuple):
+    """A launch file included with `IncludeLaunchDescription`."""
+
+    package: Optional[str]
+    """The package of the included file, if the path is built from the share directory of a package."""
+
+    file: Optional[str]
+    """The file name of the included file, if the path ends with a string literal."""
+
+    source: str
+    """The source of the path expression."""
+
+    line: int
+    """The line of the include."""
+
+
+class LaunchNode(NamedTuple):
+    """A node started by a launch file with `Node`, `LifecycleNode` or `ComposableNode`."""
+
+    package: Optional[str]
+    """The package of the node."""
+
+    executable: Optional[str]
+    """The executable of the node, the plugin for composable nodes."""
+
+    name: Optional[str]
+    """The name the node is remapped to, None if the node keeps its own name."""
+
+    namespace: Optional[str]
+    """The namespace of the node, None if not given."""
+
+    line: int
+    """The line of the node description."""
+
+
+class LaunchFile(NamedTuple):
+    """The metadata of a python launch file, extracted statically in a single pass over its AST."""
+
+    doc: str
+    """The module docstring, `Flags.NOT_FOUND` if there is none."""
+
+    function_doc: str
+    """The docstring of `generate_launch_description`, `Flags.NOT_FOUND` if there is none."""
+
+    arguments: List[LaunchArgument]
+    """The declared launch arguments, in source order."""
+
+    includes: List[LaunchInclude]
+    """The included launch files, in source order."""
+
+    nodes: List[LaunchNode]
+    """The started nodes, in source order."""
+
+
+def get_launch_file(path: str) -> LaunchFile:
+    """Get the metadata of a python launch file.
+    The result is cached per file fingerprint, so unchanged launch files are not read again.
+    Returns empty metadata if the file can not be read or parsed, such files are not cached.
+    """
+    try:
+        return get_cached(path, parse_launch_file)
+    except OSError as e:
+        logger.error(f"Could not read launch file {path}: {e}")
+    except (SyntaxError, ValueError) as e:
+        logger.warning(f"Could not parse launch file {path}: {e}")
+    return parse_launch_file("")
+
+
+def parse_launch_file(source: str) -> LaunchFile:
+    """Extract the metadata of a python launch file without executing it.
+
+    The AST is walked once, collecting the launch actions and the names assigned string literals.
+    Names are resolved after the walk, so that e.g. `Node(package=package_name)` yields the assigned package name.
+    Other expressions are kept as their source.
+
+    Raises
+    ------
+    SyntaxError
+        If the source is no valid python.
+    """
+    tree = ast.parse(source)
+    source_map = SourceMap(source)
+
+    doc = ast.get_docstring(tree)
+    function = next(
+        (i for i in tree.body if isinstance(i, ast.FunctionDef) and i.name == LAUNCH_FUNCTION),
+        None,
+    )
+    function_doc = PyParser.get_doc_string(function) if function is not None else Flags.NOT_FOUND
+
+    calls: Dict[str, List[ast.Call]] = dict()
+    assignments: Dict[str, Optional[str]] = dict()
+    for item in ast.walk(tree):
+        if isinstance(item, ast.Call):
+            name = get_call_name(item)
+            if name is not None:
+                calls.setdefault(name, []).append(item)
+        elif isinstance(item, ast.Assign) and len(item.targets) == 1 and isinstance(item.targets[0], ast.Name):
+            target = item.targets[0].id
+            value = item.value.value if isinstance(item.value, ast.Constant) else None
+            # Names assigned several different values can not be resolved
+            if target in assignments and assignments[target] != value:
+                value = None
+            assignments[target] = value if isinstance(value, str) else None
+
+    def get_value(expr: Optional[ast.expr]) -> Optional[str]:
+        if expr is None:
+            return None
+        if isinstance(expr, ast.Constant):
+            return str(expr.value)
+        if isinstance(expr, ast.Name) and assignments.get(expr.id) is not None:
+            return assignments[expr.id]
+        return source_map.get_item_source(expr)
+
+    def get_calls(names: Tuple[str, ...]) -> List[ast.Call]:
+        result = [call for name in names for call in calls.get(name, [])]
+        return sorted(result, key=lambda c: (c.lineno, c.col_offset))
+
+    arguments = []
+    for call in get_calls(("DeclareLaunchArgument",)):
+        name = get_value(_get_argument(call, 0, "name"))
+        if name is not None:
+            default = get_value(_get_argument(call, None, "default_value"))
+            description = get_value(_get_argument(call, None, "description"))
+            arguments.append(LaunchArgument(name, default, description, call.lineno))
+
+    includes = []
+    for call in get_calls(("IncludeLaunchDescription",)):
+        path = _get_argument(call, 0, "launch_description_source")
+        if isinstance(path, ast.Call) and (get_call_name(path) or "").endswith("LaunchDescriptionSource"):
+            path = _get_argument(path, 0, "launch_file_path")
+        if path is not None:
+            includes.append(_get_include(path, call.lineno, get_value, source_map))
+
+    nodes = []
+    for call in get_calls(NODE_CALLS):
+        nodes.append(
+            LaunchNode(
+                get_value(_get_argument(call, None, "package")),
+                get_value(_get_argument(call, None, "executable", "plugin", "node_executable")),
+                get_value(_get_argument(call, None, "name", "node_name")),
+                get_value(_get_argument(call, None, "namespace", "node_namespace")),
+                call.lineno,
+            )
+        )
+
+    return LaunchFile(doc if doc is not None else Flags.NOT_FOUND, function_doc, arguments, includes, nodes)
+
+
+def _get_argument(call: ast.Call, index: Optional[int], *keywords: str) -> Optional[ast.expr]:
+    """Get a positional argument of a call by its index or the first given keyword argument."""
+    for keyword in call.keywords:
+        if keyword.arg in keywords:
+            return keyword.value
+    if index is not None and index < len(call.args) and not isinstance(call.args[index], ast.Starred):
+        return call.args[index]
+    return None
+
+
+def _get_include(
+    path: ast.expr, line: int, get_value: Callable[[Optional[ast.expr]], Optional[str]], source_map: SourceMap
+) -> LaunchInclude:
+    """Get the package and file name of the path expression of an included launch file."""
+    package = None
+    strings: List[ast.Constant] = []
+    for item in ast.walk(path):
+        if isinstance(item, ast.Call) and get_call_name(item) in PACKAGE_PATH_CALLS and package is None:
+            package = get_value(_get_argument(item, 0, "package_name"))
+        elif isinstance(item, ast.Constant) and isinstance(item.value, str):
+            strings.append(item)
+
+    file = None
+    if len(strings) > 0:
+        last = max(strings, key=lambda s: (s.lineno, s.col_offset))
+        file = os.path.basename(last.value.rstrip("/")) or None
+
+    return LaunchInclude(package, file, source_map.get_item_source(path), line)
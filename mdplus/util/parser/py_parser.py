@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import ast
+import functools
 from ast import NodeVisitor
 import _ast
 from pprint import pprint
@@ -8,8 +11,6 @@ import re
 import os
 from typing import Any, Dict, List, Tuple, TypeVar, Type
 
-from mistletoe import Document
-
 from mdplus.generators.flags import Flags
 
 T = TypeVar("T")
@@ -23,7 +24,8 @@ def get_doc_string_content(text: str, search_after_pattern: str = None, only_fir
             return ""
         start_pos = match.span()[1]
 
-    pattern = re.compile(r'\s*"""(.*)"""\s*', re.MULTILINE)
+    # No surrounding \s*, since searching with a leading \s* is quadratic in long runs of whitespace
+    pattern = re.compile(r'"""(.*)"""', re.MULTILINE)
     match = pattern.search(text, start_pos)
     if match is not None:
         doc_string = match.group(1)
@@ -92,6 +94,211 @@ def get_args(function_call: str) -> Tuple[List[Any], Dict[str, Any]]:
     return args, kwargs
 
 
+def get_call_name(call: ast.Call) -> str | None:
+    """Get the name of the called function or method, e.g. `create_publisher` for `self.create_publisher(...)`."""
+    f = call.func
+    if isinstance(f, ast.Name):
+        return f.id
+    if isinstance(f, ast.Attribute):
+        return f.attr
+    return None
+
+
+def get_dotted_name(item: ast.expr) -> str | None:
+    """Get the dotted name of a name or attribute chain, e.g. `rclpy.node.Node`, None for other expressions."""
+    if isinstance(item, ast.Name):
+        return item.id
+    if isinstance(item, ast.Attribute):
+        base = get_dotted_name(item.value)
+        return f"{base}.{item.attr}" if base is not None else None
+    return None
+
+
+class PyScopeIndex:
+    """Index of the calls and constants in the body of a module, class or function."""
+
+    def __init__(self, item: ast.Module | ast.ClassDef | ast.FunctionDef):
+        self.item = item
+        """The indexed module, class or function."""
+
+        self.constants: Dict[int, ast.Constant] = dict()
+        """Constants that are the value of a statement of the body (e.g. docstrings) by their line number."""
+
+        self.calls: Dict[str, List[ast.Call]] = dict()
+        """Calls that are the value of a statement of the body by the name of the callee, in source order."""
+
+        self._nested_calls: Dict[str, List[ast.Call]] | None = None
+
+        for statement in item.body:
+            value = getattr(statement, "value", None)
+            if isinstance(value, ast.Constant):
+                self.constants[value.lineno] = value
+            elif isinstance(value, ast.Call):
+                name = get_call_name(value)
+                if name is not None:
+                    self.calls.setdefault(name, []).append(value)
+
+    @property
+    def nested_calls(self) -> Dict[str, List[ast.Call]]:
+        """Calls in all expressions of the body as found by `PyParser.get_all_elements_of_type`, by callee name.
+        Computed on first access.
+        """
+        if self._nested_calls is None:
+            self._nested_calls = dict()
+            for call in PyParser.get_all_elements_of_type(self.item, ast.Call):
+                name = get_call_name(call)
+                if name is not None:
+                    self._nested_calls.setdefault(name, []).append(call)
+        return self._nested_calls
+
+    def get_calls(self, name: str, nested: bool = False) -> List[ast.Call]:
+        """Get the calls of a function or method by name, see `calls` and `nested_calls`."""
+        return (self.nested_calls if nested else self.calls).get(name, [])
+
+
+class PySymbolIndex:
+    """
+    Index of the symbols of a parsed python module, built in one pass over the module.
+
+    Lookups of classes, methods and functions are dictionary lookups instead of scans of the `body` lists.
+    The calls and constants of a scope are indexed on first request with `get_scope` and kept for later queries.
+    """
+
+    def __init__(self, tree: ast.Module):
+        self.tree = tree
+        """The parsed module."""
+
+        self.classes: Dict[str, ast.ClassDef] = dict()
+        """Top level classes by name, the first definition wins."""
+
+        self.class_bases: Dict[str, List[str]] = dict()
+        """Dotted names of the bases of the top level classes by class name."""
+
+        self.subclasses: Dict[str, List[ast.ClassDef]] = dict()
+        """Top level classes by the dotted name of each of their bases, in source order."""
+
+        self.methods: Dict[str, Dict[str, ast.FunctionDef]] = dict()
+        """Methods of the top level classes by class name and method name, the first definition wins."""
+
+        self.functions: Dict[str, ast.FunctionDef] = dict()
+        """Functions and methods by name, in the order `PyParserInplace.go_method(name, recursive=True)` finds them:
+        module level functions and methods of (nested) classes in source order, the first definition wins."""
+
+        self._scopes: Dict[int, PyScopeIndex] = dict()
+
+        for item in tree.body:
+            if isinstance(item, ast.ClassDef):
+                if item.name in self.classes:
+                    continue
+                self.classes[item.name] = item
+
+                bases = [name for name in (get_dotted_name(b) for b in item.bases) if name is not None]
+                self.class_bases[item.name] = bases
+                for base in bases:
+                    self.subclasses.setdefault(base, []).append(item)
+
+                methods: Dict[str, ast.FunctionDef] = dict()
+                for member in item.body:
+                    if isinstance(member, ast.FunctionDef):
+                        methods.setdefault(member.name, member)
+                self.methods[item.name] = methods
+
+        self._add_functions(tree)
+
+    def _add_functions(self, item: ast.Module | ast.ClassDef):
+        for member in item.body:
+            if isinstance(member, ast.FunctionDef):
+                self.functions.setdefault(member.name, member)
+            elif isinstance(member, ast.ClassDef):
+                self._add_functions(member)
+
+    @staticmethod
+    def from_source(source: str) -> PySymbolIndex:
+        """Parse python source code and index it."""
+        return PySymbolIndex(ast.parse(source))
+
+    def get_subclass(self, base: str) -> ast.ClassDef | None:
+        """Get the first top level class deriving from the given base, e.g. `Node`."""
+        classes = self.subclasses.get(base)
+        return classes[0] if classes else None
+
+    def get_method(self, class_name: str, name: str) -> ast.FunctionDef | None:
+        """Get a method of a top level class."""
+        return self.methods.get(class_name, {}).get(name)
+
+    def get_function(self, name: str) -> ast.FunctionDef | None:
+        """Get a function or method by name, searching module level functions and all classes."""
+        return self.functions.get(name)
+
+    def get_scope(self, item: ast.Module | ast.ClassDef | ast.FunctionDef) -> PyScopeIndex:
+        """Get the index of the calls and constants of a module, class or function of the module."""
+        scope = self._scopes.get(id(item))
+        if scope is None:
+            scope = PyScopeIndex(item)
+            self._scopes[id(item)] = scope
+        return scope
+
+    def get_calls_in_method(self, base: str, method: str, name: str, nested: bool = False) -> List[ast.Call]:
+        """Get the calls of name in a method of the first class deriving from base,
+        e.g. all `create_publisher` calls in `__init__` of the `Node` subclass.
+        """
+        cls = self.get_subclass(base)
+        m = self.get_method(cls.name, method) if cls is not None else None
+        if m is None:
+            return []
+        return self.get_scope(m).get_calls(name, nested)
+
+
+class SourceMap:
+    """
+    Line start offsets of a python script, to slice the source of AST nodes from the original string.
+
+    The offsets are computed once, so that getting the source of a node does not split the script into lines again.
+    Column offsets of AST nodes are UTF-8 byte offsets, they are only converted for lines with non-ASCII characters.
+    """
+
+    line_break_pattern = re.compile(r"\r\n?|\n")
+    """Line breaks as counted by the python tokenizer."""
+
+    def __init__(self, source: str):
+        self.source = source
+        """The script."""
+
+        self.line_starts: List[int] = [0]
+        """Offset of the first character of each line, index 0 is line 1."""
+        self.line_starts.extend(m.end() for m in self.line_break_pattern.finditer(source))
+
+        self._is_ascii = source.isascii()
+        self._has_carriage_returns = "\r" in source
+
+    def get_offset(self, lineno: int, col_offset: int) -> int:
+        """Get the offset in the script of a position given by line number (starting at 1) and UTF-8 column offset."""
+        start = self.line_starts[lineno - 1]
+        if self._is_ascii or col_offset == 0:
+            return start + col_offset
+
+        end = self.line_starts[lineno] if lineno < len(self.line_starts) else len(self.source)
+        prefix = self.source[start:end].encode("utf-8")[:col_offset]
+        return start + len(prefix.decode("utf-8", errors="replace"))
+
+    def get_segment(self, lineno: int, col_offset: int, end_lineno: int, end_col_offset: int) -> str:
+        """Get the source between two positions, with `\\r\\n` and `\\r` line breaks replaced by `\\n`."""
+        segment = self.source[self.get_offset(lineno, col_offset) : self.get_offset(end_lineno, end_col_offset)]
+        if self._has_carriage_returns:
+            segment = self.line_break_pattern.sub("\n", segment)
+        return segment
+
+    def get_item_source(self, ast_item: ast.AST) -> str:
+        """Get the source of an AST node of the script."""
+        return self.get_segment(ast_item.lineno, ast_item.col_offset, ast_item.end_lineno, ast_item.end_col_offset)
+
+
+@functools.lru_cache(maxsize=16)
+def get_source_map(source: str) -> SourceMap:
+    """Get the source map of a script, cached for the most recently used scripts."""
+    return SourceMap(source)
+
+
 class PyParserInplace:
     """Class to parse a python file and return the class names, methods, etc."""
 
@@ -112,6 +319,15 @@ class PyParserInplace:
         self.current_item = self.tree
         # print(self.current_item)
 
+        self._index: PySymbolIndex | None = None
+
+    @property
+    def index(self) -> PySymbolIndex:
+        """Symbol index of the parsed module, built on first access."""
+        if self._index is None:
+            self._index = PySymbolIndex(self.tree)
+        return self._index
+
     def reset(self):
         self.current_item = self.tree
 
@@ -214,18 +430,7 @@ class PyParser:
         # Or just use:
         # return ast.unparse(ast_item)
 
-        line = ast_item.lineno
-        end_line = ast_item.end_lineno
-        col = ast_item.col_offset
-        end_col = ast_item.end_col_offset
-        lines = script_content.splitlines()
-        if line == end_line:
-            return lines[line - 1][col:end_col]
-        else:
-            start = lines[line - 1][col:]
-            end = lines[end_line - 1][:end_col]
-            middle = lines[line : end_line - 1]
-            return "\n".join([start] + middle + [end])
+        return get_source_map(script_content).get_item_source(ast_item)
 
     @staticmethod
     def get_elements_of_type(item: ast.ClassDef | ast.FunctionDef, t: Type[T]) -> list[T]:
@@ -396,6 +601,7 @@ class PyParser:
 
 if __name__ == "__main__":
     import mistletoe
+    from mistletoe import Document
     from mistletoe.ast_renderer import ASTRenderer, get_ast
 
     file_path = "C:/Users/schoc/Documents/Studium/Git/ROS-E/software/ros2-packages/displays/docs/HOOKS.md"
@@ -1,6 +1,7 @@
 #!/bin/python3
 
 import enum
+import itertools
 import os
 from os import listdir
 from os.path import isfile, join, isdir
@@ -15,7 +16,7 @@ import ast
 
 import logging
 
-from typing import List, Set, Dict, Tuple, Optional
+from typing import Iterable, List, NamedTuple, Set, Dict, Tuple, Optional, Union
 from enum import Enum
 
 # from markdowngenerator import markdowngenerator
@@ -23,155 +24,351 @@ from enum import Enum
 
 import mdplus.util.file_utils as file_utils
 from mdplus.generators.flags import Flags
-from mdplus.util.parser.py_parser import PyParserInplace, get_doc_string_content, PyParser
+from mdplus.util.parser.cpp_parser import (
+    CPP_HEADER_EXTENSIONS,
+    CMakeExecutable,
+    CppCall,
+    get_cmake_executables,
+    get_cpp_source,
+    get_string_value,
+)
+from mdplus.util.parser.entry_points import get_entry_points, normalize_entry
+from mdplus.util.parser.launch_parser import LaunchArgument, LaunchInclude, LaunchNode, get_launch_file
+from mdplus.util.parser.py_parser import (
+    PyParser,
+    PyScopeIndex,
+    PySymbolIndex,
+    get_doc_string_content,
+)
 
 logger = logging.getLogger(__name__)
 
+PRIMITIVE_TYPES = {
+    "bool",
+    "byte",
+    "char",
+    "float32",
+    "float64",
+    "int8",
+    "uint8",
+    "int16",
+    "uint16",
+    "int32",
+    "uint32",
+    "int64",
+    "uint64",
+    "string",
+    "wstring",
+    "time",
+    "duration",
+}
+"""Built-in field types of ROS interfaces, which are not defined by any package."""
+
+
+class InterfaceField(NamedTuple):
+    """A field or constant of a ROS interface definition."""
+
+    type: str
+    """The type as written in the definition, e.g. `int32[<=5]` or `geometry_msgs/Pose`."""
+
+    name: str
+    """The name of the field or constant."""
+
+    value: Optional[str]
+    """The default value of a field or the value of a constant, None if not given."""
+
+    is_constant: bool
+    """True if the field is a constant (`TYPE NAME=value`)."""
+
+    comment: str
+    """The trailing comment of the field or the comment lines directly above it."""
+
+    type_key: Optional[str]
+    """The `pkg/Type` key of the interface type of the field, None for primitive types."""
+
+
+def get_type_key(field_type: str, package_name: str) -> Optional[str]:
+    """Get the `pkg/Type` key of a field type as used by the `InterfaceIndex`.
+    Array and bound suffixes are removed, types without package belong to the given package.
+    Returns None for primitive types.
+    """
+    base_type = field_type.split("[", 1)[0].split("<=", 1)[0]
+    if base_type in PRIMITIVE_TYPES:
+        return None
+
+    parts = base_type.split("/")
+    if len(parts) == 1:
+        # The only implicitly namespaced type of other packages
+        if base_type == "Header":
+            return "std_msgs/Header"
+        return f"{package_name}/{base_type}"
+
+    # pkg/msg/Type is the same as pkg/Type
+    return f"{parts[0]}/{parts[-1]}"
+
+
+class InterfaceDefinition(NamedTuple):
+    """The result of parsing an interface definition file with `parse_interface`."""
+
+    content: str
+    """The definition prepared for display: without license header and with trailing comments moved above their line."""
+
+    sections: List[List[InterfaceField]]
+    """The fields per section, sections are separated by `---`, e.g. request and response of a service."""
+
+
+def _is_license_header(comment_lines: List[str]) -> bool:
+    s = "".join(comment_lines).lower()
+    return "license" in s or "copyright" in s
+
+
+def parse_interface(lines: Iterable[str], package_name: str) -> InterfaceDefinition:
+    """Parse a `.msg`, `.srv` or `.action` definition in a single pass over its lines.
+
+    A leading comment block mentioning a license or copyright is skipped, as are the empty lines following it.
+    Trailing comments are moved to their own line above the commented line in the content.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the definition, e.g. an open file.
+    package_name : str
+        The package of the interface, used to resolve types without package.
+
+    Returns
+    -------
+    InterfaceDefinition
+        The content for display and the parsed fields.
+    """
+    lines = iter(lines)
+
+    # The leading comment block is read ahead, since it is skipped if it turns out to be a license
+    header: List[str] = []
+    next_line: Optional[str] = None
+    for line in lines:
+        if not line.lstrip().startswith("#"):
+            next_line = line
+            break
+        header.append(line)
 
-class MessageType:
-    def __init__(self, package: "Package", msg_file_path: str):
+    if _is_license_header(header):
+        header = []
+    if next_line is not None:
+        header.append(next_line)
+
+    content: List[str] = []
+    sections: List[List[InterfaceField]] = [[]]
+    comments: List[str] = []
+    started = False
+
+    for line in itertools.chain(header, lines):
+        line = line.strip()
 
+        if line == "":
+            # Skip the first lines if they are empty
+            if started:
+                content.append(line)
+            comments = []
+            continue
+        started = True
+
+        if line.startswith("#"):
+            content.append(line)
+            comments.append(line.lstrip("#").strip())
+            continue
+
+        definition, hash_sign, comment = _partition_comment(line)
+        if hash_sign != "":
+            content.append("# " + comment.strip())
+        content.append(definition.strip())
+
+        if line.startswith("---"):
+            sections.append([])
+        else:
+            field = _parse_field(line, comments, package_name)
+            if field is not None:
+                sections[-1].append(field)
+        comments = []
+
+    return InterfaceDefinition("\n".join(content), sections)
+
+
+def _partition_comment(line: str) -> Tuple[str, str, str]:
+    """Split a line of a definition at its first # outside of a quoted string, like `str.partition`.
+    String constants and defaults may contain a #, e.g. `string FOO="a#b"  # the foo`.
+    """
+    if '"' not in line and "'" not in line:
+        return line.partition("#")
+
+    quote = None
+    escaped = False
+    for i, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif quote is not None:
+            if char == "\\":
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in ("'", '"'):
+            quote = char
+        elif char == "#":
+            return line[:i], "#", line[i + 1 :]
+    return line, "", ""
+
+
+def _parse_field(line: str, comments: List[str], package_name: str) -> Optional[InterfaceField]:
+    """Parse a field or constant definition, comments are the comment lines directly above it."""
+    parts = line.split(None, 1)
+    if len(parts) < 2:
+        return None
+    field_type, rest = parts
+
+    definition, _, comment = _partition_comment(rest)
+    comment = comment.strip()
+    # A = inside the quoted default of a field does not make it a constant, e.g. `string name "a=b"`
+    name_part, equal_sign, _ = definition.partition("=")
+    is_constant = equal_sign != "" and '"' not in name_part and "'" not in name_part
+
+    if is_constant:
+        name, _, value = definition.partition("=")
+        name, value = name.strip(), value.strip()
+    else:
+        splits = definition.split(None, 1)
+        name = splits[0]
+        value = splits[1].strip() if len(splits) > 1 else None
+
+    return InterfaceField(
+        field_type,
+        name,
+        value,
+        is_constant,
+        comment if comment != "" else " ".join(comments),
+        get_type_key(field_type, package_name),
+    )
+
+
+class InterfaceType:
+    """
+    Base of message, service and action types, parsed from their definition file.
+    """
+
+    extension = ""
+    """File extension of the definition files."""
+
+    section_names: List[str] = []
+    """Names of the sections of the definition, separated by `---` in the file."""
+
+    def __init__(self, package: "Package", file_path: str):
         self.package = package
-        self.msg_file_path = msg_file_path
-        self.name = os.path.basename(self.msg_file_path).replace(".msg", "")
+        self.file_path = file_path
+        self.name = os.path.basename(self.file_path).replace(self.extension, "")
+        self.wikiEntry: Optional[str] = None
 
-        with open(self.msg_file_path) as file:
-            lines = file.readlines()
-            self.content_original = "\n".join(lines)
-            lines = [line.strip() for line in lines]
+        with open(self.file_path) as file:
+            definition = parse_interface(file, package.name)
 
-            splittedLines = []
+        self.content = definition.content
+        """The definition prepared for display."""
 
-            # Skip Copyright / Licence block
-            init_comment_lines = []
-            for l in lines:
-                if l.startswith("#"):
-                    init_comment_lines.append(l)
-                else:
-                    break
+        self.sections = definition.sections
+        """The fields and constants per section."""
 
-            if len(init_comment_lines) > 0:
-                s = "\n".join(init_comment_lines).lower()
-                if "license" in s or "copyright" in s:
-                    lines = lines[len(init_comment_lines) :]
+    @property
+    def type_key(self) -> str:
+        """The `pkg/Type` key of the interface, unique in the workspace."""
+        return f"{self.package.name}/{self.name}"
 
-            # Skip the first lines if they are empty
-            while len(lines) > 0 and lines[0] == "":
-                lines.pop(0)
-
-            for l in lines:
-                if l.startswith("#"):
-                    splittedLines.append(l)
-                else:
-                    splits = [a.strip() for a in l.split("#", 1)]
-                    if len(splits) == 1:
-                        splittedLines.append(l)
-                    else:
-                        splittedLines.append("# " + splits[1])
-                        splittedLines.append(splits[0])
+    @property
+    def content_original(self) -> str:
+        """The unmodified definition, read from the file on request."""
+        with open(self.file_path) as file:
+            return "\n".join(file.readlines())
 
-            self.content = "\n".join(splittedLines)
+    def get_section(self, index: int) -> List[InterfaceField]:
+        """Get the fields of a section, empty if the definition has less sections."""
+        return self.sections[index] if index < len(self.sections) else []
 
     def get_wiki_entry(self, header_level: int, replace_root: str = "", as_code_block=True):
-        self.wikiEntry = ""
-        self.wikiEntry += header_level * "#"
-
-        relative_path = self.msg_file_path
+        relative_path = self.file_path
         if replace_root != "":
             relative_path = file_utils.get_relative_path(relative_path, replace_root)
 
-        # self.wikiEntry += f" [`{self.name}`]({relative_path})\n"
-        self.wikiEntry += f" `{self.name}`\n"
-        self.wikiEntry += "\n"
+        # parts.append(f" [`{self.name}`]({relative_path})\n")
+        parts = [header_level * "#", f" `{self.name}`\n", "\n"]
         if as_code_block:
-            self.wikiEntry += "```python\n"
-        self.wikiEntry += self.content
-        self.wikiEntry += "\n"
+            parts.append("```python\n")
+        parts.append(self.content)
+        parts.append("\n")
         if as_code_block:
-            self.wikiEntry += "```\n"
-            self.wikiEntry += "\n"
-        self.wikiEntry += f"Source: [{relative_path.lstrip('./')}]({relative_path})"
+            parts.append("```\n\n")
+        parts.append(f"Source: [{relative_path.lstrip('./')}]({relative_path})")
 
+        self.wikiEntry = "".join(parts)
         return self.wikiEntry
 
     def __repr__(self) -> str:
         return self.__str__()
 
     def __str__(self) -> str:
-        return self.wikiEntry if self.wikiEntry is not None and len(self.wikiEntry) > 0 else self.get_wiki_entry()
+        return self.wikiEntry if self.wikiEntry is not None and len(self.wikiEntry) > 0 else self.get_wiki_entry(3)
 
 
-class ServiceType:
-    def __init__(self, package: "Package", srv_file_path: str):
+class MessageType(InterfaceType):
+    extension = ".msg"
+    section_names = [""]
 
-        self.package = package
-        self.srv_file_path = srv_file_path
-        self.name = os.path.basename(self.srv_file_path).replace(".srv", "")
+    def __init__(self, package: "Package", msg_file_path: str):
+        super().__init__(package, msg_file_path)
+        self.msg_file_path = msg_file_path
 
-        with open(self.srv_file_path) as file:
-            lines = file.readlines()
-            self.content_original = "\n".join(lines)
-            lines = [line.strip() for line in lines]
+    @property
+    def fields(self) -> List[InterfaceField]:
+        """The fields and constants of the message."""
+        return self.get_section(0)
 
-            splittedLines = []
 
-            # Skip Copyright / Licence block
-            init_comment_lines = []
-            for l in lines:
-                if l.startswith("#"):
-                    init_comment_lines.append(l)
-                else:
-                    break
+class ServiceType(InterfaceType):
+    extension = ".srv"
+    section_names = ["Request", "Response"]
 
-            if len(init_comment_lines) > 0:
-                s = "\n".join(init_comment_lines).lower()
-                if "license" in s or "copyright" in s:
-                    lines = lines[len(init_comment_lines) :]
+    def __init__(self, package: "Package", srv_file_path: str):
+        super().__init__(package, srv_file_path)
+        self.srv_file_path = srv_file_path
 
-            # Skip the first lines if they are empty
-            while len(lines) > 0 and lines[0] == "":
-                lines.pop(0)
-
-            for l in lines:
-                if l.startswith("#"):
-                    splittedLines.append(l)
-                else:
-                    splits = [a.strip() for a in l.split("#", 1)]
-                    if len(splits) == 1:
-                        splittedLines.append(l)
-                    else:
-                        splittedLines.append("# " + splits[1])
-                        splittedLines.append(splits[0])
+    @property
+    def request_fields(self) -> List[InterfaceField]:
+        """The fields and constants of the request."""
+        return self.get_section(0)
 
-            self.content = "\n".join(splittedLines)
+    @property
+    def response_fields(self) -> List[InterfaceField]:
+        """The fields and constants of the response."""
+        return self.get_section(1)
 
-    def get_wiki_entry(self, header_level: int, replace_root: str = "", as_code_block=True):
-        self.wikiEntry = ""
-        self.wikiEntry += header_level * "#"
 
-        relative_path = self.srv_file_path
-        if replace_root != "":
-            relative_path = file_utils.get_relative_path(relative_path, replace_root)
+class ActionType(InterfaceType):
+    extension = ".action"
+    section_names = ["Goal", "Result", "Feedback"]
 
-        # self.wikiEntry += f" [`{self.name}`]({relative_path})\n"
-        self.wikiEntry += f" `{self.name}`\n"
-        self.wikiEntry += "\n"
-        if as_code_block:
-            self.wikiEntry += "```python\n"
-        self.wikiEntry += self.content
-        self.wikiEntry += "\n"
-        if as_code_block:
-            self.wikiEntry += "```\n"
-            self.wikiEntry += "\n"
-        self.wikiEntry += f"Source: [{relative_path.lstrip('./')}]({relative_path})"
+    def __init__(self, package: "Package", action_file_path: str):
+        super().__init__(package, action_file_path)
+        self.action_file_path = action_file_path
 
-        return self.wikiEntry
+    @property
+    def goal_fields(self) -> List[InterfaceField]:
+        """The fields and constants of the goal."""
+        return self.get_section(0)
 
-    def __repr__(self) -> str:
-        return self.__str__()
+    @property
+    def result_fields(self) -> List[InterfaceField]:
+        """The fields and constants of the result."""
+        return self.get_section(1)
 
-    def __str__(self) -> str:
-        return self.wikiEntry if self.wikiEntry is not None and len(self.wikiEntry) > 0 else self.get_wiki_entry()
+    @property
+    def feedback_fields(self) -> List[InterfaceField]:
+        """The fields and constants of the feedback."""
+        return self.get_section(2)
 
 
 class LaunchScript:
@@ -180,16 +377,22 @@ class LaunchScript:
         self.launch_file_path = launch_file_path
         self.name = os.path.basename(self.launch_file_path).replace(".launch.py", "")
 
-        self.info = "..."
+        launch_file = get_launch_file(self.launch_file_path)
+
+        self.doc_string = launch_file.doc
+        """The module docstring of the launch file."""
+
+        self.info = launch_file.function_doc
+        """The docstring of `generate_launch_description`, `Flags.NOT_FOUND` if it has none."""
+
+        self.arguments: List[LaunchArgument] = launch_file.arguments
+        """The launch arguments declared by the launch file."""
 
-        with open(self.launch_file_path) as file:
-            content = file.read()
-            # self.info = get_doc_string_content(content, r"def generate_launch_description\(.*?\):",
-            #                                    only_first_line=False)
+        self.includes: List[LaunchInclude] = launch_file.includes
+        """The launch files included by the launch file."""
 
-            parser = PyParserInplace(content)
-            m = parser.go_method("generate_launch_description").current_item
-            self.info = PyParser.get_doc_string(m)
+        self.nodes: List[LaunchNode] = launch_file.nodes
+        """The nodes started by the launch file."""
 
 
 class Topic:
@@ -241,6 +444,11 @@ class Node:
         else:
             logger.error(f"Node script not found: {self.script_path}")
 
+        self.index: Optional[PySymbolIndex] = None
+        """Symbol index of the node script, shared by all parse methods. None if the script was not found."""
+        if self.file_content is not None:
+            self.index = PySymbolIndex.from_source(self.file_content)
+
         self.doc_string = self._parse_doc_string()
         self.doc_string_without_header = self._get_doc_string_without_header(self.doc_string)
         self.info = self._get_info_from_doc_string(self.doc_string)
@@ -254,21 +462,18 @@ class Node:
     def _parse_doc_string(self):
         doc = Flags.NOT_FOUND
 
-        if self.file_content is None:
+        if self.index is None:
             return doc
 
-        parser = PyParserInplace(self.file_content)
-        c = parser.go_class(bases=["Node"]).current_item
-        constants = PyParser.get_elements_where_value_is_of_type(c, ast.Constant, return_value=True)
-        constants = {c.lineno: c for c in constants}
-
-        if not hasattr(c, "lineno"):
+        c = self.index.get_subclass("Node")
+        if c is None:
             return doc
 
+        constants = self.index.get_scope(c).constants
         if c.lineno + 1 in constants:
             doc = PyParser.get_doc_string(constants[c.lineno + 1], only_first_line=False, remove_indentation=True)
         else:
-            t = parser.tree
+            t = self.index.tree
             constants = PyParser.get_elements_where_value_is_of_type(t, ast.Constant, return_value=False)
             if len(t.body) > 0 and len(constants) > 0 and t.body[0] == constants[0]:
                 doc = PyParser.get_doc_string(constants[0], only_first_line=False, remove_indentation=True)
@@ -292,31 +497,36 @@ class Node:
             return info
         return Flags.NOT_FOUND
 
+    def _get_init_scope(self) -> Optional[PyScopeIndex]:
+        """Get the index of `__init__` of the node class, None if there is none."""
+        if self.index is None:
+            return None
+
+        c = self.index.get_subclass("Node")
+        m = self.index.get_method(c.name, "__init__") if c is not None else None
+        return self.index.get_scope(m) if m is not None else None
+
+    def _get_callback_doc(self, callback: str) -> str:
+        """Get the docstring of the method or function registered as callback."""
+        m = self.index.get_function(callback)
+        return PyParser.get_doc_string(m, only_first_line=False, remove_indentation=True)
+
     def _parse_publisher(self) -> list[Publisher]:
         publisher: list[Publisher] = []
 
-        if self.file_content is None:
+        scope = self._get_init_scope()
+        if scope is None:
             return publisher
 
-        parser = PyParserInplace(self.file_content)
-        m = parser.go_class(bases=["Node"]).go_method("__init__").current_item
-        if m is None:
-            return publisher
-
-        calls = PyParser.get_elements_where_value_is_of_type(m, ast.Call, return_value=True)
-        constants = PyParser.get_elements_where_value_is_of_type(m, ast.Constant, return_value=True)
-        constants = {e.lineno: e for e in constants}
-        filtered = PyParser.filter_calls(calls, "create_publisher")
-
-        for call in filtered:
+        for call in scope.get_calls("create_publisher"):
             args = PyParser.get_args(call, ["msg_type", "topic", "qos_profile"])
             msg_type, topic, qos_profile = args
             s_msg_type = PyParser.get_name_or_value(msg_type)
             s_topic = PyParser.get_name_or_value(topic)
             # s_qos_profile = PyParser.get_name_or_value(qos_profile, include_origin_for_attributes=False)
             doc = Flags.NOT_FOUND
-            if call.end_lineno + 1 in constants:
-                e = constants[call.end_lineno + 1]
+            if call.end_lineno + 1 in scope.constants:
+                e = scope.constants[call.end_lineno + 1]
                 doc = PyParser.get_doc_string(e)
 
             publisher.append(Publisher(s_msg_type, s_topic, doc))
@@ -326,35 +536,22 @@ class Node:
     def _parse_subscriptions(self) -> list[Subscription]:
         subscriptions: list[Subscription] = []
 
-        if self.file_content is None:
-            return subscriptions
-
-        parser = PyParserInplace(self.file_content)
-
-        c = parser.go_class(bases=["Node"]).current_item
-        m = parser.go_method("__init__").current_item
-        if m is None:
+        scope = self._get_init_scope()
+        if scope is None:
             return subscriptions
 
-        calls = PyParser.get_elements_where_value_is_of_type(m, ast.Call, return_value=True)
-        constants = PyParser.get_elements_where_value_is_of_type(m, ast.Constant, return_value=True)
-        constants = {e.lineno: e for e in constants}
-        filtered = PyParser.filter_calls(calls, "create_subscription")
-
-        for call in filtered:
+        for call in scope.get_calls("create_subscription"):
             args = PyParser.get_args(call, ["msg_type", "topic", "callback"])
             msg_type, topic, callback = args
             s_msg_type = PyParser.get_name_or_value(msg_type)
             s_topic = PyParser.get_name_or_value(topic)
             s_callback = PyParser.get_name_or_value(callback, include_origin_for_attributes=False)
 
-            if (call.end_lineno + 1) in constants:
-                e = constants[call.end_lineno + 1]
+            if (call.end_lineno + 1) in scope.constants:
+                e = scope.constants[call.end_lineno + 1]
                 doc = PyParser.get_doc_string(e)
             else:
-                parser.reset()
-                m = parser.go_method(s_callback, recursive=True).current_item
-                doc = PyParser.get_doc_string(m, only_first_line=False, remove_indentation=True)
+                doc = self._get_callback_doc(s_callback)
 
             subscriptions.append(Subscription(s_msg_type, s_topic, doc))
 
@@ -363,21 +560,11 @@ class Node:
     def _parse_services(self) -> list[Service]:
         services: list[Service] = []
 
-        if self.file_content is None:
-            return services
-
-        parser = PyParserInplace(self.file_content)
-
-        c = parser.go_class(bases=["Node"]).current_item
-        m = parser.go_method("__init__").current_item
-        if m is None:
+        scope = self._get_init_scope()
+        if scope is None:
             return services
 
-        calls = PyParser.get_elements_where_value_is_of_type(m, ast.Call, return_value=True)
-        constants = PyParser.get_elements_where_value_is_of_type(m, ast.Constant, return_value=True)
-        constants = {e.lineno: e for e in constants}
-        filtered = PyParser.filter_calls(calls, "create_service")
-        for call in filtered:
+        for call in scope.get_calls("create_service"):
             args = PyParser.get_args(call, ["srv_type", "srv_name", "callback"])
             srv_type, srv_name, callback = args
             s_srv_type = PyParser.get_name_or_value(srv_type)
@@ -385,13 +572,11 @@ class Node:
             s_callback = PyParser.get_name_or_value(callback, include_origin_for_attributes=False)
 
             doc = ""
-            if (call.end_lineno + 1) in constants:
-                e = constants[call.end_lineno + 1]
+            if (call.end_lineno + 1) in scope.constants:
+                e = scope.constants[call.end_lineno + 1]
                 doc = PyParser.get_doc_string(e)
             else:
-                parser.reset()
-                m = parser.go_method(s_callback, recursive=True).current_item
-                doc = PyParser.get_doc_string(m, only_first_line=False, remove_indentation=True)
+                doc = self._get_callback_doc(s_callback)
 
             services.append(Service(s_srv_type, s_srv_name, doc))
 
@@ -400,20 +585,11 @@ class Node:
     def _parse_parameters(self) -> list[Parameter]:
         parameters: list[Parameter] = []
 
-        if self.file_content is None:
+        scope = self._get_init_scope()
+        if scope is None:
             return parameters
 
-        parser = PyParserInplace(self.file_content)
-
-        c = parser.go_class(bases=["Node"]).current_item
-        m = parser.go_method("__init__").current_item
-        if m is None:
-            return parameters
-
-        all_calls = PyParser.get_all_elements_of_type(m, ast.Call)
-        filtered = PyParser.filter_calls(all_calls, "declare_parameter")
-
-        for call in filtered:
+        for call in scope.get_calls("declare_parameter", nested=True):
             args = PyParser.get_args(call, ["name", "value", "descriptor"])
             name, value, descriptor = args
             s_name = PyParser.get_name_or_value(name)
@@ -437,7 +613,7 @@ class Node:
 
     @staticmethod
     def from_console_scripts(parent_package: "Package", console_script_entry: str):
-        m = re.match("(.*?) = (.*?):(.*)", console_script_entry)
+        m = re.match("(.*?) = (.*?):(.*)", normalize_entry(console_script_entry))
         name = m.group(1)
         script = m.group(2)
         main_method = m.group(3)
@@ -445,6 +621,70 @@ class Node:
         return Node(parent_package, name, script, main_method)
 
 
+class CppNode:
+    """
+    A C++ node of an ament_cmake package, defined by an executable or component in the CMakeLists.txt.
+    Has the same attributes as the python `Node`, so that both are rendered the same way.
+    """
+
+    def __init__(self, package: "Package", executable: CMakeExecutable, headers: Dict[str, List[str]]):
+        self.package = package
+        self.name = executable.name
+        self.entry_point = executable.plugin if executable.plugin is not None else "main"
+
+        source_paths = [os.path.normpath(os.path.join(package.path, s)) for s in executable.sources]
+        self.source_paths = [s for s in source_paths if os.path.isfile(s)]
+        """The existing source files of the node."""
+        if len(self.source_paths) == 0:
+            logger.error(f"No sources found for C++ node {self.name} in {package.path}")
+
+        self.script_path = self.source_paths[0] if len(self.source_paths) > 0 else package.path
+        self.script = os.path.relpath(self.script_path, package.path).replace(os.sep, "/")
+
+        # Headers named like a source often declare the members of the node class
+        scanned_paths = list(self.source_paths)
+        for source in self.source_paths:
+            stem = os.path.splitext(os.path.basename(source))[0]
+            scanned_paths.extend(h for h in headers.get(stem, []) if h not in scanned_paths)
+        sources = [get_cpp_source(path) for path in scanned_paths]
+
+        self.doc_string = next((s.doc for s in sources if s.doc != ""), Flags.NOT_FOUND)
+        self.doc_string_without_header = Node._get_doc_string_without_header(self.doc_string)
+        self.info = Node._get_info_from_doc_string(self.doc_string)
+
+        calls = [call for source in sources for call in source.calls]
+        self.services = [Service(*_get_topic_args(c)) for c in calls if c.name == "create_service"]
+        self.publisher = [Publisher(*_get_topic_args(c)) for c in calls if c.name == "create_publisher"]
+        self.subscriptions = [Subscription(*_get_topic_args(c)) for c in calls if c.name == "create_subscription"]
+        self.parameters = [
+            Parameter(
+                get_string_value(_get_argument(c, 0)), _get_argument(c, 1) or "None", c.comment or Flags.NOT_FOUND
+            )
+            for c in calls
+            if c.name == "declare_parameter"
+        ]
+
+    def __str__(self) -> str:
+        return f"[NODE] {self.name} ({self.script}:{self.entry_point})"
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+
+def _get_argument(call: CppCall, index: int) -> Optional[str]:
+    return call.arguments[index] if index < len(call.arguments) else None
+
+
+def _get_topic_args(call: CppCall) -> Tuple[str, str, str]:
+    """Get the type, topic name and comment of a `create_publisher`, `create_subscription` or `create_service` call."""
+    return _get_type_name(call.template), get_string_value(_get_argument(call, 0)), call.comment or Flags.NOT_FOUND
+
+
+def _get_type_name(template: Optional[str]) -> str:
+    """Get the type name without namespaces like the python nodes, e.g. `String` for `std_msgs::msg::String`."""
+    return template.split("::")[-1].strip() if template else Flags.NOT_FOUND
+
+
 class PackageType(enum.Enum):
     NONE = "NONE"
     PYTHON = "python"
@@ -458,24 +698,26 @@ class Package:
 
         logger.debug(f"Parsing PACKAGE at {self.path}")
 
-        self.nodes: List[Node] = []
+        self.nodes: List[Union[Node, CppNode]] = []
         self.launch_scripts: List[LaunchScript] = []
         self.messages: List[MessageType] = []
         self.services: List[ServiceType] = []
+        self.actions: List[ActionType] = []
 
         self.package_type = PackageType.NONE
 
+        self.errors: Dict[str, str] = dict()
+        """Error messages by file path of the files of the package that could not be parsed, e.g. a broken setup.py."""
+
         if Package.isPythonPackage(self.path):
             self.package_type = PackageType.PYTHON
 
             setupPath = os.path.join(self.path, "setup.py")
             launchPath = os.path.join(self.path, "launch")
 
-            parser = PyParserInplace(setupPath)
-            if parser.exists():
-                # Parse the defined ros nodes from the setup.py
-                entry_points = parser.go_method("setup").go_keyword("entry_points").go_value().eval()
-                console_scripts = entry_points["console_scripts"]
+            if os.path.isfile(setupPath):
+                # Parse the defined ros nodes from the entry points of setup.py, setup.cfg and pyproject.toml
+                console_scripts = get_entry_points(self.path, self.errors).get("console_scripts", [])
 
                 for script in console_scripts:
                     self.nodes.append(Node.from_console_scripts(self, script))
@@ -493,36 +735,39 @@ class Package:
             self.package_type = PackageType.CMAKE
 
             # TODO: Parse CMakeList to get the actually generated Messages
-            message_path = os.path.join(self.path, "msg")
-            service_path = os.path.join(self.path, "srv")
-            message_files = (
-                [f for f in listdir(message_path) if isfile(join(message_path, f))]
-                if os.path.exists(message_path)
-                else []
-            )
-            message_files = [f for f in message_files if f.endswith(".msg")]
-
-            service_files = (
-                [f for f in listdir(service_path) if isfile(join(service_path, f))]
-                if os.path.exists(service_path)
-                else []
-            )
-            service_files = [f for f in service_files if f.endswith(".srv")]
-
-            message_files.sort()
-            service_files.sort()
-
-            if len(message_files) > 0:
-                logger.debug(f"Extracting message types from: {message_path}")
-                for f in message_files:
-                    self.messages.append(MessageType(self, os.path.join(self.path, "msg", f)))
-
-            if len(service_files) > 0:
-                logger.debug(f"Extracting service types from: {service_files}")
-                for f in service_files:
-                    self.services.append(ServiceType(self, os.path.join(self.path, "srv", f)))
-
-            messages = []
+            self.messages = self._parse_interfaces("msg", MessageType)
+            self.services = self._parse_interfaces("srv", ServiceType)
+            self.actions = self._parse_interfaces("action", ActionType)
+
+            cmake_path = os.path.join(self.path, "CMakeLists.txt")
+            executables = get_cmake_executables(cmake_path)
+            if len(executables) > 0:
+                headers = self._get_cpp_headers()
+                self.nodes = [CppNode(self, executable, headers) for executable in executables]
+
+    def _get_cpp_headers(self) -> Dict[str, List[str]]:
+        """Get the C++ headers in the include and src directories of the package by their name without extension."""
+        headers: Dict[str, List[str]] = dict()
+        for directory in ["include", "src"]:
+            for root, dirs, files in os.walk(os.path.join(self.path, directory)):
+                dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                for f in sorted(files):
+                    stem, extension = os.path.splitext(f)
+                    if extension in CPP_HEADER_EXTENSIONS:
+                        headers.setdefault(stem, []).append(os.path.join(root, f))
+        return headers
+
+    def _parse_interfaces(self, directory: str, interface_class: type) -> list:
+        """Parse all definition files of an interface class in a directory of the package, sorted by file name."""
+        path = os.path.join(self.path, directory)
+        if not os.path.isdir(path):
+            return []
+
+        files = sorted(f for f in listdir(path) if f.endswith(interface_class.extension) and isfile(join(path, f)))
+        if len(files) > 0:
+            logger.debug(f"Extracting {directory} types from: {path}")
+
+        return [interface_class(self, os.path.join(path, f)) for f in files]
 
     def __str__(self) -> str:
         s = f"[PACKAGE] {self.name}\t ({self.path})"
@@ -541,6 +786,11 @@ class Package:
             for srv in self.services:
                 s += f"\n\t\t [SRV] {srv.name}"
 
+        if len(self.actions) > 0:
+            s += "\n\t<<ACTIONS>>"
+            for action in self.actions:
+                s += f"\n\t\t [ACTION] {action.name}"
+
         return s
 
     def __repr__(self) -> str:
@@ -592,6 +842,35 @@ class Package:
         return packages
 
 
+class InterfaceIndex:
+    """
+    Index of all message, service and action types of a set of packages by their `pkg/Type` key.
+    """
+
+    def __init__(self, packages: List[Package]):
+        self.interfaces: Dict[str, InterfaceType] = dict()
+        """All interfaces by their `pkg/Type` key."""
+
+        for package in packages:
+            for interface in [*package.messages, *package.services, *package.actions]:
+                self.interfaces[interface.type_key] = interface
+
+    def __len__(self) -> int:
+        return len(self.interfaces)
+
+    def get(self, type_key: Optional[str]) -> Optional[InterfaceType]:
+        """Get an interface by its `pkg/Type` key, e.g. the `type_key` of a field.
+        Returns None for unknown types, e.g. types of packages outside of the workspace.
+        """
+        if type_key is None:
+            return None
+        return self.interfaces.get(type_key)
+
+    def resolve(self, field: InterfaceField) -> Optional[InterfaceType]:
+        """Get the interface defining the type of a field, None for primitive or unknown types."""
+        return self.get(field.type_key)
+
+
 class Workspace:
     def __init__(self, workspacePath):
         self.path = workspacePath